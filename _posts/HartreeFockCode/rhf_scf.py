@@ -42,6 +42,21 @@ def makefock(Hcore, P, dim): # Make Fock Matrix
     
     return F 
 
+def makeeri(TEI, dim): # Unpack the two electron integrals once into a dense (dim, dim, dim, dim) array using their 8-fold symmetry
+    TEI = np.atleast_2d(TEI)
+    ERI = np.zeros((dim, dim, dim, dim))
+    i, j, k, l = (TEI[:, :4].astype(int) - 1).T
+    for a, b, c, d in [(i,j,k,l), (j,i,k,l), (i,j,l,k), (j,i,l,k), (k,l,i,j), (l,k,i,j), (k,l,j,i), (l,k,j,i)]:
+        ERI[a, b, c, d] = TEI[:, 4]
+
+    return ERI
+
+def makefock_eri(Hcore, P, ERI): # Make Fock Matrix by contracting the density matrix with the dense ERI array
+    J = np.tensordot(ERI, P, axes=([2, 3], [0, 1])) # Coulomb,  J[i,j] = sum_kl (ij|kl) P[k,l]
+    K = np.tensordot(ERI, P, axes=([1, 3], [0, 1])) # Exchange, K[i,j] = sum_kl (ik|jl) P[k,l]
+
+    return Hcore + J - 0.5*K
+
 def deltap(D, Dold): # Calculate change in density matrix using Root Mean Square Deviation (RMSD)
     DELTA = 0.0
     for i in range(0, dim):
@@ -59,6 +74,7 @@ def currentenergy(D, Hcore, F, dim): # Calculate energy at iteration
     return EN
 
 Nelec = 2 # The number of electrons in our system 
+ENGINE = 'eri' # 'eri' unpacks the two electron integrals once and builds F with tensor contractions, 'loop' looks up every integral with tei()
 ENUC = np.genfromtxt('https://raw.githubusercontent.com/adambaskerville/adambaskerville.github.io/master/_posts/HartreeFockCode/enuc.dat',dtype=float, delimiter=',') # ENUC = nuclear repulsion, 
 Sraw = np.genfromtxt('https://raw.githubusercontent.com/adambaskerville/adambaskerville.github.io/master/_posts/HartreeFockCode/s.dat',dtype=None)                    # Sraw is overlap matrix, 
 Traw = np.genfromtxt('https://raw.githubusercontent.com/adambaskerville/adambaskerville.github.io/master/_posts/HartreeFockCode/t.dat',dtype=None)                    # Traw is kinetic energy matrix,
@@ -78,6 +94,7 @@ V            = symmetrise(V) # Flip the triangular matrix in the diagonal
 T            = symmetrise(T) # Flip the triangular matrix in the diagonal
 TEI          = np.genfromtxt('https://raw.githubusercontent.com/adambaskerville/adambaskerville.github.io/master/_posts/HartreeFockCode/two_elec_int.dat') # Load two electron integrals
 twoe         = {eint(row[0], row[1], row[2], row[3]) : row[4] for row in TEI} # Put in python dictionary
+ERI          = makeeri(TEI, dim) if ENGINE == 'eri' else None # Dense array of all dim^4 two electron integrals
 Hcore        = T + V # Form core Hamiltonian matrix as sum of one electron kinetic energy, T and potential energy, V matrices
 SVAL, SVEC   = np.linalg.eigh(S) # Diagonalize basis using symmetric orthogonalization 
 SVAL_minhalf = (np.diag(SVAL**(-0.5))) # Inverse square root of eigenvalues
@@ -88,7 +105,7 @@ count        = 0 # Count how many SCF cycles are done
 
 while DELTA > 0.0001:
     count     += 1                             # Add one to number of SCF cycles counter
-    F         = makefock(Hcore, P, dim)        # Calculate Fock matrix, F
+    F         = makefock_eri(Hcore, P, ERI) if ENGINE == 'eri' else makefock(Hcore, P, dim) # Calculate Fock matrix, F
     Fprime    = fprime(S_minhalf, F)           # Calculate transformed Fock matrix, F'
     E, Cprime = np.linalg.eigh(Fprime)         # Diagonalize F' matrix
     C         = np.dot(S_minhalf, Cprime)      # 'Back transform' the coefficients into original basis using transformation matrix
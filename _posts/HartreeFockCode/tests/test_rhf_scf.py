@@ -0,0 +1,51 @@
+"""The tensor-contraction Fock build of rhf_scf.py against its original integral-by-integral loop."""
+
+import ast
+import itertools
+import os
+
+import numpy as np
+import pytest
+
+DIM = 6
+SCRIPT = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "rhf_scf.py")
+
+
+def script_functions():
+    """Namespace with the function definitions of rhf_scf.py; the script body reads its data over the network."""
+    with open(SCRIPT, encoding="utf-8") as handle:
+        tree = ast.parse(handle.read(), SCRIPT)
+    tree.body = [node for node in tree.body if isinstance(node, (ast.Import, ast.ImportFrom, ast.FunctionDef))]
+    namespace = {}
+    exec(compile(tree, SCRIPT, "exec"), namespace)
+    return namespace
+
+
+@pytest.fixture(scope="module")
+def integrals():
+    """Unique (ij|kl) rows in the two_elec_int.dat layout, one-based, with random values."""
+    rng = np.random.default_rng(11)
+    pairs = [(i, j) for i in range(1, DIM + 1) for j in range(1, i + 1)]
+    rows = [(*ij, *kl) for ij, kl in itertools.product(pairs, repeat=2) if ij >= kl]
+    return np.column_stack([np.array(rows, dtype=float), rng.standard_normal(len(rows))])
+
+
+def test_makeeri_matches_tei(integrals):
+    rhf = script_functions()
+    rhf["twoe"] = {rhf["eint"](*row[:4]): row[4] for row in integrals}
+    eri = rhf["makeeri"](integrals, DIM)
+    for i, j, k, l in itertools.product(range(DIM), repeat=4):
+        assert eri[i, j, k, l] == rhf["tei"](i + 1, j + 1, k + 1, l + 1)
+
+
+def test_eri_fock_matches_loop_fock(integrals):
+    rhf = script_functions()
+    rhf["twoe"] = {rhf["eint"](*row[:4]): row[4] for row in integrals}
+    rng = np.random.default_rng(12)
+    hcore = rng.standard_normal((DIM, DIM))
+    hcore = hcore + hcore.T
+    density = rng.standard_normal((DIM, DIM))
+    density = density + density.T
+    expected = rhf["makefock"](hcore, density, DIM)
+    fock = rhf["makefock_eri"](hcore, density, rhf["makeeri"](integrals, DIM))
+    np.testing.assert_allclose(fock, expected, rtol=0, atol=1e-13 * np.abs(expected).max())
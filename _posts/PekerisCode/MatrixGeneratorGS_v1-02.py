@@ -1,13 +1,15 @@
 import os
-import cexprtk
+from functools import lru_cache
 import numpy as np
-from numpy import genfromtxtimport multiprocessing
-import parmap
-import scipy
-from scipy.linalg import eigvalsh, ordqz
+import multiprocessing
 import time
 
-from sympy import Symbol, solve
+from rr_assembly import cached_structure, parallel_fill, rebuild_matrices
+from rr_backends import load_backend, select_backend
+from rr_basis import basis_maps
+from rr_codegen import load_fused_recurrences, parse_rr_file
+from rr_eigen import top_eigenpair
+from rr_optimise import ExponentObjective, optimise_exponents, print_optimisation
 np.seterr(divide='ignore')
 # Specify number of workers for multiprocessing
 number_of_workers = multiprocessing.cpu_count()+1
@@ -40,130 +42,67 @@ Global_dict = {"A"  : 1.1,
                "EigenProb" : "Energy"
                }
 
-# Setup the cexprtk symbol table
-st = cexprtk.Symbol_Table({"A"  : Global_dict["A"],
-                           "B"  : Global_dict["B"],
-                           "C"  : Global_dict["C"],
-                           "K"  : Global_dict["K"],
-                           "ep" : 1,
-                           "t"  : 1,
-                           "p"  : 1,
-                           "l"  : Global_dict["l"],
-                           "m"  : Global_dict["m"],
-                           "n"  : Global_dict["n"],
-                           "lp" : Global_dict["lp"],
-                           "mp" : Global_dict["mp"],
-                           "np" : Global_dict["np"],
-                           "m1" : Global_dict["m1"],
-                           "m2" : Global_dict["m2"],
-                           "m3" : Global_dict["m3"],
-                           "E"  : 1,
-                           "Z1" : Global_dict["Z1"],
-                           "Z2" : Global_dict["Z2"],
-                           "Z3" : Global_dict["Z3"],
-                           "ss" : 1,
-                           "hh" : 1,
-                           }, 
-                           add_constants=True)
-
-# Read in the recursion relations
-RRHH = genfromtxt(os.path.expanduser('~/Postdoc/post_doc_2019/3Body2/3Body2FC/RR_HH.txt'), dtype=(int,int,int,'S1000'))
-RRSS = genfromtxt(os.path.expanduser('~/Postdoc/post_doc_2019/3Body2/3Body2FC/RR_SS.txt'), dtype=(int,int,int,'S1000'))
-
-# Store the recursion relations in a dictionary and compile them into run time code using cexprtk
-RRDictHH = {(row[0],row[1],row[2]) : cexprtk.Expression(str(row[3], 'utf-8'), st) for row in RRHH}
-RRDictSS = {(row[0],row[1],row[2]) : cexprtk.Expression(str(row[3], 'utf-8'), st) for row in RRSS}
+# Recursion relation files
+RR_HH_PATH = os.path.expanduser('~/Postdoc/post_doc_2019/3Body2/3Body2FC/RR_HH.txt')
+RR_SS_PATH = os.path.expanduser('~/Postdoc/post_doc_2019/3Body2/3Body2FC/RR_SS.txt')
+
+@lru_cache(maxsize=None)
+def reference_expressions(rrtype):
+    """cexprtk symbol table and {shift: Expression} dict for the reference J-scan builders.
+
+    Built on first use only, so normal runs (and spawned workers re-importing this script) skip cexprtk entirely.
+    """
+    import cexprtk
+
+    # Setup the cexprtk symbol table
+    st = cexprtk.Symbol_Table({"A"  : Global_dict["A"],
+                               "B"  : Global_dict["B"],
+                               "C"  : Global_dict["C"],
+                               "K"  : Global_dict["K"],
+                               "ep" : 1,
+                               "t"  : 1,
+                               "p"  : 1,
+                               "l"  : Global_dict["l"],
+                               "m"  : Global_dict["m"],
+                               "n"  : Global_dict["n"],
+                               "lp" : Global_dict["lp"],
+                               "mp" : Global_dict["mp"],
+                               "np" : Global_dict["np"],
+                               "m1" : Global_dict["m1"],
+                               "m2" : Global_dict["m2"],
+                               "m3" : Global_dict["m3"],
+                               "E"  : 1,
+                               "Z1" : Global_dict["Z1"],
+                               "Z2" : Global_dict["Z2"],
+                               "Z3" : Global_dict["Z3"],
+                               "ss" : 1,
+                               "hh" : 1,
+                               }, 
+                               add_constants=True)
+
+    # Store the recursion relations in a dictionary and compile them into run time code using cexprtk
+    relations = parse_rr_file(RR_HH_PATH if rrtype == 'HH' else RR_SS_PATH)
+    return st, {shift: cexprtk.Expression(expression, st) for shift, expression in relations.items()}
+
+# The same relations compiled into NumPy functions of l, m, n arrays, one per shift (cached on disk).
+# Both files are fused: RRFused.SHIFTS[1,-1,0](l, m, n, Global_dict) returns the (HH, SS) coefficients
+# over a whole block of the basis at once, computing their shared subexpressions only once.
+RRFused = load_fused_recurrences({'HH': RR_HH_PATH, 'SS': RR_SS_PATH})
 
 mat_size = 2856
 
-def testlmn(l, m, n, A, B, C, m1, m2, m3, Z1, Z2, Z3):
-    return 1/4*(-6*((1/3+n+n**2)*m3*(m1+m2)*B**2+4/3*C*(n+1/2)*m3*(m+1/2)*m1*B+C**2*(m2+m3)*(m+m**2+1/3)*m1)*(l+1/2)*A**3+(-6*(1/3+n+n**2)*m3*(m1+m2)*(m+1/2)*B**3-12*m3*(1/6*(n+1/2)*(m1+m2)*(l**2+m**2+l+m)*C+Z1*Z2*m1*m2*(1/3+n+n**2))*B**2-8*(1/4*(l**2+n**2+l+n)*(m2+m3)*C+(n+1/2)*((Z2+Z3)*Z1+Z2*Z3)*m3*m2)*C*m1*(m+1/2)*B-12*(m+m**2+1/3)*(1/2*(n+1/2)*(m2+m3)*C+m2*m3*Z1*Z3)*C**2*m1)*A**2-8*((n+1/2)*m3*(m+1/2)*B**2+(1/4*(m**2+n**2+m+n)*(m1+m3)*C+(n+1/2)*m1*((Z2+Z3)*Z1+Z2*Z3)*m3)*B+((n+1/2)*C+((Z2+Z3)*Z1+Z2*Z3)*m3)*C*m1*(m+1/2))*C*(l+1/2)*m2*B*A-12*C**2*m2*(1/2*(m+1/2)*(m1+m3)*B+1/2*(n+1/2)*(m1+m3)*C+m1*m3*Z2*Z3)*B**2*(l**2+l+1/3))/B**3/C**3/A**3/m1/m2/m3
-
-
-l =  1
-m =  -1
-n =  0
-A =  1.1
-B =  1.1
-C =  2.2
-m1 = 1.0
-m2 = 1.0
-m3 = 10000.0
-Z1 = -1.0
-Z2 = -1.0
-Z3 = 2.0
-
-start = time.time()
-for i in range(100000):
-    RRCython.RRHH(l, m, n, m1, m2, m3, Z1, Z2, Z3, A, B, C)
-
-end = time.time()
-print("Took {} seconds.".format(end - start))
-
-start = time.time()
-for i in range(100000):
-    RRDictHH[1,-1,0]()
-
-end = time.time()
-print("Took {} seconds.".format(end - start))
-
-#print(testlmn(l, m, n, A, B, C, m1, m2, m3, Z1, Z2, Z3))
-
-exit()
-## Symmetric numbering scheme
-size = 1.4*mat_size
-omega = Symbol('omega', real=True)
-omega = int(round(solve(15/16+(17/12)*omega+(5/8)*omega**2+(1/12)*omega**3+(1/16)*(1)**omega-size, omega)[0]))
-
-LMN_MAP_SYM = []    
-for ww in range(omega + 1):
-    for vv in range(ww + 1):
-        for uu in range(vv + 1):
-            l = uu
-            m = vv - uu
-            n = ww - vv
-            if l+m+n <= omega and l<=m:
-                lmn = (l,m,n) 
-                LMN_MAP_SYM.append(lmn) 
-
-omega = ((1/3)*(81*size+3*(729*size**2-3)**0.5)**(1/3)+1/(81*size+3*(729*size**2-3)**0.5)**(1/3)-2)
-omega = int(round(omega, 0))
-
-LMN_MAP_ASYM = []    
-for ww in range(omega + 1):
-    for vv in range(ww + 1):
-        for uu in range(vv + 1):
-            l = uu
-            m = vv - uu
-            n = ww - vv
-            if l + m + n <= omega:
-                lmn = (l,m,n) 
-                LMN_MAP_ASYM.append(lmn) 
-
-## Antisymmetric numbering scheme
-
-omega = Symbol('omega', real=True)
-size = 2*mat_size
-omega = int(round(solve(15/16+(17/12)*(omega-1)+(5/8)*(omega-1)**2+(1/12)*(omega-1)**3+(1/16)*(1)**(omega-1)-size, omega)[0]))
-LMN_MAP_ANTISYM = []    
-for ww in range(omega+1):
-    for vv in range(ww+1):
-        for uu in range(vv+1):
-            l = uu
-            m = vv - uu
-            n = ww - vv
-            if l+m+n <= omega and l<m:
-                lmn = (l,m,n) 
-                LMN_MAP_ANTISYM.append(lmn) 
+# Basis maps of the three numbering schemes as (N, 3) arrays of (l, m, n), ordered by l+m+n, then l+m, then l.
+# omega comes from the closed-form roots of the basis-size cubics and the maps from a versioned binary cache
+LMN_MAPS = basis_maps(mat_size)
+LMN_MAP_SYM, LMN_MAP_ASYM, LMN_MAP_ANTISYM = LMN_MAPS['SYM'], LMN_MAPS['ASYM'], LMN_MAPS['ANTISYM']
 
+# Reference J-scan builders evaluating one cexprtk expression per (H, J) pair. The production
+# build below is the stencil-driven rr_assembly.build_matrix, which gives the same matrices.
 def mat_build_ASYM(H, mat_size, rrtype):
     '''
 
     '''
-    if rrtype == 'HH':
-        dictionary = RRDictHH
-    elif rrtype == 'SS':
-        dictionary = RRDictSS
+    st, dictionary = reference_expressions(rrtype)
 
     mat_elem_list     = [0] * (mat_size)
 
@@ -184,10 +123,7 @@ def mat_build_ASYM(H, mat_size, rrtype):
     return np.array(mat_elem_list, dtype='longdouble').reshape(mat_size,1)
 
 def mat_build_SYM(H, mat_size, rrtype):
-    if rrtype == 'HH':
-        dictionary = RRDictHH
-    elif rrtype == 'SS':
-        dictionary = RRDictSS
+    st, dictionary = reference_expressions(rrtype)
 
     mat_elem_list = [0] * (mat_size)
     
@@ -238,10 +174,7 @@ def mat_build_SYM(H, mat_size, rrtype):
     return np.array(mat_elem_list, dtype='longdouble').reshape(mat_size,1)
 
 def mat_build_ANTISYM(H, mat_size, rrtype):
-    if rrtype == 'HH':
-        dictionary = RRDictHH
-    elif rrtype == 'SS':
-        dictionary = RRDictSS
+    st, dictionary = reference_expressions(rrtype)
 
     mat_elem_list = [0] * (mat_size)
 
@@ -291,20 +224,63 @@ def mat_build_ANTISYM(H, mat_size, rrtype):
         
     return np.array(mat_elem_list, dtype='longdouble').reshape(mat_size,1)
 
-# Build a list to be used for parallelization in parmap
-Jrange = range(mat_size) # For parmap parallelization
-Jlist = [*Jrange]
-
-start = time.time()
-
-listHH = parmap.map(mat_build_SYM, Jlist, mat_size, 'HH', pm_processes=number_of_workers)
-listSS = parmap.map(mat_build_SYM, Jlist, mat_size, 'SS', pm_processes=number_of_workers)
-
-HHMat = np.hstack(listHH)
-SSMat = np.hstack(listSS)
-#print(HHMat)
-
-end = time.time()
-print("Building of the {} x {} Hamiltonian and Overlap matrices took {} seconds.".format(mat_size, mat_size, end - start))
-ev = -eigvalsh(HHMat, (-1)*SSMat)[-1]
-print(ev)
+# Basis states of the symmetric scheme as arrays for the stencil-driven build
+l_sym, m_sym, n_sym = np.array(LMN_MAP_SYM[:mat_size]).T
+
+# Parameter overrides to solve after the main run, e.g. [{"m3": 206.7682830}] for a muonic system.
+# The sparsity pattern and the index-only factors are built once; each entry only re-evaluates the
+# parameter-dependent coefficients and re-accumulates the matrix values
+PARAMETER_SCAN = []
+
+# Eigensolver for the top eigenpair of HH x = lambda (-SS) x. HH and SS are stored as sparse lower triangles from the
+# start; 'dense' writes the triangles into float64 work arrays for LAPACK's subset-by-index driver, while 'lanczos'
+# or 'lobpcg' solve the sparse matrices directly, which is what lets the basis go past ~10k
+EIGEN_SOLVER = 'dense'
+
+# How the recurrence coefficients are evaluated: None uses the fused NumPy module above, a name from
+# rr_backends.BACKENDS ('numpy', 'numba', 'cython', 'cexprtk') compiles HH and SS with that backend, and 'auto'
+# times every installed backend of rr_backends.AUTO_BACKENDS on both files and takes the fastest one that agrees
+# with NumPy on each.
+# Timings and agreement for one RR file: python rr_backends.py RR_HH.txt --omega 20
+RECURRENCE_BACKEND = None
+
+# Optimise the exponents A, B, C in-process with "nelder-mead", "bobyqa" (needs Py-BOBYQA) or "lbfgs"; None skips it.
+# Repeated points are memoised and each solve is warm-started from the previous eigenvector
+OPTIMISER = None
+
+if __name__ == '__main__':
+    start = time.time()
+
+    # Each recurrence shift is applied to the whole basis at once: O(N x #shifts) instead of an O(N^2) J-scan,
+    # and with the fused module HH and SS come out of the same pass over the basis and symmetry cases
+    if RECURRENCE_BACKEND is None:
+        recurrence_sets = [RRFused]
+    else:
+        rr_paths = [RR_HH_PATH, RR_SS_PATH]
+        backend = select_backend(rr_paths, l_sym, m_sym, n_sym, Global_dict) if RECURRENCE_BACKEND == 'auto' else RECURRENCE_BACKEND
+        print("Evaluating the recurrences with the {} backend.".format(backend))
+        recurrence_sets = [load_backend(backend, path) for path in rr_paths]
+
+    # The SYM scheme fills only J >= H, so HH and SS are kept as sparse lower triangles: neither N x N matrix is
+    # ever allocated in longdouble, and the solver reads the stored triangle directly. The workers take blocks of
+    # source states as they become free and send back the sparse triplets of each block
+    HHMat, SSMat = parallel_fill(recurrence_sets, 'SYM', l_sym, m_sym, n_sym, Global_dict, workers=number_of_workers, dtype=np.longdouble)
+    end = time.time()
+    print("Building of the {} x {} Hamiltonian and Overlap matrices took {} seconds ({} stored nonzeros).".format(mat_size, mat_size, end - start, HHMat.nnz + SSMat.nnz))
+    state = top_eigenpair(HHMat, SSMat, method=EIGEN_SOLVER)
+    ev = state.energy
+    print(ev)
+
+    if PARAMETER_SCAN:
+        structure = cached_structure(RRFused, 'SYM', l_sym, m_sym, n_sym, Global_dict, dtype=np.longdouble)
+        for overrides in PARAMETER_SCAN:
+            start = time.time()
+            HHMat, SSMat = rebuild_matrices(structure, RRFused, {**Global_dict, **overrides})
+            end = time.time()
+            # The previous state is a good starting guess when the overrides are small
+            state = top_eigenpair(HHMat, SSMat, method='lanczos' if EIGEN_SOLVER == 'dense' else EIGEN_SOLVER, guess=state)
+            print("{}: rebuilt in {} seconds, eigenvalue {}".format(overrides, end - start, state.energy))
+
+    if OPTIMISER is not None:
+        with ExponentObjective(RRFused, 'SYM', l_sym, m_sym, n_sym, Global_dict, workers=number_of_workers) as objective:
+            print_optimisation(optimise_exponents(objective, method=OPTIMISER))
@@ -1,13 +1,35 @@
 from __future__ import annotations
 
 import argparse
+import hashlib
+import inspect
 import json
 import math
+import multiprocessing
+import os
 import time
+from collections.abc import Callable, Iterator
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import asdict, dataclass
+from typing import TYPE_CHECKING
 
 import numpy as np
-from scipy.linalg import eig
+from scipy import sparse
+from scipy.linalg import eig, eigh
+from scipy.sparse.csgraph import reverse_cuthill_mckee
+from scipy.sparse.linalg import LinearOperator, eigs, eigsh, lobpcg, splu
+
+from pekeris_basis import (
+    basis_size,
+    canonical_rank,
+    rank_state,
+    shell_offset,
+    symmetric_basis_arrays,
+    unrank_state,
+)
+
+if TYPE_CHECKING:
+    import mpmath
 
 
 @dataclass(frozen=True)
@@ -19,7 +41,25 @@ class SolveResult:
     build_seconds: float
     solve_seconds: float
     total_seconds: float
-    nuclear_charge: int
+    nuclear_charge: float
+    solver: str = "dense"
+    epsilons: tuple[float, ...] = ()
+    build_cached: bool = False
+    refined_epsilon: str | None = None
+    refined_energy_hartree: str | None = None
+    refine_seconds: float = 0.0
+    residuals: tuple[float, ...] = ()
+
+
+@dataclass(frozen=True)
+class ConvergenceResult:
+    target_digits: int
+    omega: int
+    extrapolated_epsilon: float
+    extrapolated_energy_hartree: float
+    estimated_error_hartree: float
+    converged: bool
+    results: list[SolveResult]
 
 
 def symmetric_basis_for_omega(omega: int) -> list[tuple[int, int, int]]:
@@ -62,44 +102,49 @@ def eq22_terms(l: int, m: int, n: int, z: int) -> list[tuple[tuple[int, int, int
         When a=0 the term arises purely from the xL_n coordinate-multiplication identity.
         When b=0 the term arises from the pure L_n'' derivative identity on w.
     """
-    terms: list[tuple[tuple[int, int, int], float, float]] = []
+    return [(shift, float(a), float(b)) for shift, a, b in _eq22_stencil(l, m, n, z)]
 
-    def add(shift: tuple[int, int, int], a: float, b: float) -> None:
-        terms.append((shift, float(a), float(b)))
 
+def _eq22_stencil(l, m, n, z):
+    """Yield the Eq. (22) terms one at a time without converting the coefficients.
+
+    ``l``, ``m`` and ``n`` may be plain integers or integer NumPy arrays of equal
+    shape, in which case every coefficient is evaluated for the whole basis at once.
+    Terms whose ``a`` or ``b`` part vanishes identically yield a scalar ``0``.
+    """
     # +2 shifts: from the xL_n''(x) identity on u, v, and their cross terms
-    add((2, 0, 0), -4 * (l + 1) * (l + 2) * z, 4 * (l + 1) * (l + 2) * (1 + m + n))
-    add((0, 2, 0), -4 * (m + 1) * (m + 2) * z, 4 * (m + 1) * (m + 2) * (1 + l + n))
-    add((1, 1, 0), 4 * (l + 1) * (m + 1) * (1 - 2 * z), 4 * (l + 1) * (m + 1) * (2 + l + m))
-    add((1, 0, 1), 2 * (l + 1) * (n + 1) * (1 - 2 * z), 2 * (l + 1) * (n + 1) * (2 + 2 * m + n))
-    add((0, 1, 1), 2 * (m + 1) * (n + 1) * (1 - 2 * z), 2 * (m + 1) * (n + 1) * (2 + 2 * l + n))
-    add((0, 0, 2), (n + 1) * (n + 2), 0)
+    yield ((2, 0, 0), -4 * (l + 1) * (l + 2) * z, 4 * (l + 1) * (l + 2) * (1 + m + n))
+    yield ((0, 2, 0), -4 * (m + 1) * (m + 2) * z, 4 * (m + 1) * (m + 2) * (1 + l + n))
+    yield ((1, 1, 0), 4 * (l + 1) * (m + 1) * (1 - 2 * z), 4 * (l + 1) * (m + 1) * (2 + l + m))
+    yield ((1, 0, 1), 2 * (l + 1) * (n + 1) * (1 - 2 * z), 2 * (l + 1) * (n + 1) * (2 + 2 * m + n))
+    yield ((0, 1, 1), 2 * (m + 1) * (n + 1) * (1 - 2 * z), 2 * (m + 1) * (n + 1) * (2 + 2 * l + n))
+    yield ((0, 0, 2), (n + 1) * (n + 2), 0)
 
     # +1 shifts: from the xL_n'(x) identity
-    add(
+    yield (
         (1, 0, 0),
         (l + 1) * (4 * z * (4 * l + 4 * m + 2 * n + 7) - 8 * m - 4 * n - 6),
         -2 * (l + 1) * ((m + n) * (4 * m + 12 * l) + n**2 + 12 * l + 18 * m + 15 * n + 14),
     )
-    add(
+    yield (
         (0, 1, 0),
         (m + 1) * (4 * z * (4 * l + 4 * m + 2 * n + 7) - 8 * l - 4 * n - 6),
         -2 * (m + 1) * ((l + n) * (4 * l + 12 * m) + n**2 + 12 * m + 18 * l + 15 * n + 14),
     )
-    add(
+    yield (
         (0, 0, 1),
         4 * (n + 1) * (z * (2 * l + 2 * m + 2) - l - m - n - 2),
         4 * (n + 1) * (l**2 + m**2 - 4 * l * m - 2 * l * n - 2 * m * n - 3 * l - 3 * m - 2 * n - 2),
     )
 
     # mixed +2/-1 shifts: from cross-derivative terms in the perimetric PDE
-    add((0, 2, -1), 0, 4 * (m + 1) * (m + 2) * n)
-    add((2, 0, -1), 0, 4 * (l + 1) * (l + 2) * n)
-    add((-1, 0, 2), 0, 2 * l * (n + 1) * (n + 2))
-    add((0, -1, 2), 0, 2 * m * (n + 1) * (n + 2))
+    yield ((0, 2, -1), 0, 4 * (m + 1) * (m + 2) * n)
+    yield ((2, 0, -1), 0, 4 * (l + 1) * (l + 2) * n)
+    yield ((-1, 0, 2), 0, 2 * l * (n + 1) * (n + 2))
+    yield ((0, -1, 2), 0, 2 * m * (n + 1) * (n + 2))
 
     # diagonal (0,0,0): collects all middle-index contributions from every xL_n identity
-    add(
+    yield (
         (0, 0, 0),
         4 * (2 * l + 1) * (2 * m + 1)
         + 4 * (2 * n + 1) * (l + m + 1)
@@ -118,50 +163,47 @@ def eq22_terms(l: int, m: int, n: int, z: int) -> list[tuple[tuple[int, int, int
     )
 
     # mixed +1/-1 shifts: off-diagonal parts of the cross-derivative PDE terms
-    add((-1, 1, 0), 4 * l * (m + 1) * (1 - 2 * z), 4 * l * (m + 1) * (1 + l + m))
-    add((1, -1, 0), 4 * (l + 1) * m * (1 - 2 * z), 4 * (l + 1) * m * (1 + l + m))
-    add((-1, 0, 1), 2 * l * (n + 1) * (1 - 2 * z), 2 * l * (n + 1) * (2 * m - 4 * l - n))
-    add((0, -1, 1), 2 * m * (n + 1) * (1 - 2 * z), 2 * m * (n + 1) * (2 * l - 4 * m - n))
-    add((1, 0, -1), 2 * (l + 1) * n * (1 - 2 * z), 2 * (l + 1) * n * (2 * m - 4 * l - n - 3))
-    add((0, 1, -1), 2 * (m + 1) * n * (1 - 2 * z), 2 * (m + 1) * n * (2 * l - 4 * m - n - 3))
+    yield ((-1, 1, 0), 4 * l * (m + 1) * (1 - 2 * z), 4 * l * (m + 1) * (1 + l + m))
+    yield ((1, -1, 0), 4 * (l + 1) * m * (1 - 2 * z), 4 * (l + 1) * m * (1 + l + m))
+    yield ((-1, 0, 1), 2 * l * (n + 1) * (1 - 2 * z), 2 * l * (n + 1) * (2 * m - 4 * l - n))
+    yield ((0, -1, 1), 2 * m * (n + 1) * (1 - 2 * z), 2 * m * (n + 1) * (2 * l - 4 * m - n))
+    yield ((1, 0, -1), 2 * (l + 1) * n * (1 - 2 * z), 2 * (l + 1) * n * (2 * m - 4 * l - n - 3))
+    yield ((0, 1, -1), 2 * (m + 1) * n * (1 - 2 * z), 2 * (m + 1) * n * (2 * l - 4 * m - n - 3))
 
     # -1 shifts: lowering terms from the xL_n'(x) identity
-    add(
+    yield (
         (-1, 0, 0),
         2 * l * (-(4 * m + 2 * n + 3) + z * (8 * l + 8 * m + 4 * n + 6)),
         -2 * l * ((m + n + 1) * (12 * l + 4 * m + 2) + n + n**2),
     )
-    add(
+    yield (
         (0, -1, 0),
         2 * m * (-(4 * l + 2 * n + 3) + z * (8 * l + 8 * m + 4 * n + 6)),
         -2 * m * ((l + n + 1) * (12 * m + 4 * l + 2) + n + n**2),
     )
-    add(
+    yield (
         (0, 0, -1),
         4 * n * (-(l + m + n + 1) + z * (2 * l + 2 * m + 2)),
         -4 * n * ((l + m) * (1 + 2 * n - l - m) + 6 * l * m + 2 * n),
     )
 
     # ±2 shifts: from L_n''(x) lowering and mixed cross terms
-    add((1, 0, -2), 0, 2 * n * (n - 1) * (l + 1))
-    add((0, 1, -2), 0, 2 * n * (n - 1) * (m + 1))
-    add((-2, 0, 1), 0, 4 * l * (l - 1) * (n + 1))
-    add((0, -2, 1), 0, 4 * m * (m - 1) * (n + 1))
-    add((-2, 0, 0), -4 * l * (l - 1) * z, 4 * l * (l - 1) * (1 + m + n))
-    add((0, -2, 0), -4 * m * (m - 1) * z, 4 * m * (m - 1) * (1 + l + n))
-    add((0, 0, -2), n * (n - 1), 0)
+    yield ((1, 0, -2), 0, 2 * n * (n - 1) * (l + 1))
+    yield ((0, 1, -2), 0, 2 * n * (n - 1) * (m + 1))
+    yield ((-2, 0, 1), 0, 4 * l * (l - 1) * (n + 1))
+    yield ((0, -2, 1), 0, 4 * m * (m - 1) * (n + 1))
+    yield ((-2, 0, 0), -4 * l * (l - 1) * z, 4 * l * (l - 1) * (1 + m + n))
+    yield ((0, -2, 0), -4 * m * (m - 1) * z, 4 * m * (m - 1) * (1 + l + n))
+    yield ((0, 0, -2), n * (n - 1), 0)
 
     # double -1 shifts: coupling to coefficients lower in two indices simultaneously
-    add((-1, -1, 0), 4 * l * m * (1 - 2 * z), 4 * l * m * (l + m))
-    add((-1, 0, -1), 2 * l * n * (1 - 2 * z), 2 * l * n * (2 * m + n + 1))
-    add((0, -1, -1), 2 * m * n * (1 - 2 * z), 2 * m * n * (2 * l + n + 1))
-
-    return terms
+    yield ((-1, -1, 0), 4 * l * m * (1 - 2 * z), 4 * l * m * (l + m))
+    yield ((-1, 0, -1), 2 * l * n * (1 - 2 * z), 2 * l * n * (2 * m + n + 1))
+    yield ((0, -1, -1), 2 * m * n * (1 - 2 * z), 2 * m * n * (2 * l + n + 1))
 
 
 def build_paper_matrices(omega: int, z: int = 2) -> tuple[np.ndarray, np.ndarray, list[tuple[int, int, int]]]:
     basis = symmetric_basis_for_omega(omega)
-    index = {state: i for i, state in enumerate(basis)}
     size = len(basis)
     a = np.zeros((size, size), dtype=np.float64)
     b = np.zeros((size, size), dtype=np.float64)
@@ -176,81 +218,1261 @@ def build_paper_matrices(omega: int, z: int = 2) -> tuple[np.ndarray, np.ndarray
             if lp + mp + np_ > omega:
                 continue
 
-            state = canonical_singlet_state(lp, mp, np_)
-            col = index.get(state)
-            if col is None:
-                continue
-
+            # Every canonical state inside the truncation is in the basis, so its
+            # Table I position follows arithmetically without a dict lookup.
+            col = rank_state(lp, mp, np_) if lp <= mp else rank_state(mp, lp, np_)
             a[row, col] += const_part
             b[row, col] += linear_part
 
     return a, b, basis
 
 
-def solve_paper_determinant(omega: int, z: int = 2) -> SolveResult:
-    build_start = time.perf_counter()
-    a, b, basis = build_paper_matrices(omega, z=z)
-    build_seconds = time.perf_counter() - build_start
+def _assemble_triplets(
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    omega: int,
+    z: int,
+    row_offset: int = 0,
+    dtype: type = np.float64,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """Evaluate every Eq. (22) term for the rows (l, m, n) and return COO triplets.
 
-    solve_start = time.perf_counter()
-    eigenvalues = eig(-a, b, left=False, right=False, check_finite=False)
-    solve_seconds = time.perf_counter() - solve_start
+    Columns come from the closed-form ``canonical_rank``. Targets outside the
+    truncated basis are dropped exactly as in ``build_paper_matrices``.
+    Row indices start at ``row_offset`` so a slice of the basis can be assembled.
+    With ``dtype=object`` the coefficients are exact Python integers (or
+    whatever type ``z`` has), for assembly in arbitrary precision.
+    """
+    rows_idx = np.arange(row_offset, row_offset + l.size, dtype=np.int64)
+    exact = np.dtype(dtype) == np.dtype(object)
+    stencil_args = (l.astype(object), m.astype(object), n.astype(object)) if exact else (l, m, n)
+    rows: list[np.ndarray] = []
+    cols: list[np.ndarray] = []
+    a_vals: list[np.ndarray] = []
+    b_vals: list[np.ndarray] = []
+
+    for (dl, dm, dn), const_part, linear_part in _eq22_stencil(*stencil_args, z):
+        lp = l + dl
+        mp = m + dm
+        np_ = n + dn
+        keep = (lp >= 0) & (mp >= 0) & (np_ >= 0) & (lp + mp + np_ <= omega)
+        if not keep.any():
+            continue
+
+        lp, mp, np_ = lp[keep], mp[keep], np_[keep]
+        rows.append(rows_idx[keep])
+        cols.append(canonical_rank(lp, mp, np_))
+        a_vals.append(np.broadcast_to(np.asarray(const_part, dtype=dtype), l.shape)[keep])
+        b_vals.append(np.broadcast_to(np.asarray(linear_part, dtype=dtype), l.shape)[keep])
+
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(a_vals), np.concatenate(b_vals)
+
+
+def build_sparse_paper_matrices(
+    omega: int, z: int = 2
+) -> tuple[sparse.csr_matrix, sparse.csr_matrix, list[tuple[int, int, int]]]:
+    """Vectorised equivalent of ``build_paper_matrices`` returning CSR matrices.
+
+    All 33 coefficients are evaluated for the whole basis at once, so each row
+    holds at most 33 nonzeros and no dense ``size x size`` array is allocated.
+    """
+    l, m, n = symmetric_basis_arrays(omega)
+    size = l.size
+    basis = list(zip(l.tolist(), m.tolist(), n.tolist()))
+
+    rows, cols, a_vals, b_vals = _assemble_triplets(l, m, n, omega, z)
+    # Duplicate (row, col) pairs are summed, matching the += of the dense loop.
+    a = sparse.csr_matrix((a_vals, (rows, cols)), shape=(size, size))
+    b = sparse.csr_matrix((b_vals, (rows, cols)), shape=(size, size))
+    return a, b, basis
+
+
+def build_matrices(
+    omega: int, z: int = 2, assembly: str = "dense"
+) -> tuple[np.ndarray | sparse.csr_matrix, np.ndarray | sparse.csr_matrix, list[tuple[int, int, int]]]:
+    """Dispatch to the dense reference loop or the vectorised sparse assembly."""
+    if assembly == "dense":
+        return build_paper_matrices(omega, z=z)
+    if assembly == "sparse":
+        return build_sparse_paper_matrices(omega, z=z)
+    raise ValueError(f"Unknown assembly mode {assembly!r}; expected 'dense' or 'sparse'.")
+
+
+def singlet_weights(l: np.ndarray, m: np.ndarray) -> np.ndarray:
+    """Row weights W that make the Eq. (22) pencil symmetric: 1 if l == m else 2.
+
+    W A and W B are symmetric and W B is positive definite. They count the two
+    orderings of (l, m) folded into each canonical singlet state.
+    """
+    return np.where(l == m, 1.0, 2.0)
 
+
+def _apply_stencil(
+    l: np.ndarray, m: np.ndarray, n: np.ndarray, omega: int, z: int, x: np.ndarray, part: int
+) -> np.ndarray:
+    """Product of A (``part=1``) or B (``part=2``) with ``x``, evaluating Eq. (22) on the fly.
+
+    ``x`` may be a vector or a block of column vectors. Each term touches every
+    row at most once, so the update needs no scatter-add and the only
+    temporaries are a few basis-length arrays.
+    """
+    y = np.zeros(x.shape, dtype=np.result_type(x, np.float64))
+    trailing = (1,) * (x.ndim - 1)
+    for term in _eq22_stencil(l, m, n, z):
+        (dl, dm, dn), coefficient = term[0], term[part]
+        if np.ndim(coefficient) == 0:
+            # Only identically vanishing parts are scalars.
+            continue
+        lp = l + dl
+        mp = m + dm
+        np_ = n + dn
+        keep = (lp >= 0) & (mp >= 0) & (np_ >= 0) & (lp + mp + np_ <= omega)
+        y[keep] += coefficient[keep].reshape(-1, *trailing) * x[canonical_rank(lp[keep], mp[keep], np_[keep])]
+    return y
+
+
+def paper_linear_operators(
+    omega: int, z: int = 2, symmetric: bool = False
+) -> tuple[LinearOperator, LinearOperator]:
+    """Matrix-free A and B: O(N) memory instead of the O(nnz) CSR or O(N^2) dense pencil.
+
+    With ``symmetric=True`` the operators are W A and W B (see ``singlet_weights``),
+    which have the same eigenvalues and plug into symmetric solvers such as LOBPCG.
+    """
+    l, m, n = symmetric_basis_arrays(omega)
+    weights = singlet_weights(l, m) if symmetric else np.ones(l.size)
+
+    def operator(part: int) -> LinearOperator:
+        def apply(x: np.ndarray) -> np.ndarray:
+            y = _apply_stencil(l, m, n, omega, z, x, part)
+            return weights.reshape(-1, *(1,) * (y.ndim - 1)) * y
+
+        return LinearOperator(
+            (l.size, l.size), matvec=apply, matmat=apply, rmatvec=apply if symmetric else None, dtype=np.float64
+        )
+
+    return operator(1), operator(2)
+
+
+def _stencil_digest() -> str:
+    """Hash of the Eq. (22) source, so edits to the recurrence invalidate cached pencils."""
+    return hashlib.sha256(inspect.getsource(_eq22_stencil).encode("utf-8")).hexdigest()[:16]
+
+
+def pencil_cache_stem(cache_dir: str, omega: int, z: float, assembly: str) -> str:
+    """Path prefix of the cached A and B files for one (omega, Z, assembly) pencil.
+
+    Z is written with ``repr`` so that charges differing in any bit get their own files.
+    """
+    return os.path.join(cache_dir, f"pekeris_{assembly}_omega{omega}_Z{float(z)!r}_{_stencil_digest()}")
+
+
+def _write_atomically(path: str, write) -> None:
+    # Concurrent jobs may share a cache directory, so never expose a half-written file.
+    tmp_path = f"{path}.{os.getpid()}.tmp"
+    with open(tmp_path, "wb") as handle:
+        write(handle)
+    os.replace(tmp_path, path)
+
+
+def cached_build_matrices(
+    omega: int, z: float = 2, assembly: str = "dense", cache_dir: str | None = None
+) -> tuple[np.ndarray | sparse.csr_matrix, np.ndarray | sparse.csr_matrix, list[tuple[int, int, int]], bool]:
+    """``build_matrices`` backed by a content-addressed on-disk cache.
+
+    Dense pencils are stored as ``.npy`` and reopened with ``mmap_mode="r"``;
+    sparse pencils are stored as uncompressed ``.npz``. The final flag reports
+    whether the pencil came from the cache.
+    """
+    if cache_dir is None:
+        return (*build_matrices(omega, z=z, assembly=assembly), False)
+
+    stem = pencil_cache_stem(cache_dir, omega, z, assembly)
+    suffix = ".npy" if assembly == "dense" else ".npz"
+    a_path, b_path = f"{stem}_a{suffix}", f"{stem}_b{suffix}"
+
+    if os.path.exists(a_path) and os.path.exists(b_path):
+        if assembly == "dense":
+            a, b = np.load(a_path, mmap_mode="r"), np.load(b_path, mmap_mode="r")
+        else:
+            a, b = sparse.load_npz(a_path).tocsr(), sparse.load_npz(b_path).tocsr()
+        l, m, n = symmetric_basis_arrays(omega)
+        return a, b, list(zip(l.tolist(), m.tolist(), n.tolist())), True
+
+    a, b, basis = build_matrices(omega, z=z, assembly=assembly)
+    os.makedirs(cache_dir, exist_ok=True)
+    for path, matrix in ((a_path, a), (b_path, b)):
+        if assembly == "dense":
+            _write_atomically(path, lambda handle, matrix=matrix: np.save(handle, matrix))
+        else:
+            _write_atomically(path, lambda handle, matrix=matrix: sparse.save_npz(handle, matrix, compressed=False))
+    return a, b, basis, False
+
+
+def _top_positive_epsilons(eigenvalues: np.ndarray, roots: int) -> np.ndarray:
+    """Return the ``roots`` largest positive real eigenvalues in descending order."""
     finite = eigenvalues[np.isfinite(eigenvalues)]
     real = finite[np.abs(finite.imag) < 1.0e-9].real
     positive = real[real > 0]
     if positive.size == 0:
         raise RuntimeError("No positive real epsilon eigenvalue was found.")
+    return np.sort(positive)[::-1][:roots]
+
+
+def default_shift(z: float) -> float:
+    """First Arnoldi shift: epsilon < Z because E > -Z^2 without electron repulsion.
+
+    Shifting from above keeps the ground-state root nearest the shift even for
+    H-, where many pseudo-continuum roots crowd just below it.
+    """
+    return float(z)
+
+
+def _solve_dense(a: np.ndarray, b: np.ndarray, roots: int) -> np.ndarray:
+    if sparse.issparse(a):
+        a, b = a.toarray(), b.toarray()
+    eigenvalues = eig(-a, b, left=False, right=False, check_finite=False)
+    return _top_positive_epsilons(eigenvalues, roots)
+
+
+ORDERINGS = ("colamd", "natural", "mmd", "rcm")
+
+# RCM permutations by basis size (equivalently by omega); the pattern does not depend on Z.
+_RCM_PERMUTATIONS: dict[int, np.ndarray] = {}
+
+
+def rcm_permutation(a: sparse.csr_matrix, b: sparse.csr_matrix) -> np.ndarray:
+    """Reverse Cuthill-McKee ordering of the pencil pattern, computed once per basis size.
+
+    Table I orders states shell by shell, which puts the +-2 shifts of Eq. (22)
+    about one shell width away from the diagonal. RCM pulls them back into a
+    narrow band.
+    """
+    size = a.shape[0]
+    if size not in _RCM_PERMUTATIONS:
+        pattern = (abs(sparse.csr_matrix(a)) + abs(sparse.csr_matrix(b))).tocsr()
+        _RCM_PERMUTATIONS[size] = reverse_cuthill_mckee(pattern, symmetric_mode=True)
+    return _RCM_PERMUTATIONS[size]
+
+
+def _factor_pencil(
+    a: sparse.csr_matrix, b: sparse.csr_matrix, shift: float, ordering: str = "colamd"
+) -> tuple[Callable[[np.ndarray], np.ndarray], object]:
+    """Sparse LU of -A - shift B; returns a solve acting in Table I order, and the LU object.
+
+    ``colamd``, ``natural`` and ``mmd`` are SuperLU's own column orderings. ``rcm``
+    permutes the basis symmetrically before factorising with the natural
+    ordering, and the returned solve maps vectors in and out of that order.
+    """
+    shifted = -a - shift * b
+    if ordering == "rcm":
+        permutation = rcm_permutation(a, b)
+        lu = splu(shifted[permutation][:, permutation].tocsc(), permc_spec="NATURAL")
+
+        def solve(x: np.ndarray) -> np.ndarray:
+            y = np.empty_like(x, dtype=np.result_type(x, np.float64))
+            y[permutation] = lu.solve(x[permutation])
+            return y
+
+        return solve, lu
+
+    permc_specs = {"colamd": "COLAMD", "natural": "NATURAL", "mmd": "MMD_AT_PLUS_A"}
+    if ordering not in permc_specs:
+        raise ValueError(f"Unknown ordering {ordering!r}; expected one of {ORDERINGS}.")
+    lu = splu(shifted.tocsc(), permc_spec=permc_specs[ordering])
+    return lu.solve, lu
+
+
+def _bandwidth(matrix: sparse.csr_matrix) -> int:
+    coo = matrix.tocoo()
+    return int(np.max(np.abs(coo.row - coo.col))) if coo.nnz else 0
+
+
+def factorization_report(omega: int, z: int = 2, shift: float | None = None) -> list[dict[str, float | int | str]]:
+    """Bandwidth, LU fill-in and factorisation time of -A - shift B for every ordering."""
+    a, b, _ = build_sparse_paper_matrices(omega, z=z)
+    shift = default_shift(z) if shift is None else shift
+    pattern_nnz = (abs(a) + abs(b)).nnz
+    report = []
+    for ordering in ORDERINGS:
+        start = time.perf_counter()
+        _, lu = _factor_pencil(a, b, shift, ordering)
+        seconds = time.perf_counter() - start
+        if ordering == "rcm":
+            permutation = rcm_permutation(a, b)
+            bandwidth = _bandwidth((abs(a) + abs(b))[permutation][:, permutation])
+        else:
+            bandwidth = _bandwidth(abs(a) + abs(b))
+        fill = lu.L.nnz + lu.U.nnz
+        report.append(
+            {
+                "ordering": ordering,
+                "bandwidth": bandwidth,
+                "pencil_nnz": pattern_nnz,
+                "lu_nnz": fill,
+                "fill_ratio": fill / pattern_nnz,
+                "factor_seconds": seconds,
+            }
+        )
+    return report
+
+
+def _solve_arnoldi(
+    a: sparse.csr_matrix,
+    b: sparse.csr_matrix,
+    shift: float,
+    roots: int,
+    v0: np.ndarray | None = None,
+    ordering: str = "colamd",
+) -> tuple[np.ndarray, np.ndarray]:
+    """Shift-invert Arnoldi on the pencil -A x = epsilon B x.
+
+    With one sparse LU of (-A - shift B), ARPACK finds the largest eigenvalues
+    nu of (-A - shift B)^-1 B, which are the epsilons closest to the shift via
+    epsilon = shift + 1 / nu. ``v0`` optionally seeds the Krylov space with a
+    guess for the top eigenvector, and ``ordering`` picks the fill-reducing
+    ordering of the LU. Returns the epsilons and their eigenvectors.
+    """
+    a = sparse.csr_matrix(a)
+    b = sparse.csr_matrix(b)
+    size = a.shape[0]
+    # ARPACK needs k < size - 1; tiny pencils are cheaper to solve densely anyway.
+    wanted = min(roots + 2, size - 2)
+    if wanted < roots:
+        return _solve_dense(a, b, roots), np.empty((size, 0))
+
+    solve, _ = _factor_pencil(a, b, shift, ordering)
+    operator = LinearOperator((size, size), matvec=lambda x: solve(b @ x), dtype=np.float64)
+    nu, vectors = eigs(operator, k=wanted, which="LM", v0=v0)
+    epsilons = shift + 1.0 / nu
+
+    top = _top_positive_epsilons(epsilons, roots)
+    order = [int(np.argmin(np.abs(epsilons - value))) for value in top]
+    return top, vectors[:, order].real
+
+
+def _eigenvector_at(a: np.ndarray | sparse.csr_matrix, b: np.ndarray | sparse.csr_matrix, epsilon: float) -> np.ndarray:
+    """Eigenvector of -A x = epsilon B x for a known root, for solvers that return only eigenvalues.
+
+    One shift-invert Arnoldi step at epsilon recovers it. Pencils too small for
+    ARPACK are solved densely and the eigenvector of the nearest root is taken.
+    """
+    _, vectors = _solve_arnoldi(a, b, epsilon, 1)
+    if vectors.shape[1]:
+        return vectors[:, 0]
+    if sparse.issparse(a):
+        a, b = a.toarray(), b.toarray()
+    eigenvalues, vectors = eig(-a, b, check_finite=False)
+    return vectors[:, int(np.nanargmin(np.abs(eigenvalues - epsilon)))].real
+
+
+def _solve_matrix_free(
+    omega: int,
+    z: int,
+    roots: int,
+    v0: np.ndarray | None = None,
+    tolerance: float = 1.0e-8,
+    max_iterations: int = 5000,
+) -> tuple[np.ndarray, np.ndarray]:
+    """Top epsilons from the matrix-free operators, keeping peak memory O(N).
+
+    After the singlet weighting, (-W A) x = epsilon (W B) x is a symmetric-definite
+    pencil whose largest eigenvalue is the ground-state epsilon. LOBPCG finds it
+    from operator products alone. It is preconditioned with the inverse diagonal
+    of -W A - Z W B, taken from the (0, 0, 0) term of Eq. (22). ``v0`` seeds the
+    first block column, e.g. with the eigenvector of a smaller omega.
+    """
+    minus_a, b = paper_linear_operators(omega, z=z, symmetric=True)
+    minus_a = -minus_a
+    l, m, n = symmetric_basis_arrays(omega)
+    _, const_part, linear_part = next(term for term in _eq22_stencil(l, m, n, z) if term[0] == (0, 0, 0))
+    preconditioner = sparse.diags(1.0 / np.abs(singlet_weights(l, m) * (-const_part - z * linear_part)))
+
+    block = np.random.default_rng(0).standard_normal((l.size, roots + 2))
+    if v0 is not None:
+        block[:, 0] = v0
+    epsilons, vectors = lobpcg(
+        minus_a, block, B=b, M=preconditioner, largest=True, tol=tolerance, maxiter=max_iterations
+    )
+    top = _top_positive_epsilons(epsilons.astype(np.complex128), roots)
+    order = [int(np.argmin(np.abs(epsilons - value))) for value in top]
+    return top, vectors[:, order]
+
+
+def _solve_lanczos(
+    a: np.ndarray | sparse.csr_matrix,
+    b: np.ndarray | sparse.csr_matrix,
+    shift: float,
+    roots: int,
+    ordering: str = "colamd",
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """The ``roots`` highest epsilons and eigenvectors from one sparse factorisation.
+
+    With the singlet weights the pencil (-W A, W B) is symmetric-definite, so
+    shift-invert Lanczos (ARPACK via ``eigsh``) factors -W A - shift W B once
+    and extracts a whole block of roots below the shift. Each root's relative
+    residual ||(A + epsilon B) x|| / (|epsilon| ||B x||) is returned as its
+    convergence measure. Pencils too small for ARPACK to return ``roots``
+    pairs are solved densely, and a pencil with fewer than ``roots`` positive
+    roots returns all it has.
+    """
+    a = sparse.csr_matrix(a)
+    b = sparse.csr_matrix(b)
+    size = a.shape[0]
+    l, m, _ = unrank_state(np.arange(size))
+    weights = sparse.diags(singlet_weights(l, m))
+    weighted_a, weighted_b = weights @ a, weights @ b
+    # A few spare Ritz pairs keep the wanted roots away from the edge of the Krylov block.
+    wanted = min(roots + 3, size - 1)
+    if wanted < roots:
+        epsilons, vectors = eigh(-weighted_a.toarray(), weighted_b.toarray(), check_finite=False)
+    else:
+        solve, _ = _factor_pencil(weighted_a, weighted_b, shift, ordering)
+        inverse = LinearOperator((size, size), matvec=solve, dtype=np.float64)
+        epsilons, vectors = eigsh(-weighted_a, k=wanted, M=weighted_b, sigma=shift, which="LM", OPinv=inverse)
+
+    top = _top_positive_epsilons(epsilons.astype(np.complex128), roots)
+    order = [int(np.argmin(np.abs(epsilons - value))) for value in top]
+    vectors = vectors[:, order]
+    b_vectors = b @ vectors
+    residuals = np.linalg.norm(a @ vectors + b_vectors * top, axis=0) / (top * np.linalg.norm(b_vectors, axis=0))
+    return top, vectors, residuals
+
+
+def solve_excited_states(
+    omega: int, z: int = 2, roots: int = 3, shift: float | None = None
+) -> tuple[SolveResult, np.ndarray]:
+    """Ground and excited 1S roots (1^1S, 2^1S, 3^1S, ...) with eigenvectors from one factorisation.
+
+    Returns the ``SolveResult`` (with ``epsilons`` and per-root ``residuals``)
+    and the eigenvectors as the columns of an array, in Table I order.
+    """
+    build_start = time.perf_counter()
+    a, b, basis = build_sparse_paper_matrices(omega, z=z)
+    build_seconds = time.perf_counter() - build_start
+
+    solve_start = time.perf_counter()
+    epsilons, vectors, residuals = _solve_lanczos(a, b, default_shift(z) if shift is None else shift, roots)
+    solve_seconds = time.perf_counter() - solve_start
+
+    epsilon = float(epsilons[0])
+    result = SolveResult(
+        omega=omega,
+        basis_size=len(basis),
+        epsilon=epsilon,
+        energy_hartree=-(epsilon**2),
+        build_seconds=build_seconds,
+        solve_seconds=solve_seconds,
+        total_seconds=build_seconds + solve_seconds,
+        nuclear_charge=z,
+        solver="lanczos",
+        epsilons=tuple(float(value) for value in epsilons),
+        residuals=tuple(float(value) for value in residuals),
+    )
+    return result, vectors
 
-    epsilon = float(np.max(positive))
+
+def _bordered_jacobian(
+    a: sparse.csr_matrix, b: sparse.csr_matrix, epsilon: float, x: np.ndarray, pivot: int
+) -> Callable[[np.ndarray], np.ndarray]:
+    """LU solve of the bordered Newton Jacobian [[A + epsilon B, B x], [e_pivot^T, 0]].
+
+    Shared by ``refine_epsilon`` and the ``continuation_scan`` corrector.
+    """
+    size = a.shape[0]
+    unit = sparse.csr_matrix(([1.0], ([0], [pivot])), shape=(1, size))
+    bordered = sparse.bmat([[a + epsilon * b, sparse.csr_matrix((b @ x).reshape(-1, 1))], [unit, None]])
+    return splu(bordered.tocsc()).solve
+
+
+def _import_mpmath():
+    try:
+        import mpmath
+    except ImportError as exc:
+        raise RuntimeError("Extended-precision refinement requires mpmath (pip install mpmath).") from exc
+    return mpmath
+
+
+def refine_epsilon(
+    a: np.ndarray | sparse.csr_matrix,
+    b: np.ndarray | sparse.csr_matrix,
+    omega: int,
+    z: int,
+    epsilon: float,
+    vector: np.ndarray,
+    digits: int = 30,
+    max_iterations: int = 30,
+) -> tuple[mpmath.mpf, int]:
+    """Refine a float64 root of det(A + epsilon B) = 0 to ``digits`` significant digits.
+
+    Newton's method on (A + epsilon B) x = 0 with x[k] = 1 fixed at the largest
+    component of ``vector``. The residual is formed with the recurrence matrix
+    assembled in mpmath precision (exact integer coefficients for integer Z),
+    while corrections come from one float64 sparse LU of the bordered Jacobian
+    [[A + epsilon B, B x], [e_k^T, 0]]. This mixed-precision chord iteration
+    gains roughly the float64 digits per step, each step costing two
+    high-precision sparse products. Returns the refined epsilon as an
+    ``mpmath.mpf`` and the number of iterations used.
+    """
+    mpmath = _import_mpmath()
+
+    a = sparse.csr_matrix(a)
+    b = sparse.csr_matrix(b)
+    size = a.shape[0]
+    pivot = int(np.argmax(np.abs(vector)))
+    x64 = vector / vector[pivot]
+
+    jacobian = _bordered_jacobian(a, b, epsilon, x64, pivot)
+
+    with mpmath.workdps(digits + 10):
+        charge = int(z) if float(z).is_integer() else mpmath.mpf(z)
+        l, m, n = symmetric_basis_arrays(omega)
+        rows, cols, a_vals, b_vals = _assemble_triplets(l, m, n, omega, charge, dtype=object)
+        order = np.argsort(rows, kind="stable")
+        rows, cols = rows[order], cols[order]
+        a_vals = np.array([mpmath.mpf(value) for value in a_vals[order]], dtype=object)
+        b_vals = np.array([mpmath.mpf(value) for value in b_vals[order]], dtype=object)
+        starts = np.flatnonzero(np.r_[True, rows[1:] != rows[:-1]])
+
+        eps = mpmath.mpf(epsilon)
+        x = np.array([mpmath.mpf(value) for value in x64], dtype=object)
+        tolerance = mpmath.mpf(10) ** (-digits) * abs(eps)
+        for iteration in range(1, max_iterations + 1):
+            gathered = x[cols]
+            residual = np.add.reduceat(a_vals * gathered, starts) + eps * np.add.reduceat(b_vals * gathered, starts)
+            correction = jacobian(np.append(-residual.astype(np.float64), 0.0))
+            x = x + correction[:size].astype(object)
+            eps += correction[size]
+            if abs(correction[size]) <= tolerance:
+                return +eps, iteration
+
+    raise RuntimeError(f"Refinement did not reach {digits} digits in {max_iterations} iterations.")
+
+
+def _refine_top(
+    a: np.ndarray | sparse.csr_matrix,
+    b: np.ndarray | sparse.csr_matrix,
+    omega: int,
+    z: float,
+    epsilon: float,
+    vectors: np.ndarray | None,
+    digits: int,
+) -> tuple[str, str]:
+    """The top epsilon and energy refined by ``refine_epsilon``, as strings of ``digits`` significant digits."""
+    mpmath = _import_mpmath()
+
+    # The dense path, and Arnoldi on a tiny pencil, return no eigenvector.
+    vector = vectors[:, 0] if vectors is not None and vectors.shape[1] else _eigenvector_at(a, b, epsilon)
+    refined, _ = refine_epsilon(a, b, omega, z, epsilon, vector, digits=digits)
+    return mpmath.nstr(refined, digits), mpmath.nstr(-(refined**2), digits)
+
+
+def solve_paper_determinant(
+    omega: int,
+    z: float = 2,
+    assembly: str = "dense",
+    solver: str = "dense",
+    shift: float | None = None,
+    roots: int = 1,
+    cache_dir: str | None = None,
+    refine_digits: int | None = None,
+    ordering: str = "colamd",
+) -> SolveResult:
+    """Solve det(A + epsilon B) = 0 for the largest positive epsilon.
+
+    ``solver="dense"`` computes every generalised eigenvalue with LAPACK.
+    ``solver="arnoldi"`` only finds the ``roots`` epsilons nearest ``shift``
+    (by default the upper bound Z) via sparse shift-invert Arnoldi.
+    With ``cache_dir`` the assembled pencil is reused across runs, and with
+    ``refine_digits`` the top epsilon is polished by ``refine_epsilon``.
+    ``ordering`` selects the fill-reducing ordering of the shift-invert LU.
+    """
+    build_start = time.perf_counter()
+    if solver == "matrix-free":
+        # Nothing is assembled; the stencil is evaluated inside every product.
+        size, build_cached = basis_size(omega), False
+    else:
+        a, b, basis, build_cached = cached_build_matrices(omega, z=z, assembly=assembly, cache_dir=cache_dir)
+        size = len(basis)
+    build_seconds = time.perf_counter() - build_start
+
+    solve_start = time.perf_counter()
+    vectors = None
+    residuals = ()
+    if solver == "dense":
+        epsilons = _solve_dense(a, b, roots)
+    elif solver == "arnoldi":
+        epsilons, vectors = _solve_arnoldi(
+            a, b, default_shift(z) if shift is None else shift, roots, ordering=ordering
+        )
+    elif solver == "lanczos":
+        epsilons, vectors, residuals = _solve_lanczos(
+            a, b, default_shift(z) if shift is None else shift, roots, ordering=ordering
+        )
+    elif solver == "matrix-free":
+        epsilons, vectors = _solve_matrix_free(omega, z, roots)
+    else:
+        raise ValueError(f"Unknown solver {solver!r}; expected 'dense', 'arnoldi', 'lanczos' or 'matrix-free'.")
+    solve_seconds = time.perf_counter() - solve_start
+
+    epsilon = float(epsilons[0])
     energy_hartree = -(epsilon**2)
 
+    refined_epsilon = refined_energy_hartree = None
+    refine_seconds = 0.0
+    if refine_digits is not None:
+        refine_start = time.perf_counter()
+        if solver == "matrix-free":
+            # Refinement factors the float64 pencil, so it has to be assembled here.
+            a, b, _ = build_sparse_paper_matrices(omega, z=z)
+        refined_epsilon, refined_energy_hartree = _refine_top(a, b, omega, z, epsilon, vectors, refine_digits)
+        refine_seconds = time.perf_counter() - refine_start
+
     return SolveResult(
         omega=omega,
-        basis_size=len(basis),
+        basis_size=size,
         epsilon=epsilon,
         energy_hartree=energy_hartree,
         build_seconds=build_seconds,
         solve_seconds=solve_seconds,
-        total_seconds=build_seconds + solve_seconds,
+        total_seconds=build_seconds + solve_seconds + refine_seconds,
         nuclear_charge=z,
+        solver=solver if ordering == "colamd" or solver in ("dense", "matrix-free") else f"{solver}+{ordering}",
+        epsilons=tuple(float(value) for value in epsilons),
+        build_cached=build_cached,
+        refined_epsilon=refined_epsilon,
+        refined_energy_hartree=refined_energy_hartree,
+        refine_seconds=refine_seconds,
+        residuals=tuple(float(value) for value in residuals),
+    )
+
+
+def benchmark(
+    omegas: list[int],
+    z: int = 2,
+    assembly: str | None = None,
+    solver: str | None = None,
+    roots: int = 1,
+    incremental: bool = False,
+    cache_dir: str | None = None,
+    refine_digits: int | None = None,
+    ordering: str = "colamd",
+) -> list[SolveResult]:
+    """Solve each omega in turn; the Arnoldi solver shifts at the previous omega's epsilon.
+
+    ``assembly`` and ``solver`` default to ``"dense"``. ``incremental=True``
+    grows one sparse pencil with ``iter_incremental_ladder`` instead. That
+    always means sparse assembly, the Arnoldi solver and no pencil cache, so
+    any other ``assembly``, ``solver`` or ``cache_dir`` is rejected; ``roots``,
+    ``refine_digits`` and ``ordering`` are passed through.
+    """
+    if incremental:
+        if assembly not in (None, "sparse") or solver not in (None, "arnoldi") or cache_dir is not None:
+            raise ValueError(
+                "The incremental ladder always uses sparse assembly, the Arnoldi solver and no pencil cache."
+            )
+        return incremental_benchmark(omegas, z=z, roots=roots, refine_digits=refine_digits, ordering=ordering)
+    assembly = assembly or "dense"
+    solver = solver or "dense"
+
+    results: list[SolveResult] = []
+    shift = None
+    for omega in omegas:
+        result = solve_paper_determinant(
+            omega,
+            z=z,
+            assembly=assembly,
+            solver=solver,
+            shift=shift,
+            roots=roots,
+            cache_dir=cache_dir,
+            refine_digits=refine_digits,
+            ordering=ordering,
+        )
+        results.append(result)
+        shift = result.epsilon
+    return results
+
+
+def incremental_benchmark(
+    omegas: list[int],
+    z: int = 2,
+    roots: int = 1,
+    refine_digits: int | None = None,
+    ordering: str = "colamd",
+) -> list[SolveResult]:
+    """Convergence table computed with ``iter_incremental_ladder``."""
+    return list(iter_incremental_ladder(omegas, z=z, roots=roots, refine_digits=refine_digits, ordering=ordering))
+
+
+def iter_incremental_ladder(
+    omegas: list[int],
+    z: int = 2,
+    roots: int = 1,
+    refine_digits: int | None = None,
+    ordering: str = "colamd",
+) -> Iterator[SolveResult]:
+    """Yield results while growing one sparse pencil along an increasing omega ladder.
+
+    The basis for omega is a prefix of the basis for any larger omega, and the
+    block coupling two old states never changes. Each step therefore assembles
+    only the new rows plus the new columns of the old rows in the top two
+    shells (Eq. (22) raises l + m + n by at most 2). The Arnoldi solve is
+    warm-started from the previous epsilon and eigenvector, and uses the
+    fill-reducing ``ordering``. With ``refine_digits`` each top epsilon is
+    polished by ``refine_epsilon``.
+    """
+    ladder = sorted(set(omegas))
+    l, m, n = symmetric_basis_arrays(ladder[-1])
+
+    triplets: list[tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]] = []
+    previous_omega = -1
+    previous_size = 0
+    shift = default_shift(z)
+    v0 = None
+
+    for omega in ladder:
+        build_start = time.perf_counter()
+        size = basis_size(omega)
+
+        edge = shell_offset(max(previous_omega - 1, 0))
+        if edge < previous_size:
+            rows, cols, a_vals, b_vals = _assemble_triplets(
+                l[edge:previous_size], m[edge:previous_size], n[edge:previous_size], omega, z, row_offset=edge
+            )
+            new_cols = cols >= previous_size
+            triplets.append((rows[new_cols], cols[new_cols], a_vals[new_cols], b_vals[new_cols]))
+        triplets.append(
+            _assemble_triplets(
+                l[previous_size:size], m[previous_size:size], n[previous_size:size], omega, z,
+                row_offset=previous_size,
+            )
+        )
+
+        rows, cols, a_vals, b_vals = (np.concatenate(part) for part in zip(*triplets))
+        a = sparse.csr_matrix((a_vals, (rows, cols)), shape=(size, size))
+        b = sparse.csr_matrix((b_vals, (rows, cols)), shape=(size, size))
+        build_seconds = time.perf_counter() - build_start
+
+        solve_start = time.perf_counter()
+        if v0 is not None:
+            # Pad the previous eigenvector with zeros for the newly added states.
+            v0 = np.concatenate([v0, np.zeros(size - v0.size)])
+        epsilons, vectors = _solve_arnoldi(a, b, shift, roots, v0=v0, ordering=ordering)
+        solve_seconds = time.perf_counter() - solve_start
+
+        epsilon = float(epsilons[0])
+        refined_epsilon = refined_energy_hartree = None
+        refine_seconds = 0.0
+        if refine_digits is not None:
+            refine_start = time.perf_counter()
+            refined_epsilon, refined_energy_hartree = _refine_top(a, b, omega, z, epsilon, vectors, refine_digits)
+            refine_seconds = time.perf_counter() - refine_start
+
+        yield SolveResult(
+            omega=omega,
+            basis_size=size,
+            epsilon=epsilon,
+            energy_hartree=-(epsilon**2),
+            build_seconds=build_seconds,
+            solve_seconds=solve_seconds,
+            total_seconds=build_seconds + solve_seconds + refine_seconds,
+            nuclear_charge=z,
+            solver="arnoldi" if ordering == "colamd" else f"arnoldi+{ordering}",
+            epsilons=tuple(float(value) for value in epsilons),
+            refined_epsilon=refined_epsilon,
+            refined_energy_hartree=refined_energy_hartree,
+            refine_seconds=refine_seconds,
+        )
+
+        shift = epsilon
+        v0 = vectors[:, 0] if vectors.shape[1] else None
+        previous_omega, previous_size = omega, size
+
+
+def aitken_extrapolate(e0: float, e1: float, e2: float) -> float:
+    """Aitken delta-squared limit of three consecutive terms of a sequence."""
+    denominator = (e2 - e1) - (e1 - e0)
+    if denominator == 0.0:
+        return e2
+    return e2 - (e2 - e1) ** 2 / denominator
+
+
+def converge_to_digits(
+    target_digits: int, z: int = 2, omega_start: int = 5, omega_max: int = 60, safety: float = 2.0
+) -> ConvergenceResult:
+    """Increase omega until the extrapolated energy is stable to ``target_digits``.
+
+    Energies come from the incremental ladder. After each omega the last three
+    energies are Aitken-extrapolated. The remaining error of the extrapolated
+    sequence is estimated from its last two differences as a geometric tail,
+    |dx_k| r / (1 - r) with r = |dx_k / dx_(k-1)|. Pekeris energies converge
+    algebraically rather than geometrically, so a plain difference of successive
+    extrapolants would stop too early. Even the tail estimate runs 1.2-1.8 times
+    below the true error for helium, so it is multiplied by ``safety``, and the
+    ladder only stops once the result is below 10^-target_digits |E| at two
+    consecutive omegas.
+    """
+    results: list[SolveResult] = []
+    extrapolated: list[float] = []
+    error = math.inf
+    passes = 0
+
+    for result in iter_incremental_ladder(list(range(omega_start, omega_max + 1)), z=z):
+        results.append(result)
+        if len(results) >= 3:
+            extrapolated.append(aitken_extrapolate(*(r.energy_hartree for r in results[-3:])))
+        if len(extrapolated) >= 3:
+            last, previous = extrapolated[-1] - extrapolated[-2], extrapolated[-2] - extrapolated[-3]
+            ratio = abs(last / previous) if previous else 0.0
+            error = safety * abs(last) * ratio / (1.0 - ratio) if ratio < 1.0 else math.inf
+            passes = passes + 1 if error <= 10.0 ** (-target_digits) * abs(extrapolated[-1]) else 0
+            if passes >= 2:
+                break
+
+    energy = extrapolated[-1] if extrapolated else results[-1].energy_hartree
+    return ConvergenceResult(
+        target_digits=target_digits,
+        omega=results[-1].omega,
+        extrapolated_epsilon=math.sqrt(-energy),
+        extrapolated_energy_hartree=energy,
+        estimated_error_hartree=error,
+        converged=passes >= 2,
+        results=results,
     )
 
 
-def benchmark(omegas: list[int], z: int = 2) -> list[SolveResult]:
-    return [solve_paper_determinant(omega, z=z) for omega in omegas]
+def continuation_scan(
+    omega: int,
+    charges: list[float],
+    tolerance: float = 1e-10,
+    max_iterations: int = 6,
+    max_step: float = 0.05,
+    min_step: float = 1e-6,
+    ordering: str = "colamd",
+) -> list[SolveResult]:
+    """Follow the top epsilon and its eigenvector through an ordered list of nuclear charges.
+
+    Only A depends on Z, and only linearly: A(Z) = A0 + Z A1. One sparse build at
+    Z = 0 and Z = 1 therefore serves the whole scan. The first charge is solved
+    cold by shift-invert Lanczos. Each later step predicts epsilon and the
+    eigenvector (normalised to x[pivot] = 1) by secant extrapolation through the
+    previous two accepted points. The first step uses the Hellmann-Feynman slope
+    d epsilon / dZ instead. The prediction is corrected by chord Newton on
+    (A + epsilon B) x = 0, as in ``refine_epsilon``. The bordered Jacobian is
+    factorised only when the iteration stalls, so most steps cost a few
+    triangular solves and no new LU.
+
+    If a freshly factorised corrector misses ``tolerance`` within
+    ``max_iterations``, or lands on a different eigenvector, the step is halved.
+    After an easy step the step doubles, up to ``max_step``. Intermediate steps
+    are taken as needed, but only the requested charges are returned, and
+    ``residuals`` holds each point's relative residual.
+    """
+    build_start = time.perf_counter()
+    a0, b, basis = build_sparse_paper_matrices(omega, z=0)
+    a1 = build_sparse_paper_matrices(omega, z=1)[0] - a0
+    l, m, _ = symmetric_basis_arrays(omega)
+    weights = singlet_weights(l, m)
+    build_seconds = time.perf_counter() - build_start
+
+    results: list[SolveResult] = []
+
+    def record(z: float, epsilon: float, residual: float, seconds: float, solver: str) -> None:
+        build = build_seconds if not results else 0.0
+        results.append(
+            SolveResult(
+                omega=omega,
+                basis_size=len(basis),
+                epsilon=epsilon,
+                energy_hartree=-(epsilon**2),
+                build_seconds=build,
+                solve_seconds=seconds,
+                total_seconds=build + seconds,
+                nuclear_charge=z,
+                solver=solver,
+                epsilons=(epsilon,),
+                residuals=(residual,),
+            )
+        )
+
+    solve_start = time.perf_counter()
+    z = float(charges[0])
+    epsilons, vectors, residuals = _solve_lanczos(a0 + z * a1, b, default_shift(z), 1, ordering=ordering)
+    x = vectors[:, 0]
+    pivot = int(np.argmax(np.abs(x)))
+    history = [(z, float(epsilons[0]), x / x[pivot])]
+    record(z, history[0][1], float(residuals[0]), time.perf_counter() - solve_start, "lanczos")
+    jacobian = None
+    step = max_step
+
+    for target in charges[1:]:
+        solve_start = time.perf_counter()
+        target = float(target)
+        while z != target:
+            h = math.copysign(min(step, abs(target - z)), target - z)
+            z_new = target if abs(target - z - h) < min_step else z + h
+
+            z_previous, epsilon_previous, x_previous = history[-1]
+            if len(history) >= 2:
+                z_before, epsilon_before, x_before = history[-2]
+                slope = (z_new - z_previous) / (z_previous - z_before)
+                epsilon_guess = epsilon_previous + slope * (epsilon_previous - epsilon_before)
+                x_guess = x_previous + slope * (x_previous - x_before)
+            else:
+                # Hellmann-Feynman on the symmetric pencil: d epsilon / dZ = -x^T W A1 x / x^T W B x.
+                weighted_x = weights * x_previous
+                derivative = -(weighted_x @ (a1 @ x_previous)) / (weighted_x @ (b @ x_previous))
+                epsilon_guess = epsilon_previous + (z_new - z_previous) * derivative
+                x_guess = x_previous
+
+            a = a0 + z_new * a1
+            fresh = jacobian is None
+            if fresh:
+                jacobian = _bordered_jacobian(a, b, epsilon_guess, x_guess, pivot)
+
+            x_new, epsilon_new, residual = x_guess, epsilon_guess, math.inf
+            for iteration in range(max_iterations + 1):
+                b_x = b @ x_new
+                r = a @ x_new + epsilon_new * b_x
+                residual = float(np.linalg.norm(r) / (abs(epsilon_new) * np.linalg.norm(b_x)))
+                if residual <= tolerance or iteration == max_iterations:
+                    break
+                correction = jacobian(np.append(-r, 0.0))
+                x_new = x_new + correction[:-1]
+                epsilon_new += correction[-1]
+
+            overlap = abs(x_new @ x_guess) / (np.linalg.norm(x_new) * np.linalg.norm(x_guess))
+            if residual > tolerance or overlap < 0.9:
+                # A stale Jacobian gets one refactorisation before the step itself is blamed.
+                jacobian = None
+                if fresh:
+                    step = abs(h) / 2.0
+                    if step < min_step:
+                        raise RuntimeError(
+                            f"Continuation stalled at Z={z:.8g}: step fell below {min_step:g} "
+                            f"(residual {residual:.1e}, overlap {overlap:.3f})."
+                        )
+                continue
+
+            history = [history[-1], (z_new, float(epsilon_new), x_new)]
+            z = z_new
+            if iteration <= 2:
+                step = min(2.0 * abs(h), max_step)
+            elif iteration >= max_iterations // 2:
+                # Slow chord convergence: refactorise at the next step rather than risk a rejection.
+                jacobian = None
+
+        record(z, history[-1][1], residual, time.perf_counter() - solve_start, "continuation")
+
+    return results
+
+
+def is_bound(z: float, epsilon: float) -> bool:
+    """Whether E = -epsilon^2 lies below the one-electron threshold -Z^2 / 2 of the parent ion."""
+    return epsilon**2 > z**2 / 2.0
+
+
+# Environment variables read by the common BLAS/OpenMP runtimes when they start.
+BLAS_THREAD_VARIABLES = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+
+def _completed_points(jsonl_path: str) -> set[tuple[int, int]]:
+    """(Z, omega) pairs already written to a sweep file by an earlier, possibly interrupted, run."""
+    if not os.path.exists(jsonl_path):
+        return set()
+    done = set()
+    with open(jsonl_path, encoding="utf-8") as handle:
+        for line in handle:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                # A run killed mid-write can leave a truncated last line.
+                continue
+            done.add((record["nuclear_charge"], record["omega"]))
+    return done
+
+
+def _terminate_partial_line(jsonl_path: str) -> None:
+    """End a truncated last line, so the next appended record starts a line of its own."""
+    if not os.path.exists(jsonl_path) or os.path.getsize(jsonl_path) == 0:
+        return
+    with open(jsonl_path, "rb+") as handle:
+        handle.seek(-1, os.SEEK_END)
+        if handle.read(1) != b"\n":
+            handle.write(b"\n")
+
+
+def sweep(
+    charges: list[int],
+    omegas: list[int],
+    jsonl_path: str,
+    workers: int | None = None,
+    blas_threads: int = 1,
+    assembly: str = "sparse",
+    solver: str = "arnoldi",
+    roots: int = 1,
+    cache_dir: str | None = None,
+) -> list[SolveResult]:
+    """Solve every (Z, omega) pair on a process pool, streaming results as JSON lines.
+
+    Each result is appended and flushed as soon as it completes, and pairs
+    already present in ``jsonl_path`` are skipped, so an interrupted sweep can
+    simply be restarted. Workers are spawned with the BLAS thread count capped
+    at ``blas_threads`` so ``workers`` processes do not oversubscribe the CPUs.
+    The largest omegas are submitted first to keep the pool busy at the end.
+    """
+    done = _completed_points(jsonl_path)
+    _terminate_partial_line(jsonl_path)
+    points = sorted(
+        ((z, omega) for z in charges for omega in omegas if (z, omega) not in done),
+        key=lambda point: point[1],
+        reverse=True,
+    )
+
+    # Thread caps must be in the environment before numpy is imported, which
+    # for spawned workers happens after the pool is created.
+    saved = {name: os.environ.get(name) for name in BLAS_THREAD_VARIABLES}
+    os.environ.update({name: str(blas_threads) for name in BLAS_THREAD_VARIABLES})
+    results: list[SolveResult] = []
+    try:
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool, open(
+            jsonl_path, "a", encoding="utf-8"
+        ) as handle:
+            futures = [
+                pool.submit(
+                    solve_paper_determinant,
+                    omega,
+                    z=z,
+                    assembly=assembly,
+                    solver=solver,
+                    roots=roots,
+                    cache_dir=cache_dir,
+                )
+                for z, omega in points
+            ]
+            for future in as_completed(futures):
+                result = future.result()
+                handle.write(json.dumps(asdict(result)) + "\n")
+                handle.flush()
+                results.append(result)
+    finally:
+        for name, value in saved.items():
+            if value is None:
+                os.environ.pop(name, None)
+            else:
+                os.environ[name] = value
+
+    return sorted(results, key=lambda result: (result.nuclear_charge, result.omega))
 
 
 def print_results(results: list[SolveResult]) -> None:
-    print(" omega  size    epsilon        energy / Ha        build / s   solve / s   total / s")
+    print(" omega  size    epsilon        energy / Ha        build / s   solve / s   total / s  solver")
     for result in results:
         print(
             f"{result.omega:>6d} {result.basis_size:>5d} "
             f"{result.epsilon:>12.9f} {result.energy_hartree:>16.12f} "
             f"{result.build_seconds:>10.4f} {result.solve_seconds:>10.4f} "
-            f"{result.total_seconds:>10.4f}"
+            f"{result.total_seconds:>10.4f}  {result.solver}{' (cached build)' if result.build_cached else ''}"
         )
 
+    multi_root = [result for result in results if len(result.epsilons) > 1]
+    if multi_root:
+        print("\n omega  root    epsilon        energy / Ha       residual")
+        for result in multi_root:
+            residuals = result.residuals or (math.nan,) * len(result.epsilons)
+            for root, (epsilon, residual) in enumerate(zip(result.epsilons, residuals), start=1):
+                print(f"{result.omega:>6d} {root:>5d} {epsilon:>12.9f} {-(epsilon**2):>16.12f} {residual:>12.2e}")
+
+    refined = [result for result in results if result.refined_epsilon is not None]
+    if refined:
+        print("\n omega  refined epsilon / refined energy / Ha   refine / s")
+        for result in refined:
+            print(f"{result.omega:>6d}  {result.refined_epsilon}  {result.refine_seconds:>10.4f}")
+            print(f"        {result.refined_energy_hartree}")
+
 
 def parse_args() -> argparse.Namespace:
     parser = argparse.ArgumentParser(
         description="Direct implementation of Pekeris' 1958 Eq. (22) recurrence for the helium ground state."
     )
     parser.add_argument("--omega", type=int, default=10, help="Polynomial order omega from Pekeris Table III.")
-    parser.add_argument("--Z", type=int, default=2, help="Nuclear charge. Helium is Z=2.")
+    parser.add_argument("--Z", type=float, default=2, help="Nuclear charge. Helium is Z=2; non-integer values are allowed.")
     parser.add_argument("--benchmark", type=int, nargs="*", help="Run several omega values and print a convergence table.")
+    parser.add_argument(
+        "--assembly",
+        choices=("dense", "sparse"),
+        help="Matrix assembly: the dense reference loop (default) or the vectorised sparse CSR build.",
+    )
+    parser.add_argument(
+        "--solver",
+        choices=("dense", "arnoldi", "lanczos", "matrix-free"),
+        help=(
+            "Eigensolver: full dense QZ (default), sparse shift-invert Arnoldi for the top epsilons only, "
+            "symmetric shift-invert Lanczos with per-root residuals, or matrix-free LOBPCG with O(N) memory."
+        ),
+    )
+    parser.add_argument("--shift", type=float, help="Arnoldi shift; defaults to the upper bound epsilon < Z.")
+    parser.add_argument("--roots", type=int, default=1, help="Number of top positive epsilons to report.")
+    parser.add_argument(
+        "--ordering",
+        choices=ORDERINGS,
+        default="colamd",
+        help="Fill-reducing ordering of the shift-invert LU; rcm reorders the basis by reverse Cuthill-McKee.",
+    )
+    parser.add_argument(
+        "--fill-report",
+        action="store_true",
+        help="Compare LU fill-in, bandwidth and factorisation time of every ordering at --omega (or each --benchmark omega).",
+    )
+    parser.add_argument(
+        "--incremental",
+        action="store_true",
+        help=(
+            "Grow one sparse pencil along the --benchmark omegas and warm-start each Arnoldi solve "
+            "(implies --assembly sparse --solver arnoldi)."
+        ),
+    )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Directory of cached A/B pencils keyed by omega, Z and the Eq. (22) source hash.",
+    )
+    parser.add_argument(
+        "--sweep-Z",
+        type=int,
+        nargs="+",
+        help="Solve every listed Z at every --benchmark omega (or --omega) on a process pool.",
+    )
+    parser.add_argument(
+        "--continuation",
+        type=float,
+        nargs=2,
+        metavar=("Z_START", "Z_STOP"),
+        help="Follow the top root at --omega through --points evenly spaced non-integer charges.",
+    )
+    parser.add_argument("--points", type=int, default=101, help="Number of charges in a --continuation scan.")
+    parser.add_argument("--workers", type=int, help="Worker processes for --sweep-Z (default: CPU count).")
+    parser.add_argument("--blas-threads", type=int, default=1, help="BLAS threads per --sweep-Z worker.")
+    parser.add_argument("--jsonl", type=str, help="Sweep output; one SolveResult per line, appended as it completes.")
+    parser.add_argument(
+        "--refine-digits",
+        type=int,
+        help="Refine the top epsilon to this many significant digits with mixed-precision Newton (needs mpmath).",
+    )
+    parser.add_argument(
+        "--target-digits",
+        type=int,
+        help="Raise omega adaptively until the Aitken-extrapolated energy is stable to this many digits.",
+    )
+    parser.add_argument("--omega-max", type=int, default=60, help="Largest omega tried by --target-digits.")
     parser.add_argument("--json", type=str, help="Optional output path for machine-readable results.")
-    return parser.parse_args()
+    args = parser.parse_args()
+    if args.sweep_Z and not args.jsonl:
+        parser.error("--sweep-Z requires --jsonl")
+    if args.incremental:
+        if args.assembly not in (None, "sparse") or args.solver not in (None, "arnoldi"):
+            parser.error("--incremental always uses --assembly sparse --solver arnoldi")
+        if args.cache_dir:
+            parser.error("--incremental grows its pencil in memory and cannot use --cache-dir")
+        args.assembly, args.solver = "sparse", "arnoldi"
+    args.assembly = args.assembly or "dense"
+    args.solver = args.solver or "dense"
+    return args
+
+
+def print_continuation(results: list[SolveResult]) -> None:
+    print("        Z     epsilon        energy / Ha       residual   solve / s  bound")
+    for result in results:
+        z = result.nuclear_charge
+        print(
+            f"{z:>9.5f} {result.epsilon:>12.9f} {result.energy_hartree:>16.12f} "
+            f"{result.residuals[0]:>12.2e} {result.solve_seconds:>10.4f}  {'yes' if is_bound(z, result.epsilon) else 'no'}"
+        )
+    print(f"\nTotal time: {sum(result.total_seconds for result in results):.3f} s for {len(results)} charges")
+
+
+def print_fill_report(omegas: list[int], z: int, shift: float | None = None) -> None:
+    print(" omega  ordering  bandwidth  pencil nnz     LU nnz   fill x   factor / s")
+    for omega in omegas:
+        for row in factorization_report(omega, z=z, shift=shift):
+            print(
+                f"{omega:>6d}  {row['ordering']:<8s} {row['bandwidth']:>10d} {row['pencil_nnz']:>11d} "
+                f"{row['lu_nnz']:>10d} {row['fill_ratio']:>8.2f} {row['factor_seconds']:>12.4f}"
+            )
 
 
 def main() -> None:
     args = parse_args()
-    if args.benchmark:
-        results = benchmark(args.benchmark, z=args.Z)
+    if args.fill_report:
+        print_fill_report(args.benchmark or [args.omega], args.Z, args.shift)
+        return
+    if args.continuation:
+        charges = np.linspace(*args.continuation, args.points).tolist()
+        results = continuation_scan(args.omega, charges, ordering=args.ordering)
+        print_continuation(results)
+    elif args.sweep_Z:
+        results = sweep(
+            args.sweep_Z,
+            args.benchmark or [args.omega],
+            args.jsonl,
+            workers=args.workers,
+            blas_threads=args.blas_threads,
+            assembly=args.assembly,
+            solver=args.solver,
+            roots=args.roots,
+            cache_dir=args.cache_dir,
+        )
+        for z in sorted({result.nuclear_charge for result in results}):
+            print(f"\nZ = {z}")
+            print_results([result for result in results if result.nuclear_charge == z])
+    elif args.target_digits:
+        convergence = converge_to_digits(args.target_digits, z=args.Z, omega_max=args.omega_max)
+        results = convergence.results
+        print_results(results)
+        status = "converged" if convergence.converged else f"NOT converged by omega={args.omega_max}"
+        print(
+            f"\nExtrapolated to {args.target_digits} digits ({status}) at omega={convergence.omega}:"
+            f"\n  epsilon = {convergence.extrapolated_epsilon:.15f}"
+            f"\n  energy  = {convergence.extrapolated_energy_hartree:.15f} Ha"
+            f" (estimated error {convergence.estimated_error_hartree:.1e} Ha)"
+        )
+    elif args.benchmark:
+        results = benchmark(
+            args.benchmark,
+            z=args.Z,
+            assembly=args.assembly,
+            solver=args.solver,
+            roots=args.roots,
+            incremental=args.incremental,
+            cache_dir=args.cache_dir,
+            refine_digits=args.refine_digits,
+            ordering=args.ordering,
+        )
+        print_results(results)
     else:
-        results = [solve_paper_determinant(args.omega, z=args.Z)]
-
-    print_results(results)
+        results = [
+            solve_paper_determinant(
+                args.omega,
+                z=args.Z,
+                assembly=args.assembly,
+                solver=args.solver,
+                shift=args.shift,
+                roots=args.roots,
+                cache_dir=args.cache_dir,
+                refine_digits=args.refine_digits,
+                ordering=args.ordering,
+            )
+        ]
+        print_results(results)
 
     if args.json:
         with open(args.json, "w", encoding="utf-8") as handle:
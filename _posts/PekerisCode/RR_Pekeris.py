@@ -1,120 +1,23 @@
+"""Scalar recurrence coefficients HHrr(lam, mu, nu, l, m, n, m1, m2, m3, Z1, Z2, Z3, A, B, C, ...).
 
-def HHrr(lam, mu, nu, l, m, n, m1, m2, m3, Z1, Z2, Z3, A, B, C):
-	if (lam, mu, nu) == (0, 0, 0):
-		ANS = 
-	elif (lam, mu, nu) == (0, 0, -2):
-		ANS = 
-	elif (lam, mu, nu) == (0, 0, -1):
-		ANS = 
-	elif (lam, mu, nu) == (0, 0, 1):
-		ANS = 
-	elif (lam, mu, nu) == (0, 0, 2):
-		ANS = 
-	elif (lam, mu, nu) == (0, -2, 0):
-		ANS = 
-	elif (lam, mu, nu) == (0, -2, -1):
-		ANS = 
-	elif (lam, mu, nu) == (0, -2, 1):
-		ANS = 
-	elif (lam, mu, nu) == (0, -1, 0):
-		ANS = 
-	elif (lam, mu, nu) == (0, -1, -2):
-		ANS = 
-	elif (lam, mu, nu) == (0, -1, -1):
-		ANS = 
-	elif (lam, mu, nu) == (0, -1, 1):
-		ANS = 
-	elif (lam, mu, nu) == (0, -1, 2):
-		ANS = 
-	elif (lam, mu, nu) == (0, 1, 0):
-		ANS = 
-	elif (lam, mu, nu) == (0, 1, -2):
-		ANS = 
-	elif (lam, mu, nu) == (0, 1, -1):
-		ANS = 
-	elif (lam, mu, nu) == (0, 1, 1):
-		ANS = 
-	elif (lam, mu, nu) == (0, 1, 2):
-		ANS = 
-	elif (lam, mu, nu) == (0, 2, 0):
-		ANS = 
-	elif (lam, mu, nu) == (0, 2, -1):
-		ANS = 
-	elif (lam, mu, nu) == (0, 2, 1):
-		ANS = 
-	elif (lam, mu, nu) == (-2, 0, 0):
-		ANS = 
-	elif (lam, mu, nu) == (-2, 0, -1):
-		ANS = 
-	elif (lam, mu, nu) == (-2, 0, 1):
-		ANS = 
-	elif (lam, mu, nu) == (-2, -1, 0):
-		ANS = 
-	elif (lam, mu, nu) == (-2, 1, 0):
-		ANS = 
-	elif (lam, mu, nu) == (-1, 0, 0):
-		ANS = 
-	elif (lam, mu, nu) == (-1, 0, -2):
-		ANS = 
-	elif (lam, mu, nu) == (-1, 0, -1):
-		ANS = 
-	elif (lam, mu, nu) == (-1, 0, 1):
-		ANS = 
-	elif (lam, mu, nu) == (-1, 0, 2):
-		ANS = 
-	elif (lam, mu, nu) == (-1, -2, 0):
-		ANS = 
-	elif (lam, mu, nu) == (-1, -1, 0):
-		ANS = 
-	elif (lam, mu, nu) == (-1, -1, -1):
-		ANS = 
-	elif (lam, mu, nu) == (-1, -1, 1):
-		ANS = 
-	elif (lam, mu, nu) == (-1, 1, 0):
-		ANS = 
-	elif (lam, mu, nu) == (-1, 1, -1):
-		ANS = 
-	elif (lam, mu, nu) == (-1, 1, 1):
-		ANS = 
-	elif (lam, mu, nu) == (-1, 2, 0):
-		ANS = 
-	elif (lam, mu, nu) == (1, 0, 0):
-		ANS = 
-	elif (lam, mu, nu) == (1, 0, -2):
-		ANS = 
-	elif (lam, mu, nu) == (1, 0, -1):
-		ANS = 
-	elif (lam, mu, nu) == (1, 0, 1):
-		ANS = 
-	elif (lam, mu, nu) == (1, 0, 2):
-		ANS = 
-	elif (lam, mu, nu) == (1, -2, 0):
-		ANS = 
-	elif (lam, mu, nu) == (1, -1, 0):
-		ANS = 
-	elif (lam, mu, nu) == (1, -1, -1):
-		ANS = 
-	elif (lam, mu, nu) == (1, -1, 1):
-		ANS = 
-	elif (lam, mu, nu) == (1, 1, 0):
-		ANS = 
-	elif (lam, mu, nu) == (1, 1, -1):
-		ANS = 
-	elif (lam, mu, nu) == (1, 1, 1):
-		ANS = 
-	elif (lam, mu, nu) == (1, 2, 0):
-		ANS = 
-	elif (lam, mu, nu) == (2, 0, 0):
-		ANS = 
-	elif (lam, mu, nu) == (2, 0, -1):
-		ANS = 
-	elif (lam, mu, nu) == (2, 0, 1):
-		ANS = 
-	elif (lam, mu, nu) == (2, -1, 0):
-		ANS = 
-	elif (lam, mu, nu) == (2, 1, 0):
-		ANS = 
-	else:
-		ANS =
+This used to be a 57-branch if/elif skeleton on (lam, mu, nu), with the branch
+bodies to be pasted in from Maple. The bodies now come straight from the
+Maple output. ``rr_codegen.load_dispatch`` compiles RR_HH.txt into a cached
+module with one dict lookup per shift, and ``HHrow`` computes the
+subexpressions shared by all shifts of a row once per row.
+"""
 
-	return ANS
\ No newline at end of file
+import os
+
+from rr_codegen import load_dispatch
+
+RR_HH_PATH = os.path.expanduser('~/Postdoc/post_doc_2019/3Body2/3Body2FC/RR_HH.txt')
+
+_dispatch = load_dispatch({'HH': RR_HH_PATH})
+
+# HHrr(lam, mu, nu, l, m, n, m1, m2, m3, Z1, Z2, Z3, A, B, C), then any further RR parameters in ARGUMENTS order.
+HHrr = _dispatch.HHrr
+# Every shift's coefficient at one (l, m, n), in ROW_SHIFTS order.
+HHrow = _dispatch.HHrow
+ROW_SHIFTS = _dispatch.ROW_SHIFTS['HH']
+ARGUMENTS = _dispatch.ARGUMENTS
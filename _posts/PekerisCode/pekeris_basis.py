@@ -0,0 +1,68 @@
+"""Closed-form indexing of the Pekeris singlet basis in Table I ordering.
+
+The symmetric basis lists every (l, m, n) with l <= m and l + m + n <= omega,
+ordered by the shell w = l + m + n, then by s = l + m, then by l. Counting the
+states in each block gives exact integer formulas, so a state's position can be
+computed arithmetically instead of looked up in a ``{state: i}`` dict.
+
+Every function accepts Python integers or integer NumPy arrays.
+"""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def pair_offset(s):
+    """Number of states in a shell with l + m < s, i.e. sum_{t<s} (floor(t/2) + 1)."""
+    return s + (s - 1) ** 2 // 4
+
+
+def shell_offset(w):
+    """Number of basis states with l + m + n < w."""
+    # sum_{j<w} floor(j^2 / 4) = (sum_{j<w} j^2 - #odd j < w) / 4
+    return w * (w + 1) // 2 + ((w - 1) * w * (2 * w - 1) // 6 - w // 2) // 4
+
+
+def basis_size(omega):
+    """Size of the symmetric basis for polynomial order omega."""
+    return shell_offset(omega + 1)
+
+
+def rank_state(l, m, n):
+    """Table I position of the canonical state (l, m, n), which must satisfy l <= m."""
+    s = l + m
+    return shell_offset(s + n) + pair_offset(s) + l
+
+
+def canonical_rank(l, m, n):
+    """Position of (l, m, n) after swapping l and m into canonical singlet order."""
+    return rank_state(np.minimum(l, m), np.maximum(l, m), n)
+
+
+def _invert_increasing(offset, target, guess):
+    """Largest integer k with offset(k) <= target, starting from a close estimate."""
+    k = np.maximum(np.asarray(guess, dtype=np.int64), 0)
+    target = np.asarray(target, dtype=np.int64)
+    # The float estimates are within a couple of steps of the answer, so these loops are bounded.
+    while np.any(too_high := offset(k) > target):
+        k = np.where(too_high, k - 1, k)
+    while np.any(too_low := offset(k + 1) <= target):
+        k = np.where(too_low, k + 1, k)
+    return k
+
+
+def unrank_state(index):
+    """Inverse of ``rank_state``: the (l, m, n) arrays at the given Table I positions."""
+    index = np.asarray(index, dtype=np.int64)
+    # shell_offset(w) ~ w^3 / 12 and pair_offset(s) ~ s^2 / 4 for large arguments.
+    w = _invert_increasing(shell_offset, index, np.floor(np.cbrt(12.0 * index)) - 1)
+    rest = index - shell_offset(w)
+    s = _invert_increasing(pair_offset, rest, np.floor(2.0 * np.sqrt(rest)) - 1)
+    l = rest - pair_offset(s)
+    return l, s - l, w - s
+
+
+def symmetric_basis_arrays(omega: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Array form of ``symmetric_basis_for_omega`` built without Python loops."""
+    return unrank_state(np.arange(basis_size(omega), dtype=np.int64))
@@ -0,0 +1,249 @@
+"""Scaling benchmark and regression check for Pekeris.py.
+
+Each omega is solved several times to get the median and spread of the build
+and solve phases. One extra solve runs in a fresh process to measure its peak
+resident memory and the peak of the allocations traced by ``tracemalloc``
+(NumPy arrays included, SuperLU/ARPACK workspaces not). Empirical scaling
+exponents are fitted against the basis size, and the medians and memory peaks
+are compared with a stored baseline JSON.
+
+    python pekeris_bench.py --omegas 10 15 20 25 --repeats 5 --save-baseline base.json
+    python pekeris_bench.py --omegas 10 15 20 25 --repeats 5 --baseline base.json --threshold 0.2
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import multiprocessing
+import resource
+import sys
+import tracemalloc
+from dataclasses import asdict, dataclass
+
+import numpy as np
+
+from Pekeris import ORDERINGS, build_sparse_paper_matrices, solve_paper_determinant
+
+# Run settings a baseline must share with the current run for its timings to be comparable.
+CONFIGURATION_KEYS = ("assembly", "solver", "ordering", "Z")
+
+
+@dataclass(frozen=True)
+class PhaseStats:
+    median: float
+    minimum: float
+    maximum: float
+    iqr: float
+
+
+@dataclass(frozen=True)
+class ScalingPoint:
+    omega: int
+    basis_size: int
+    nnz: int
+    dense_bytes: int
+    epsilon: float
+    build: PhaseStats
+    solve: PhaseStats
+    total: PhaseStats
+    peak_rss_mib: float
+    peak_traced_mib: float
+
+
+@dataclass(frozen=True)
+class Regression:
+    omega: int
+    phase: str
+    baseline: float
+    current: float
+    ratio: float
+
+
+def phase_stats(samples: list[float]) -> PhaseStats:
+    q1, median, q3 = np.percentile(samples, [25, 50, 75])
+    return PhaseStats(median=float(median), minimum=min(samples), maximum=max(samples), iqr=float(q3 - q1))
+
+
+def _max_rss_mib() -> float:
+    # ru_maxrss is in KiB on Linux but in bytes on macOS.
+    scale = 1024.0 * 1024.0 if sys.platform == "darwin" else 1024.0
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / scale
+
+
+def _peak_memory_child(omega: int, z: float, assembly: str, solver: str, ordering: str) -> tuple[float, float]:
+    tracemalloc.start()
+    solve_paper_determinant(omega, z=z, assembly=assembly, solver=solver, ordering=ordering)
+    _, traced_peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return _max_rss_mib(), traced_peak / (1024.0 * 1024.0)
+
+
+def peak_memory_mib(
+    omega: int, z: float, assembly: str, solver: str, ordering: str = "colamd"
+) -> tuple[float, float]:
+    """Peak RSS and peak traced allocations of one solve, in a fresh process so earlier runs do not mask them."""
+    with multiprocessing.get_context("spawn").Pool(1) as pool:
+        return pool.apply(_peak_memory_child, (omega, z, assembly, solver, ordering))
+
+
+def measure(
+    omega: int,
+    z: float = 2,
+    repeats: int = 5,
+    assembly: str = "sparse",
+    solver: str = "arnoldi",
+    ordering: str = "colamd",
+) -> ScalingPoint:
+    results = [
+        solve_paper_determinant(omega, z=z, assembly=assembly, solver=solver, ordering=ordering)
+        for _ in range(repeats)
+    ]
+    a, b, basis = build_sparse_paper_matrices(omega, z=z)
+    peak_rss, peak_traced = peak_memory_mib(omega, z, assembly, solver, ordering)
+    return ScalingPoint(
+        omega=omega,
+        basis_size=len(basis),
+        nnz=a.nnz + b.nnz,
+        dense_bytes=2 * len(basis) ** 2 * np.dtype(np.float64).itemsize,
+        epsilon=results[0].epsilon,
+        build=phase_stats([result.build_seconds for result in results]),
+        solve=phase_stats([result.solve_seconds for result in results]),
+        total=phase_stats([result.total_seconds for result in results]),
+        peak_rss_mib=peak_rss,
+        peak_traced_mib=peak_traced,
+    )
+
+
+def scaling_exponents(points: list[ScalingPoint]) -> dict[str, float]:
+    """Least-squares slopes of log(cost) against log(basis size)."""
+    if len(points) < 2:
+        return {}
+    log_size = np.log([point.basis_size for point in points])
+    series = {
+        "build": [point.build.median for point in points],
+        "solve": [point.solve.median for point in points],
+        "total": [point.total.median for point in points],
+        "peak_traced": [point.peak_traced_mib for point in points],
+    }
+    return {name: float(np.polyfit(log_size, np.log(values), 1)[0]) for name, values in series.items()}
+
+
+def configuration_mismatches(baseline: dict, configuration: dict) -> dict[str, tuple]:
+    """``{key: (baseline value, current value)}`` for every run setting that differs from the baseline."""
+    return {
+        key: (baseline.get(key), configuration[key])
+        for key in CONFIGURATION_KEYS
+        if baseline.get(key) != configuration[key]
+    }
+
+
+def compare_to_baseline(
+    points: list[ScalingPoint], baseline: dict, threshold: float, configuration: dict
+) -> list[Regression]:
+    """Phases whose median exceeds the baseline median by more than ``threshold`` (a fraction).
+
+    Timings are only comparable between runs of the same ``configuration``
+    (assembly, solver, ordering and Z); a baseline recorded with different
+    settings raises ``ValueError``.
+    """
+    mismatches = configuration_mismatches(baseline, configuration)
+    if mismatches:
+        details = ", ".join(f"{key}: baseline {old!r}, current {new!r}" for key, (old, new) in mismatches.items())
+        raise ValueError(f"Baseline was recorded with a different configuration ({details}).")
+    reference = {entry["omega"]: entry for entry in baseline["points"]}
+    regressions = []
+    for point in points:
+        if point.omega not in reference:
+            continue
+        for phase in ("build", "solve", "total"):
+            old = reference[point.omega][phase]["median"]
+            new = getattr(point, phase).median
+            if old > 0 and new > old * (1.0 + threshold):
+                regressions.append(Regression(point.omega, phase, old, new, new / old))
+        for memory in ("peak_rss_mib", "peak_traced_mib"):
+            old = reference[point.omega][memory]
+            new = getattr(point, memory)
+            if old > 0 and new > old * (1.0 + threshold):
+                regressions.append(Regression(point.omega, memory, old, new, new / old))
+    return regressions
+
+
+def print_report(points: list[ScalingPoint], exponents: dict[str, float]) -> None:
+    print(" omega  size      nnz   build med/iqr (s)    solve med/iqr (s)   RSS / MiB  traced / MiB")
+    for point in points:
+        print(
+            f"{point.omega:>6d} {point.basis_size:>5d} {point.nnz:>8d} "
+            f"{point.build.median:>9.4f} {point.build.iqr:>8.4f} "
+            f"{point.solve.median:>10.4f} {point.solve.iqr:>8.4f} "
+            f"{point.peak_rss_mib:>10.1f} {point.peak_traced_mib:>13.2f}"
+        )
+    if exponents:
+        print("\nScaling exponents in basis size N (cost ~ N^p):")
+        for name, exponent in exponents.items():
+            print(f"  {name:<11s} p = {exponent:.2f}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Scaling benchmark and regression check for Pekeris.py.")
+    parser.add_argument("--omegas", type=int, nargs="+", default=[10, 15, 20, 25], help="Omega values to time.")
+    parser.add_argument("--Z", type=float, default=2, help="Nuclear charge; non-integer values are allowed.")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed solves per omega.")
+    parser.add_argument("--assembly", choices=("dense", "sparse"), default="sparse")
+    parser.add_argument("--solver", choices=("dense", "arnoldi", "lanczos", "matrix-free"), default="arnoldi")
+    parser.add_argument("--ordering", choices=ORDERINGS, default="colamd", help="Fill-reducing ordering of the LU.")
+    parser.add_argument("--baseline", type=str, help="Baseline JSON written earlier with --save-baseline.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.25, help="Allowed slowdown over the baseline median, as a fraction."
+    )
+    parser.add_argument("--save-baseline", type=str, help="Write this run as a baseline JSON.")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    configuration = {"assembly": args.assembly, "solver": args.solver, "ordering": args.ordering, "Z": args.Z}
+    points = [
+        measure(
+            omega, z=args.Z, repeats=args.repeats, assembly=args.assembly, solver=args.solver, ordering=args.ordering
+        )
+        for omega in args.omegas
+    ]
+    exponents = scaling_exponents(points)
+    print_report(points, exponents)
+
+    if args.save_baseline:
+        with open(args.save_baseline, "w", encoding="utf-8") as handle:
+            json.dump(
+                {
+                    **configuration,
+                    "points": [asdict(point) for point in points],
+                    "exponents": exponents,
+                },
+                handle,
+                indent=2,
+            )
+        print(f"\nSaved baseline to {args.save_baseline}")
+
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as handle:
+            baseline = json.load(handle)
+        try:
+            regressions = compare_to_baseline(points, baseline, args.threshold, configuration)
+        except ValueError as exc:
+            print(f"\n{args.baseline}: {exc}")
+            sys.exit(2)
+        if not regressions:
+            print(f"\nNo regressions beyond {args.threshold:.0%} of {args.baseline}.")
+            return
+        print(f"\nRegressions beyond {args.threshold:.0%} of {args.baseline}:")
+        for regression in regressions:
+            print(
+                f"  omega={regression.omega:<4d} {regression.phase:<15s} "
+                f"{regression.baseline:.4g} -> {regression.current:.4g} ({regression.ratio:.2f}x)"
+            )
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,449 @@
+"""Stencil-driven sparse assembly of the MatrixGeneratorGS Hamiltonian and overlap matrices.
+
+``mat_build_SYM`` and friends scan every column J >= H of a row H and look
+the difference (Lp - L, Mp - M, Np - N) up in the recurrence dictionary, which
+is O(N^2) dictionary misses to find O(N x #shifts) nonzeros. Here the loop runs
+the other way round. Each shift (lambda, mu, nu) of the recurrence is applied to
+a whole block of source states at once. Its targets (l + lambda, m + mu,
+n + nu) go through a dense index table, and the survivors are emitted as COO
+triplets. The three numbering schemes differ only in their triangle, in whether
+the l <-> m exchanged term is added, and in the weights of the two terms
+(``SCHEMES``). They share one code path.
+
+Triplets are (J, H, value) with J the target and H the source state. This is
+the layout produced by ``np.hstack`` of the per-H columns returned by the
+``mat_build_*`` functions, so the matrices agree element for element.
+
+A fused recurrence module (``rr_codegen.load_fused_recurrences``) builds HH and
+SS in the same pass. The index lookups, triangle tests and symmetry weights are
+done once per shift, and one call returns the coefficients of both matrices.
+
+For parameter sweeps (masses, charges, exponents) nothing above depends on
+the parameters except the coefficient values. ``assembly_structure`` keeps the
+pattern, the weights and the monomials l^a m^b n^c of each polynomial shift.
+``rebuild_matrices`` then only evaluates a few parameter-only coefficients per
+shift and takes a matrix product with the stored monomials. Whether that sum
+cancels badly depends on the parameters, so every rebuild bounds its rounding
+error and evaluates a shift directly wherever the bound is too large.
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+from collections.abc import Iterator
+from dataclasses import dataclass
+from types import ModuleType
+
+import numpy as np
+from scipy import sparse
+
+from rr_codegen import evaluate_fused, evaluate_shift, load_generated
+
+
+@dataclass(frozen=True)
+class Scheme:
+    # "lower" keeps targets J >= H (SYM, ANTISYM), "upper" keeps J <= H (ASYM).
+    triangle: str
+    # Whether the l <-> m exchanged term is added for rows and columns with l != m,
+    # and the direct term halved between two states that both have l == m.
+    exchange: bool
+    direct_weight: float
+    exchange_weight: float
+
+
+SCHEMES = {
+    "SYM": Scheme(triangle="lower", exchange=True, direct_weight=1.0, exchange_weight=1.0),
+    "ASYM": Scheme(triangle="upper", exchange=False, direct_weight=1.0, exchange_weight=0.0),
+    # The 8 is the volume element factor of mat_build_ANTISYM.
+    "ANTISYM": Scheme(triangle="lower", exchange=True, direct_weight=8.0, exchange_weight=-8.0),
+}
+
+
+def index_table(l: np.ndarray, m: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Dense table with ``table[l, m, n]`` the basis position of (l, m, n), -1 for states outside the basis."""
+    table = np.full((l.max() + 1, m.max() + 1, n.max() + 1), -1, dtype=np.int64)
+    table[l, m, n] = np.arange(l.size)
+    return table
+
+
+def lookup(table: np.ndarray, l: np.ndarray, m: np.ndarray, n: np.ndarray) -> np.ndarray:
+    """Basis positions of the states (l, m, n), -1 for those outside the basis."""
+    inside = (l >= 0) & (m >= 0) & (n >= 0) & (l < table.shape[0]) & (m < table.shape[1]) & (n < table.shape[2])
+    positions = np.full(l.shape, -1, dtype=np.int64)
+    positions[inside] = table[l[inside], m[inside], n[inside]]
+    return positions
+
+
+def member_count(recurrences: ModuleType) -> int:
+    """Number of matrices a recurrence module produces: one, or one per member of a fused module."""
+    return len(getattr(recurrences, "MEMBERS", ("",)))
+
+
+def _evaluate(
+    recurrences: ModuleType,
+    shift: tuple[int, int, int],
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    dtype: type,
+) -> np.ndarray:
+    if hasattr(recurrences, "MEMBERS"):
+        return evaluate_fused(recurrences, shift, l, m, n, parameters, dtype)
+    return evaluate_shift(recurrences, shift, l, m, n, parameters, dtype)[np.newaxis]
+
+
+# Largest growth of rounding error accepted from a monomial expansion, in units of eps x max |value|.
+CANCELLATION_LIMIT = 1e3
+
+
+def _expanded(coefficients: np.ndarray, table: np.ndarray) -> np.ndarray | None:
+    """``coefficients @ table.T``, or None if cancellation between the monomials loses too many digits.
+
+    The rounding error of the sum is bounded by eps (|coefficients| @ |table|.T),
+    which costs one more product of the same size.
+    """
+    values = coefficients @ table.T
+    magnitude = np.abs(coefficients) @ np.abs(table).T
+    scale = max(np.abs(values).max(), np.finfo(values.dtype).tiny)
+    return None if magnitude.max() > CANCELLATION_LIMIT * scale else values
+
+
+def _in_triangle(targets: np.ndarray, sources: np.ndarray, triangle: str) -> np.ndarray:
+    if triangle == "lower":
+        return (targets >= 0) & (targets >= sources)
+    return (targets >= 0) & (targets <= sources)
+
+
+@dataclass(frozen=True)
+class Segment:
+    """Entries from one shift and one symmetry case: ``weight`` times the shift's coefficient at (l, m, n)."""
+
+    shift: tuple[int, int, int]
+    rows: np.ndarray
+    cols: np.ndarray
+    l: np.ndarray
+    m: np.ndarray
+    n: np.ndarray
+    weight: np.ndarray
+
+
+def stencil_segments(
+    shifts,
+    scheme: str,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    sources: np.ndarray | None = None,
+    table: np.ndarray | None = None,
+) -> Iterator[Segment]:
+    """Walk the shifts over the source states ``sources`` (default: all) and yield the kept entries.
+
+    Only the basis and the set of shifts matter here, not the recurrence
+    values, so the segments describe the sparsity pattern and every
+    index-dependent factor of the matrix.
+    """
+    rule = SCHEMES[scheme]
+    table = index_table(l, m, n) if table is None else table
+    sources = np.arange(l.size) if sources is None else np.asarray(sources, dtype=np.int64)
+    L, M, N = l[sources], m[sources], n[sources]
+
+    for shift in shifts:
+        lam, mu, nu = shift
+
+        # Direct term: coefficient at (L, M, N).
+        Lp, Mp, Np = L + lam, M + mu, N + nu
+        targets = lookup(table, Lp, Mp, Np)
+        keep = _in_triangle(targets, sources, rule.triangle)
+        if keep.any():
+            weight = np.full(keep.sum(), rule.direct_weight)
+            if rule.exchange:
+                weight[(L[keep] == M[keep]) & (Lp[keep] == Mp[keep])] *= 0.5
+            yield Segment(shift, targets[keep], sources[keep], L[keep], M[keep], N[keep], weight)
+
+        if not rule.exchange:
+            continue
+        # Exchange term: coefficient at (M, L, N), only between states that both have l != m.
+        Lp, Mp = M + lam, L + mu
+        targets = lookup(table, Lp, Mp, Np)
+        keep = _in_triangle(targets, sources, rule.triangle) & (L != M) & (Lp != Mp)
+        if keep.any():
+            weight = np.full(keep.sum(), rule.exchange_weight)
+            yield Segment(shift, targets[keep], sources[keep], M[keep], L[keep], N[keep], weight)
+
+
+def _concatenate(
+    rows: list[np.ndarray], cols: list[np.ndarray], values: list[np.ndarray], members: int, dtype: type
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    if not rows:
+        empty = np.empty(0, dtype=np.int64)
+        return empty, empty, np.empty((members, 0), dtype=dtype)
+    return np.concatenate(rows), np.concatenate(cols), np.concatenate(values, axis=1)
+
+
+def stencil_triplets(
+    recurrences: ModuleType,
+    scheme: str,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    sources: np.ndarray | None = None,
+    table: np.ndarray | None = None,
+    dtype: type = np.float64,
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """COO triplets (J, H, value) for the source states ``sources`` (default: all).
+
+    ``l``, ``m`` and ``n`` are the whole basis in the scheme's numbering order.
+    The cost is O(len(sources) x #shifts) regardless of the basis size, and
+    each shift's coefficient is only evaluated where its target lands in the
+    kept triangle of the basis. For a fused module ``values`` has one row per
+    member, all sharing the same ``rows`` and ``cols``.
+    """
+    rows: list[np.ndarray] = []
+    cols: list[np.ndarray] = []
+    values: list[np.ndarray] = []
+    for segment in stencil_segments(recurrences.SHIFTS, scheme, l, m, n, sources, table):
+        value = _evaluate(recurrences, segment.shift, segment.l, segment.m, segment.n, parameters, dtype)
+        rows.append(segment.rows)
+        cols.append(segment.cols)
+        values.append(segment.weight.astype(dtype) * value)
+
+    rows, cols, values = _concatenate(rows, cols, values, member_count(recurrences), dtype)
+    return rows, cols, values if hasattr(recurrences, "MEMBERS") else values[0]
+
+
+def build_matrix(
+    recurrences: ModuleType,
+    scheme: str,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    dtype: type = np.float64,
+) -> sparse.csr_matrix:
+    """One matrix of the chosen scheme as CSR; duplicate (J, H) triplets are summed."""
+    rows, cols, values = stencil_triplets(recurrences, scheme, l, m, n, parameters, dtype=dtype)
+    return sparse.csr_matrix((values, (rows, cols)), shape=(l.size, l.size), dtype=dtype)
+
+
+def build_matrices(
+    recurrences: ModuleType,
+    scheme: str,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    dtype: type = np.float64,
+) -> list[sparse.csr_matrix]:
+    """Every member matrix of a fused module (e.g. HH and SS) from a single stencil pass; one for a single file."""
+    rows, cols, values = stencil_triplets(recurrences, scheme, l, m, n, parameters, dtype=dtype)
+    return [
+        sparse.csr_matrix((value, (rows, cols)), shape=(l.size, l.size), dtype=dtype)
+        for value in values.reshape(member_count(recurrences), -1)
+    ]
+
+
+@dataclass(frozen=True)
+class AssemblyStructure:
+    """Parameter-independent part of an assembly, computed once per recurrence set, scheme and basis size."""
+
+    scheme: str
+    size: int
+    segments: list[Segment]
+    # Monomials l^a m^b n^c at each segment's entries, None where the shift is evaluated directly.
+    monomials: list[np.ndarray | None]
+    # CSR layout of the summed matrix and the slot in ``data`` that every triplet adds into.
+    indptr: np.ndarray
+    indices: np.ndarray
+    slots: np.ndarray
+    dtype: type
+
+
+def assembly_structure(
+    recurrences: ModuleType,
+    scheme: str,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    dtype: type = np.float64,
+) -> AssemblyStructure:
+    """Sparsity pattern, symmetry weights and index-only factors of every matrix entry.
+
+    For shifts listed in a fused module's ``MONOMIALS`` the monomial values
+    are tabulated at every entry. A value is then the product of that table
+    with the handful of parameter-only coefficients from ``COEFFICIENTS``. The
+    expansion is checked against direct evaluation at ``parameters``, and any
+    shift that loses accuracy to cancellation is evaluated directly instead.
+    The check only holds at ``parameters``; ``structure_values`` repeats a
+    cheaper one for every new parameter set.
+    """
+    segments = [
+        Segment(s.shift, s.rows, s.cols, *(index.astype(dtype) for index in (s.l, s.m, s.n)), s.weight)
+        for s in stencil_segments(recurrences.SHIFTS, scheme, l, m, n)
+    ]
+    available = getattr(recurrences, "MONOMIALS", {})
+    tolerance = CANCELLATION_LIMIT * np.finfo(dtype).eps
+
+    monomials: list[np.ndarray | None] = []
+    for segment in segments:
+        table = None
+        if segment.shift in available:
+            a, b, c = np.array(available[segment.shift]).T
+            table = segment.l[:, None] ** a * segment.m[:, None] ** b * segment.n[:, None] ** c
+            coefficients = np.asarray(recurrences.COEFFICIENTS[segment.shift](parameters), dtype=dtype)
+            expanded = _expanded(coefficients, table)
+            direct = _evaluate(recurrences, segment.shift, segment.l, segment.m, segment.n, parameters, dtype)
+            scale = max(np.abs(direct).max(), np.finfo(dtype).tiny)
+            if expanded is None or np.abs(expanded - direct).max() > tolerance * scale:
+                table = None
+        monomials.append(table)
+
+    size = l.size
+    rows = np.concatenate([segment.rows for segment in segments])
+    cols = np.concatenate([segment.cols for segment in segments])
+    keys, slots = np.unique(rows * size + cols, return_inverse=True)
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(keys // size, minlength=size))])
+    return AssemblyStructure(scheme, size, segments, monomials, indptr, keys % size, slots, dtype)
+
+
+# Structures by (recurrence digest, scheme, basis size, dtype); the basis of a scheme is fixed by its size.
+_structures: dict[tuple[str, str, int, str], AssemblyStructure] = {}
+
+
+def cached_structure(
+    recurrences: ModuleType,
+    scheme: str,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    dtype: type = np.float64,
+) -> AssemblyStructure:
+    key = (recurrences.SOURCE_DIGEST, scheme, l.size, np.dtype(dtype).name)
+    if key not in _structures:
+        _structures[key] = assembly_structure(recurrences, scheme, l, m, n, parameters, dtype)
+    return _structures[key]
+
+
+def structure_values(
+    structure: AssemblyStructure, recurrences: ModuleType, parameters: dict[str, float]
+) -> np.ndarray:
+    """Triplet values for a new parameter set, one row per member, in the structure's triplet order.
+
+    Monomial expansions whose error bound at ``parameters`` is too large are
+    replaced by direct evaluation for this parameter set only.
+    """
+    values = []
+    for segment, table in zip(structure.segments, structure.monomials):
+        value = None
+        if table is not None:
+            coefficients = np.asarray(recurrences.COEFFICIENTS[segment.shift](parameters), dtype=structure.dtype)
+            value = _expanded(coefficients, table)
+        if value is None:
+            value = _evaluate(
+                recurrences, segment.shift, segment.l, segment.m, segment.n, parameters, structure.dtype
+            )
+        values.append(segment.weight.astype(structure.dtype) * value)
+    return np.concatenate(values, axis=1)
+
+
+def rebuild_matrices(
+    structure: AssemblyStructure, recurrences: ModuleType, parameters: dict[str, float]
+) -> list[sparse.csr_matrix]:
+    """CSR matrices (one per member) for a new parameter set, reusing the cached pattern."""
+    matrices = []
+    for value in structure_values(structure, recurrences, parameters):
+        if structure.dtype == np.float64:
+            data = np.bincount(structure.slots, weights=value, minlength=structure.indices.size)
+        else:
+            data = np.zeros(structure.indices.size, dtype=structure.dtype)
+            np.add.at(data, structure.slots, value)
+        matrices.append(
+            sparse.csr_matrix((data, structure.indices, structure.indptr), shape=(structure.size, structure.size))
+        )
+    return matrices
+
+
+# Per-process state of the assembly workers, set once by ``_init_worker``.
+_worker: dict = {}
+
+
+def _init_worker(
+    module_paths: list[str],
+    scheme: str,
+    basis: tuple[np.ndarray, np.ndarray, np.ndarray],
+    parameters: dict[str, float],
+    dtype: type,
+) -> None:
+    _worker["recurrences"] = [load_generated(path) for path in module_paths]
+    _worker["table"] = index_table(*basis)
+    _worker.update(scheme=scheme, basis=basis, parameters=parameters, dtype=dtype)
+
+
+def _block_triplets(block: tuple[int, int]) -> list[tuple[np.ndarray, np.ndarray, np.ndarray]]:
+    """Triplets of the source states ``block``, one (rows, cols, values) per recurrence set, values 2-D by member."""
+    sources = np.arange(*block)
+    triplets = []
+    for recurrences in _worker["recurrences"]:
+        rows, cols, values = stencil_triplets(
+            recurrences,
+            _worker["scheme"],
+            *_worker["basis"],
+            _worker["parameters"],
+            sources=sources,
+            table=_worker["table"],
+            dtype=_worker["dtype"],
+        )
+        triplets.append((rows, cols, values.reshape(-1, rows.size)))
+    return triplets
+
+
+def parallel_fill(
+    recurrence_sets: list[ModuleType],
+    scheme: str,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    workers: int | None = None,
+    chunk_size: int | None = None,
+    dtype: type = np.float64,
+) -> list[sparse.csr_matrix]:
+    """One-triangle CSR matrices, one per recurrence set or per member of a fused set, built on a process pool.
+
+    The source states are cut into blocks of ``chunk_size`` columns and handed
+    to the workers one at a time as they become free. Each worker loads the
+    generated recurrence modules once and returns the sparse triplets of its
+    block, so only the block bounds go out and O(nnz) triplets come back; no
+    dense N x N matrix exists anywhere. With ``workers=1`` the blocks are built
+    in this process. The result equals ``build_matrices`` for each set.
+    """
+    size = l.size
+    workers = multiprocessing.cpu_count() if workers is None else workers
+    chunk_size = chunk_size or max(1, math.ceil(size / (8 * workers)))
+    blocks = [(start, min(start + chunk_size, size)) for start in range(0, size, chunk_size)]
+
+    if workers == 1:
+        _worker.clear()
+        _worker["recurrences"] = recurrence_sets
+        _worker["table"] = index_table(l, m, n)
+        _worker.update(scheme=scheme, basis=(l, m, n), parameters=parameters, dtype=dtype)
+        parts = [_block_triplets(block) for block in blocks]
+        _worker.clear()
+    else:
+        initargs = ([rr.__file__ for rr in recurrence_sets], scheme, (l, m, n), parameters, dtype)
+        with multiprocessing.Pool(workers, initializer=_init_worker, initargs=initargs) as pool:
+            # chunksize=1 hands out one block at a time, so faster workers simply take more blocks.
+            parts = list(pool.imap_unordered(_block_triplets, blocks, chunksize=1))
+
+    matrices = []
+    for index, recurrences in enumerate(recurrence_sets):
+        rows, cols, values = ([part[index][field] for part in parts] for field in range(3))
+        rows, cols, values = _concatenate(rows, cols, values, member_count(recurrences), dtype)
+        matrices.extend(
+            sparse.csr_matrix((value, (rows, cols)), shape=(size, size), dtype=dtype) for value in values
+        )
+    return matrices
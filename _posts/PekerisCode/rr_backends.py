@@ -0,0 +1,456 @@
+"""Interchangeable backends for evaluating the RR_*.txt recurrence coefficients.
+
+Every backend compiles an RR file into a module with the interface of
+``rr_codegen.load_recurrences``: a ``SHIFTS`` dict of ``f(l, m, n, p)`` array
+functions plus ``SOURCE_DIGEST`` and ``PARAMETERS``. ``rr_assembly`` can use
+any of them, including in worker processes, which re-import the module from
+its file.
+
+* ``numpy``: the vectorised NumPy module of ``rr_codegen`` (always available).
+* ``numba``: the same expressions as float64 ``numba.vectorize`` ufuncs, cached
+  on disk by numba.
+* ``cython``: a generated ``.pyx`` with one C kernel per shift and a nogil loop
+  over the block, built next to it with ``cythonize`` and setuptools.
+* ``cexprtk``: the original runtime-compiled expressions, evaluated one
+  (l, m, n) at a time. This is the reference MatrixGeneratorGS was written
+  against.
+
+numba and cython work in float64 only, so a longdouble build loses its extra
+precision in the coefficients. ``benchmark_backends`` times every available
+backend on the real shift set and checks it against ``numpy``.
+``fastest_backend`` picks the fastest one that agrees, and ``select_backend``
+does this over several files at once among the tested ``AUTO_BACKENDS``.
+
+    python rr_backends.py ~/Postdoc/.../RR_HH.txt --omega 20 --set A=1.1 B=1.1 C=2.2 m3=10000
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import importlib.util
+import math
+import os
+import statistics
+import time
+from collections.abc import Callable
+from dataclasses import dataclass
+from types import ModuleType
+
+import numpy as np
+
+from pekeris_basis import symmetric_basis_arrays
+from rr_codegen import (
+    CODEGEN_VERSION,
+    INDEX_NAMES,
+    RENAMED_BACK,
+    Shift,
+    default_cache_dir,
+    evaluate_all,
+    function_name,
+    load_generated,
+    load_recurrences,
+    module_file_name,
+    parse_rr_file,
+    read_source,
+    source_digest,
+    source_stem,
+    translate,
+    write_generated,
+)
+
+# NumPy spellings produced by ``rr_codegen.translate`` and their C equivalents (longest first).
+C_NAMES = {
+    "_np.finfo(_np.float64).eps": "DBL_EPSILON",
+    "_np.sqrt": "sqrt",
+    "_np.exp": "exp",
+    "_np.log": "log",
+    "_np.abs": "fabs",
+    "_np.power": "pow",
+    "_np.pi": "M_PI",
+    "_np.inf": "INFINITY",
+}
+
+
+@dataclass(frozen=True)
+class Backend:
+    name: str
+    # Importable module the backend needs, and the package that provides it; None for NumPy itself.
+    requires: str | None
+    package: str | None
+    load: Callable[[str, str | None], ModuleType]
+
+
+@dataclass(frozen=True)
+class BackendTiming:
+    name: str
+    compile_seconds: float
+    seconds: float
+    max_relative_error: float
+    agrees: bool
+    error: str = ""
+
+
+def _translated(path: str) -> tuple[dict[Shift, tuple[str, list[str]]], tuple[str, ...]]:
+    """Python source and sorted parameter names of every shift, plus the file's parameter names."""
+    translated = {}
+    for shift, expression in sorted(parse_rr_file(path).items()):
+        source, names = translate(expression)
+        translated[shift] = (source, sorted(names))
+    parameters = sorted(set().union(*(names for _, names in translated.values())))
+    return translated, tuple(parameters)
+
+
+def _header(backend: str, path: str, digest: str, parameters: tuple[str, ...]) -> tuple[list[str], list[str]]:
+    """Docstring and import lines, then the module constants, of a generated module."""
+    return [
+        f'"""Generated by rr_backends ({backend}) from {os.path.basename(path)}; do not edit."""',
+        "",
+        "import numpy as _np",
+    ], [
+        f"CODEGEN_VERSION = {CODEGEN_VERSION}",
+        f"SOURCE_DIGEST = {digest!r}",
+        f"PARAMETERS = {tuple(RENAMED_BACK.get(name, name) for name in parameters)!r}",
+        f"BACKEND = {backend!r}",
+    ]
+
+
+def _module_path(backend: str, path: str, cache_dir: str | None, suffix: str) -> tuple[str, str]:
+    digest = source_digest(f"{backend}\n{read_source(path)}")
+    cache_dir = default_cache_dir(path) if cache_dir is None else cache_dir
+    return os.path.join(cache_dir, f"rr_{backend}_{source_stem(path)}_{digest}{suffix}"), digest
+
+
+def _dispatch_lines(shifts) -> list[str]:
+    return ["", "", "SHIFTS = {", *(f"    {shift!r}: {function_name(shift)}," for shift in shifts), "}", ""]
+
+
+def _load_numpy(path: str, cache_dir: str | None) -> ModuleType:
+    return load_recurrences(path, cache_dir=cache_dir)
+
+
+def generate_numba_module(path: str, digest: str) -> str:
+    translated, parameters = _translated(path)
+    docstring, constants = _header("numba", path, digest, parameters)
+    lines = [*docstring, "import numba as _numba", "", *constants]
+    for shift, (source, names) in translated.items():
+        name = function_name(shift)
+        arguments = [*INDEX_NAMES, *names]
+        signature = f"float64({', '.join(['float64'] * len(arguments))})"
+        lookups = "".join(f", p[{RENAMED_BACK.get(arg, arg)!r}]" for arg in names)
+        lines += [
+            "",
+            "",
+            f"@_numba.vectorize([{signature!r}], cache=True)",
+            f"def _kernel_{name}({', '.join(arguments)}):",
+            f"    return {source}",
+            "",
+            "",
+            f"def {name}(l, m, n, p):",
+            f"    return _kernel_{name}(_np.asarray(l, dtype=_np.float64), _np.asarray(m, dtype=_np.float64), "
+            f"_np.asarray(n, dtype=_np.float64){lookups})",
+        ]
+    lines += _dispatch_lines(translated)
+    return "\n".join(lines)
+
+
+def _load_numba(path: str, cache_dir: str | None) -> ModuleType:
+    path = os.path.expanduser(path)
+    module_path, digest = _module_path("numba", path, cache_dir, ".py")
+    write_generated(module_path, lambda: generate_numba_module(path, digest))
+    return load_generated(module_path)
+
+
+class _FloatLiterals(ast.NodeTransformer):
+    def visit_Constant(self, node: ast.Constant) -> ast.Constant:
+        # C integer division truncates, so every literal becomes a double.
+        if isinstance(node.value, int):
+            return ast.copy_location(ast.Constant(float(node.value)), node)
+        return node
+
+
+def c_expression(source: str) -> str:
+    """Translate ``rr_codegen.translate`` output into a C/Cython double expression."""
+    source = ast.unparse(_FloatLiterals().visit(ast.parse(source, mode="eval")))
+    for numpy_name, c_name in C_NAMES.items():
+        source = source.replace(numpy_name, c_name)
+    return source
+
+
+def generate_cython_module(path: str, digest: str) -> str:
+    translated, parameters = _translated(path)
+    docstring, constants = _header("cython", path, digest, parameters)
+    lines = [
+        "# cython: language_level=3, boundscheck=False, wraparound=False, cdivision=True, cpow=True",
+        *docstring,
+        "from libc.float cimport DBL_EPSILON",
+        "from libc.math cimport INFINITY, M_PI, exp, fabs, log, pow, sqrt",
+        "",
+        *constants,
+        "",
+        "ctypedef double (*_kernel_t)(double, double, double, const double*) noexcept nogil",
+        "",
+        "",
+        "cdef object _apply(_kernel_t kernel, l, m, n, p):",
+        "    l, m, n = _np.broadcast_arrays(",
+        "        _np.asarray(l, dtype=_np.float64), _np.asarray(m, dtype=_np.float64), _np.asarray(n, dtype=_np.float64)",
+        "    )",
+        "    shape = l.shape",
+        "    cdef const double[::1] ls = _np.ascontiguousarray(l).reshape(-1)",
+        "    cdef const double[::1] ms = _np.ascontiguousarray(m).reshape(-1)",
+        "    cdef const double[::1] ns = _np.ascontiguousarray(n).reshape(-1)",
+        "    # One spare slot keeps &q[0] valid when the file has no parameters.",
+        "    cdef double[::1] q = _np.array([p[name] for name in PARAMETERS] + [0.0], dtype=_np.float64)",
+        "    out = _np.empty(ls.shape[0], dtype=_np.float64)",
+        "    cdef double[::1] values = out",
+        "    cdef Py_ssize_t i",
+        "    with nogil:",
+        "        for i in range(ls.shape[0]):",
+        "            values[i] = kernel(ls[i], ms[i], ns[i], &q[0])",
+        "    return out.reshape(shape)",
+    ]
+    for shift, (source, names) in translated.items():
+        name = function_name(shift)
+        lines += ["", "", f"cdef double _kernel_{name}(double l, double m, double n, const double* q) noexcept nogil:"]
+        lines += [f"    cdef double {arg} = q[{parameters.index(arg)}]" for arg in names]
+        lines += [f"    return {c_expression(source)}"]
+        lines += ["", "", f"def {name}(l, m, n, p):", f"    return _apply(_kernel_{name}, l, m, n, p)"]
+    lines += _dispatch_lines(translated)
+    return "\n".join(lines)
+
+
+def _load_cython(path: str, cache_dir: str | None) -> ModuleType:
+    from Cython.Build import cythonize
+    from setuptools import Distribution, Extension
+
+    path = os.path.expanduser(path)
+    module_path, digest = _module_path("cython", path, cache_dir, ".pyx")
+    write_generated(module_path, lambda: generate_cython_module(path, digest))
+    module_name = module_file_name(module_path)
+    build_dir = os.path.join(os.path.dirname(module_path), "build")
+    distribution = Distribution(
+        {"ext_modules": cythonize([Extension(module_name, [module_path])], build_dir=build_dir, quiet=True)}
+    )
+    build = distribution.get_command_obj("build_ext")
+    build.build_lib = os.path.dirname(module_path)
+    build.build_temp = build_dir
+    build.ensure_finalized()
+    extension_path = build.get_ext_fullpath(module_name)
+    # The digest in the name changes with the RR file, so a built extension is never stale; workers import it by path.
+    if not os.path.exists(extension_path):
+        distribution.run_command("build_ext")
+    return load_generated(extension_path)
+
+
+def generate_cexprtk_module(path: str, digest: str) -> str:
+    relations = parse_rr_file(path)
+    translated, parameters = _translated(path)
+    docstring, constants = _header("cexprtk", path, digest, parameters)
+    lines = [
+        *docstring,
+        "import cexprtk as _cexprtk",
+        "",
+        *constants,
+        "",
+        "_SYMBOLS = _cexprtk.Symbol_Table(",
+        "    {name: 0.0 for name in ('l', 'm', 'n') + PARAMETERS}, add_constants=True",
+        ")",
+        "_EXPRESSIONS = {",
+        *(f"    {shift!r}: _cexprtk.Expression({relations[shift]!r}, _SYMBOLS)," for shift in translated),
+        "}",
+        "",
+        "",
+        "def _evaluate(shift, l, m, n, p):",
+        "    variables = _SYMBOLS.variables",
+        "    for name in PARAMETERS:",
+        "        variables[name] = p[name]",
+        "    expression = _EXPRESSIONS[shift]",
+        "    l, m, n = _np.broadcast_arrays(l, m, n)",
+        "    out = _np.empty(l.shape, dtype=_np.float64)",
+        "    for index, (li, mi, ni) in enumerate(zip(l.flat, m.flat, n.flat)):",
+        "        variables['l'] = li",
+        "        variables['m'] = mi",
+        "        variables['n'] = ni",
+        "        out.flat[index] = expression()",
+        "    return out",
+    ]
+    for shift in translated:
+        lines += ["", "", f"def {function_name(shift)}(l, m, n, p):", f"    return _evaluate({shift!r}, l, m, n, p)"]
+    lines += _dispatch_lines(translated)
+    return "\n".join(lines)
+
+
+def _load_cexprtk(path: str, cache_dir: str | None) -> ModuleType:
+    path = os.path.expanduser(path)
+    module_path, digest = _module_path("cexprtk", path, cache_dir, ".py")
+    write_generated(module_path, lambda: generate_cexprtk_module(path, digest))
+    return load_generated(module_path)
+
+
+BACKENDS = {
+    "numpy": Backend("numpy", None, None, _load_numpy),
+    "numba": Backend("numba", "numba", "numba", _load_numba),
+    "cython": Backend("cython", "Cython", "Cython", _load_cython),
+    "cexprtk": Backend("cexprtk", "cexprtk", "cexprtk", _load_cexprtk),
+}
+
+
+# Backends ``select_backend`` may pick. A new backend joins once tests/test_rr_backends.py checks it
+# against NumPy, including its reload in a worker process.
+AUTO_BACKENDS = ("numpy", "numba", "cython", "cexprtk")
+
+
+def is_available(name: str) -> bool:
+    requires = BACKENDS[name].requires
+    return requires is None or importlib.util.find_spec(requires) is not None
+
+
+def available_backends() -> list[str]:
+    return [name for name in BACKENDS if is_available(name)]
+
+
+def load_backend(name: str, path: str, cache_dir: str | None = None) -> ModuleType:
+    """Recurrence module for the RR file ``path`` compiled with backend ``name``."""
+    if name not in BACKENDS:
+        raise ValueError(f"backend must be one of {tuple(BACKENDS)}, got {name!r}")
+    backend = BACKENDS[name]
+    if not is_available(name):
+        raise RuntimeError(f"The {name} backend requires {backend.package} (pip install {backend.package}).")
+    return backend.load(path, cache_dir)
+
+
+def _max_relative_error(values: dict[Shift, np.ndarray], reference: dict[Shift, np.ndarray]) -> float:
+    errors = []
+    for shift, expected in reference.items():
+        scale = max(float(np.max(np.abs(expected), initial=0.0)), np.finfo(np.float64).tiny)
+        errors.append(float(np.max(np.abs(values[shift] - expected), initial=0.0)) / scale)
+    return max(errors, default=0.0)
+
+
+def benchmark_backends(
+    path: str,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    names: list[str] | None = None,
+    repeats: int = 5,
+    rtol: float = 1e-12,
+    cache_dir: str | None = None,
+) -> list[BackendTiming]:
+    """Time every shift of ``path`` over (l, m, n) with each backend and check it against ``numpy``.
+
+    ``seconds`` is the median of ``repeats`` full evaluations after one
+    warm-up call, which absorbs JIT compilation. A backend agrees if its
+    largest error, relative to each shift's largest coefficient, is within
+    ``rtol``. Backends that are missing or fail to build are reported with
+    their error instead of a time.
+    """
+    reference = evaluate_all(load_backend("numpy", path, cache_dir), l, m, n, parameters)
+    results = []
+    for name in names or list(BACKENDS):
+        if not is_available(name):
+            results.append(BackendTiming(name, math.nan, math.nan, math.nan, False, f"needs {BACKENDS[name].package}"))
+            continue
+        try:
+            start = time.perf_counter()
+            recurrences = load_backend(name, path, cache_dir)
+            values = evaluate_all(recurrences, l, m, n, parameters)
+            compile_seconds = time.perf_counter() - start
+        except Exception as exc:  # a backend that cannot build or run is reported, not fatal
+            results.append(BackendTiming(name, math.nan, math.nan, math.nan, False, f"{type(exc).__name__}: {exc}"))
+            continue
+        samples = []
+        for _ in range(repeats):
+            start = time.perf_counter()
+            evaluate_all(recurrences, l, m, n, parameters)
+            samples.append(time.perf_counter() - start)
+        error = _max_relative_error(values, reference)
+        results.append(BackendTiming(name, compile_seconds, statistics.median(samples), error, error <= rtol))
+    return results
+
+
+def fastest_backend(results: list[BackendTiming]) -> str:
+    """Name of the fastest backend that agreed with ``numpy``; ``numpy`` if none did."""
+    agreeing = [result for result in results if result.agrees]
+    return min(agreeing, key=lambda result: result.seconds).name if agreeing else "numpy"
+
+
+def select_backend(
+    paths: list[str],
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    sample: int = 1000,
+    cache_dir: str | None = None,
+) -> str:
+    """Benchmark every RR file in ``paths`` on the first ``sample`` basis states and return one backend for all.
+
+    Only ``AUTO_BACKENDS`` are timed. The choice is the backend with the
+    smallest total time over the files among those that agree with ``numpy``
+    on every file, since the files are evaluated with the same backend.
+    """
+    runs = [
+        benchmark_backends(
+            path, l[:sample], m[:sample], n[:sample], parameters, list(AUTO_BACKENDS), repeats=3, cache_dir=cache_dir
+        )
+        for path in paths
+    ]
+    combined = [
+        BackendTiming(
+            timings[0].name,
+            sum(timing.compile_seconds for timing in timings),
+            sum(timing.seconds for timing in timings),
+            max(timing.max_relative_error for timing in timings),
+            all(timing.agrees for timing in timings),
+        )
+        for timings in zip(*runs)
+    ]
+    return fastest_backend(combined)
+
+
+def print_benchmark(results: list[BackendTiming], size: int) -> None:
+    print(f"backend    compile / s   eval / s   per state / ns   max rel. error   (basis size {size})")
+    for result in results:
+        if result.error:
+            print(f"{result.name:<10s} unavailable: {result.error}")
+            continue
+        mark = "" if result.agrees else "   DISAGREES"
+        print(
+            f"{result.name:<10s} {result.compile_seconds:>11.3f} {result.seconds:>10.4f} "
+            f"{1e9 * result.seconds / size:>16.1f} {result.max_relative_error:>16.2e}{mark}"
+        )
+    print(f"fastest agreeing backend: {fastest_backend(results)}")
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Time and cross-check the recurrence-evaluation backends.")
+    parser.add_argument("path", help="RR file to benchmark.")
+    parser.add_argument("--omega", type=int, default=20, help="Evaluate over the symmetric basis of this omega.")
+    parser.add_argument("--backends", nargs="+", choices=tuple(BACKENDS), help="Backends to time (default: all).")
+    parser.add_argument("--repeats", type=int, default=5, help="Timed evaluations per backend.")
+    parser.add_argument("--rtol", type=float, default=1e-12, help="Largest relative error counted as agreement.")
+    parser.add_argument("--cache-dir", type=str, help="Generated-module directory (default: __rrcache__).")
+    parser.add_argument(
+        "--set", nargs="+", default=[], metavar="NAME=VALUE", help="Parameter values; unset parameters are 1."
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    recurrences = load_backend("numpy", args.path, args.cache_dir)
+    parameters = dict.fromkeys(recurrences.PARAMETERS, 1.0)
+    for assignment in args.set:
+        name, _, value = assignment.partition("=")
+        parameters[name] = float(value)
+    l, m, n = symmetric_basis_arrays(args.omega)
+    results = benchmark_backends(
+        args.path, l, m, n, parameters, args.backends, args.repeats, args.rtol, cache_dir=args.cache_dir
+    )
+    print_benchmark(results, l.size)
+
+
+if __name__ == "__main__":
+    main()
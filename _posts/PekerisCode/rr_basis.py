@@ -0,0 +1,100 @@
+"""Basis maps of the MatrixGeneratorGS numbering schemes, kept in a versioned binary cache.
+
+MatrixGeneratorGS picks omega for each scheme by solving a cubic with
+``sympy.solve``. It then lists the (l, m, n) states with Python triple loops,
+ordered by the shell w = l + m + n, then s = l + m, then l, and keeps the
+first ``mat_size`` of them:
+
+* SYM:     l <= m, basis oversized to 1.4 x mat_size before truncation;
+* ASYM:    every l, m, same oversizing;
+* ANTISYM: l < m, oversized to 2 x mat_size.
+
+Here omega comes from Cardano's formula for the same cubics, so sympy is not
+imported at all. The states are generated with one filtered ``np.indices``
+grid and a lexsort. All three maps are stored as one ``.npz`` per
+``mat_size``, so a restart (or a spawned worker re-importing the script) only
+reads a small binary file.
+"""
+
+from __future__ import annotations
+
+import os
+
+import numpy as np
+
+# Bump when the maps or the file layout change so stale cache files are not reused.
+BASIS_CACHE_VERSION = 1
+
+SCHEMES = ("SYM", "ASYM", "ANTISYM")
+
+
+def _real_cubic_root(b: float, c: float, d: float) -> float:
+    """The real root of w^3 + b w^2 + c w + d when it has exactly one."""
+    p = c - b * b / 3.0
+    q = 2.0 * b**3 / 27.0 - b * c / 3.0 + d
+    discriminant = (q / 2.0) ** 2 + (p / 3.0) ** 3
+    if discriminant < 0:
+        raise ValueError("cubic has three real roots; the basis size is too small")
+    root = np.sqrt(discriminant)
+    return float(np.cbrt(-q / 2.0 + root) + np.cbrt(-q / 2.0 - root) - b / 3.0)
+
+
+def _sym_cubic_root(size: float) -> float:
+    # 15/16 + 17/12 w + 5/8 w^2 + 1/12 w^3 + 1/16 = size, times 12.
+    return _real_cubic_root(7.5, 17.0, 12.0 * (1.0 - size))
+
+
+def omega_sym(mat_size: int) -> int:
+    return int(round(_sym_cubic_root(1.4 * mat_size)))
+
+
+def omega_asym(mat_size: int) -> int:
+    size = 1.4 * mat_size
+    cube = (81 * size + 3 * (729 * size**2 - 3) ** 0.5) ** (1 / 3)
+    return int(round((1 / 3) * cube + 1 / cube - 2))
+
+
+def omega_antisym(mat_size: int) -> int:
+    # The SYM cubic in omega - 1.
+    return int(round(_sym_cubic_root(2 * mat_size) + 1))
+
+
+def scheme_basis(scheme: str, omega: int) -> np.ndarray:
+    """(N, 3) array of the scheme's (l, m, n) states with l + m + n <= omega, in shell order."""
+    l, m, n = (index.ravel() for index in np.indices((omega + 1,) * 3, dtype=np.int64))
+    keep = l + m + n <= omega
+    if scheme == "SYM":
+        keep &= l <= m
+    elif scheme == "ANTISYM":
+        keep &= l < m
+    elif scheme != "ASYM":
+        raise ValueError(f"scheme must be one of {SCHEMES}, got {scheme!r}")
+    l, m, n = l[keep], m[keep], n[keep]
+    order = np.lexsort((l, l + m, l + m + n))
+    return np.stack((l[order], m[order], n[order]), axis=1)
+
+
+def build_basis_maps(mat_size: int) -> dict[str, np.ndarray]:
+    omegas = {"SYM": omega_sym(mat_size), "ASYM": omega_asym(mat_size), "ANTISYM": omega_antisym(mat_size)}
+    return {scheme: scheme_basis(scheme, omega) for scheme, omega in omegas.items()}
+
+
+def default_cache_dir() -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(__file__)), "__rrcache__")
+
+
+def basis_maps(mat_size: int, cache_dir: str | None = None) -> dict[str, np.ndarray]:
+    """``{"SYM": ..., "ASYM": ..., "ANTISYM": ...}`` (N, 3) maps for ``mat_size``, built once and cached."""
+    cache_dir = default_cache_dir() if cache_dir is None else cache_dir
+    path = os.path.join(cache_dir, f"basis_v{BASIS_CACHE_VERSION}_{mat_size}.npz")
+    if os.path.exists(path):
+        with np.load(path) as data:
+            return {scheme: data[scheme] for scheme in SCHEMES}
+
+    maps = build_basis_maps(mat_size)
+    os.makedirs(cache_dir, exist_ok=True)
+    # Write then rename, so concurrent processes never read a half-written file.
+    partial = f"{path}.{os.getpid()}.tmp.npz"
+    np.savez(partial, **maps)
+    os.replace(partial, path)
+    return maps
@@ -0,0 +1,540 @@
+"""Compile the Maple recursion-relation files (RR_HH.txt, RR_SS.txt) into NumPy code.
+
+Each line of an RR file holds a shift (lambda, mu, nu) followed by the cexprtk
+expression of its coefficient in l, m, n and the run parameters (A, B, C,
+m1-m3, Z1-Z3, ...). ``MatrixGeneratorGS_v1-02.py`` used to compile every line
+into a ``cexprtk.Expression`` and evaluate it one (l, m, n) at a time. Here each
+shift becomes a Python function over arrays of l, m and n. A whole row block,
+or the entire basis, is then evaluated in one vectorised call.
+
+Several RR files can also be fused into one module (``load_fused_recurrences``).
+There each shift's function returns the coefficients of every file at once, and
+the subexpressions they share are computed once (``sympy.cse`` when sympy is
+installed). With sympy the fused module also records, for every shift whose
+expressions are polynomials in l, m and n, the monomials l^a m^b n^c and
+functions of the run parameters alone for their coefficients. A new parameter
+set then only needs those few scalars (see ``rr_assembly.AssemblyStructure``).
+
+``load_dispatch`` generates the scalar counterpart used by ``RR_Pekeris``.
+There, per-shift coefficients are looked up by shift in one dict access, and
+each row's shared subexpressions are computed once for all its shifts.
+
+The generated module is written to a cache directory under a name derived from
+the RR file contents and ``CODEGEN_VERSION``. Later runs import it directly,
+and Python keeps its bytecode in ``__pycache__`` like any other module.
+
+    python rr_codegen.py ~/Postdoc/.../RR_HH.txt ~/Postdoc/.../RR_SS.txt
+    python rr_codegen.py --fuse ~/Postdoc/.../RR_HH.txt ~/Postdoc/.../RR_SS.txt
+    python rr_codegen.py --dispatch ~/Postdoc/.../RR_HH.txt
+"""
+
+from __future__ import annotations
+
+import argparse
+import ast
+import hashlib
+import importlib.machinery
+import importlib.util
+import os
+import re
+from types import ModuleType
+
+import numpy as np
+
+# Bump when the generated source changes so stale cached modules are not reused.
+CODEGEN_VERSION = 2
+
+# Index variables passed as arrays; everything else is a scalar run parameter.
+INDEX_NAMES = ("l", "m", "n")
+
+# cexprtk names that are not valid (or would shadow something) in the generated Python.
+RENAMED = {"np": "np_"}
+# Parameter dicts keep the cexprtk spelling, the generated locals use the Python one.
+RENAMED_BACK = {python: cexprtk for cexprtk, python in RENAMED.items()}
+
+# cexprtk functions and constants (add_constants=True) with their NumPy spelling. ``Abs``
+# is how sympy prints abs() back after common-subexpression elimination.
+FUNCTIONS = {
+    "sqrt": "_np.sqrt",
+    "exp": "_np.exp",
+    "log": "_np.log",
+    "abs": "_np.abs",
+    "Abs": "_np.abs",
+    "pow": "_np.power",
+}
+CONSTANTS = {"pi": "_np.pi", "inf": "_np.inf", "epsilon": "_np.finfo(_np.float64).eps"}
+
+# Leading parameters of the scalar dispatch functions, as in the RR_Pekeris.HHrr skeleton.
+DISPATCH_PARAMETERS = ("m1", "m2", "m3", "Z1", "Z2", "Z3", "A", "B", "C")
+
+_IDENTIFIER = re.compile(r"[A-Za-z_][A-Za-z0-9_]*")
+_ALLOWED_NODES = (
+    ast.Expression,
+    ast.BinOp,
+    ast.UnaryOp,
+    ast.Call,
+    ast.Name,
+    ast.Attribute,
+    ast.Constant,
+    ast.Load,
+    ast.operator,
+    ast.unaryop,
+)
+
+Shift = tuple[int, int, int]
+
+
+def parse_rr_file(path: str) -> dict[Shift, str]:
+    """Read ``lambda mu nu expression`` lines into a ``{shift: expression}`` dict.
+
+    Unlike ``genfromtxt(dtype='S1000')`` this keeps expressions of any length.
+    Blank lines and lines starting with ``#`` are skipped.
+    """
+    relations: dict[Shift, str] = {}
+    with open(os.path.expanduser(path), encoding="utf-8") as handle:
+        for number, line in enumerate(handle, start=1):
+            line = line.strip()
+            if not line or line.startswith("#"):
+                continue
+            fields = line.split(maxsplit=3)
+            if len(fields) != 4:
+                raise ValueError(f"{path}:{number}: expected 'lambda mu nu expression', got {line[:60]!r}")
+            shift = (int(fields[0]), int(fields[1]), int(fields[2]))
+            if shift in relations:
+                raise ValueError(f"{path}:{number}: shift {shift} appears twice")
+            relations[shift] = fields[3]
+    return relations
+
+
+def translate(expression: str) -> tuple[str, set[str]]:
+    """Rewrite one cexprtk expression as Python and return it with its free parameter names.
+
+    ``^`` becomes ``**``, ``np`` becomes ``np_`` and the cexprtk functions and
+    constants map onto NumPy. The result is checked to be a plain arithmetic
+    expression before any code is generated from it.
+    """
+
+    def rename(match: re.Match) -> str:
+        name = match.group(0)
+        return RENAMED.get(name) or FUNCTIONS.get(name) or CONSTANTS.get(name) or name
+
+    source = _IDENTIFIER.sub(rename, expression.replace("^", "**"))
+    try:
+        tree = ast.parse(source, mode="eval")
+    except SyntaxError as exc:
+        raise ValueError(f"Cannot translate RR expression {expression[:60]!r}: {exc.msg}") from exc
+
+    names: set[str] = set()
+    for node in ast.walk(tree):
+        if not isinstance(node, _ALLOWED_NODES):
+            raise ValueError(f"Unsupported construct {type(node).__name__} in RR expression {expression[:60]!r}")
+        if isinstance(node, ast.Name) and node.id != "_np":
+            names.add(node.id)
+        if isinstance(node, ast.Call) and ast.unparse(node.func) not in FUNCTIONS.values():
+            raise ValueError(f"Unknown function {ast.unparse(node.func)!r} in RR expression {expression[:60]!r}")
+    return source, names - set(INDEX_NAMES)
+
+
+def function_name(shift: Shift) -> str:
+    """Python identifier for a shift, e.g. (1, -1, 0) -> ``shift_1_m1_0``."""
+    return "shift_" + "_".join(str(k) if k >= 0 else f"m{-k}" for k in shift)
+
+
+def source_digest(text: str) -> str:
+    return hashlib.sha256(f"{CODEGEN_VERSION}\n{text}".encode("utf-8")).hexdigest()[:16]
+
+
+def _parameter_lines(names: set[str]) -> list[str]:
+    return [f"    {name} = p[{RENAMED_BACK.get(name, name)!r}]" for name in sorted(names)]
+
+
+def _module_header(source_name: str, digest: str, parameters: set[str]) -> list[str]:
+    return [
+        f'"""Generated by rr_codegen from {source_name}; do not edit."""',
+        "",
+        "import numpy as _np",
+        "",
+        f"CODEGEN_VERSION = {CODEGEN_VERSION}",
+        f"SOURCE_DIGEST = {digest!r}",
+        f"PARAMETERS = {tuple(sorted(RENAMED_BACK.get(name, name) for name in parameters))!r}",
+    ]
+
+
+def generate_module(relations: dict[Shift, str], source_name: str, digest: str) -> str:
+    """Source of a module with one array function per shift and a ``SHIFTS`` dispatch dict.
+
+    Every function has the signature ``f(l, m, n, p)``: ``l``, ``m`` and ``n``
+    are arrays (or scalars) of equal shape and ``p`` maps parameter names to
+    scalars. Only the parameters a shift actually uses are read from ``p``.
+    """
+    translated = {shift: translate(expression) for shift, expression in sorted(relations.items())}
+    lines = _module_header(source_name, digest, set().union(*(names for _, names in translated.values())))
+    for shift, (source, names) in translated.items():
+        lines += ["", "", f"def {function_name(shift)}(l, m, n, p):"]
+        lines += _parameter_lines(names)
+        lines.append(f"    return {source}")
+    lines += ["", "", "SHIFTS = {"]
+    lines += [f"    {shift!r}: {function_name(shift)}," for shift in translated]
+    lines += ["}", ""]
+    return "\n".join(lines)
+
+
+def _shared_subexpressions(expressions: list[str]) -> tuple[list[tuple[str, str]], list[str]]:
+    """Common-subexpression elimination across several cexprtk expressions with sympy.
+
+    Returns ``(temporaries, results)``: assignments ``name = expression`` to
+    evaluate in order, then one expression per input, all in cexprtk-like
+    syntax ready for ``translate``. Every identifier is parsed as a plain
+    symbol, so names such as ``E`` or ``N`` keep their meaning as RR variables
+    rather than sympy constants.
+    """
+    import sympy
+
+    parsed = [_to_sympy(expression) for expression in expressions]
+    temporaries, results = sympy.cse(parsed, symbols=sympy.numbered_symbols("_cse"), order="none")
+    # The temporaries stay valid identifiers for translate().
+    return [(str(name), _spell(value)) for name, value in temporaries], [_spell(result) for result in results]
+
+
+def _to_sympy(expression: str):
+    import sympy
+
+    functions = {"sqrt": sympy.sqrt, "exp": sympy.exp, "log": sympy.log, "abs": sympy.Abs, "pow": sympy.Pow}
+    constants = {"pi": sympy.pi}
+    source = _IDENTIFIER.sub(lambda match: RENAMED.get(match.group(0), match.group(0)), expression.replace("^", "**"))
+    symbols = {name: sympy.Symbol(name) for name in _IDENTIFIER.findall(source)}
+    return sympy.parse_expr(source, local_dict={**symbols, **functions, **constants})
+
+
+def _spell(expression) -> str:
+    """A sympy expression back in cexprtk-like syntax, with the RR spelling of renamed variables."""
+    return _IDENTIFIER.sub(lambda match: RENAMED_BACK.get(match.group(0), match.group(0)), str(expression))
+
+
+def _monomial_split(expressions: list[str]) -> tuple[list[tuple[int, int, int]], list[list[str]]] | None:
+    """Write every expression as sum_k c_k(parameters) l^a_k m^b_k n^c_k over one shared monomial list.
+
+    Returns the monomial exponents and, per expression, its coefficient
+    expressions (free of l, m and n), or ``None`` when some expression is not a
+    polynomial in l, m and n.
+    """
+    import sympy
+
+    indices = sympy.symbols(INDEX_NAMES)
+    try:
+        terms = [sympy.Poly(_to_sympy(expression), *indices).as_dict(native=False) for expression in expressions]
+    except sympy.PolynomialError:
+        return None
+    monomials = sorted(set().union(*terms))
+    return monomials, [[_spell(term.get(monomial, 0)) for monomial in monomials] for term in terms]
+
+
+def generate_fused_module(
+    relations: dict[str, dict[Shift, str]], source_name: str, digest: str, shared_subexpressions: bool = True
+) -> str:
+    """Source of a module whose shift functions return the coefficients of several RR files at once.
+
+    ``relations`` maps a member name (e.g. ``"HH"``) to its parsed RR file. Each
+    ``f(l, m, n, p)`` returns a tuple in ``MEMBERS`` order, with ``0.0`` for a
+    member that lacks the shift. With ``shared_subexpressions`` (which needs
+    sympy) the members' expressions go through ``sympy.cse`` together, so work
+    they share, such as l/m/n-dependent powers and products, is done once per
+    call. Polynomial shifts also get ``MONOMIALS`` and ``COEFFICIENTS`` entries.
+    """
+    members = tuple(relations)
+    shifts = sorted(set().union(*relations.values()))
+    parameters: set[str] = set()
+    body: dict[Shift, list[str]] = {}
+    monomials: dict[Shift, list[tuple[int, int, int]]] = {}
+    coefficient_body: dict[Shift, list[str]] = {}
+    for shift in shifts:
+        expressions = [relations[member][shift] for member in members if shift in relations[member]]
+        names = set().union(*(translate(expression)[1] for expression in expressions))
+        parameters |= names
+        temporaries, results = _shared_subexpressions(expressions) if shared_subexpressions else ([], expressions)
+
+        lines = _parameter_lines(names)
+        lines += [f"    {name} = {translate(value)[0]}" for name, value in temporaries]
+        sources = iter(translate(result)[0] for result in results)
+        returned = [next(sources) if shift in relations[member] else "0.0" for member in members]
+        lines.append(f"    return ({', '.join(returned)},)")
+        body[shift] = lines
+
+        split = _monomial_split(expressions) if shared_subexpressions else None
+        if split is not None:
+            monomials[shift], coefficients = split
+            rows = iter("(" + ", ".join(translate(c)[0] for c in row) + ",)" for row in coefficients)
+            zeros = "(" + "0.0, " * len(monomials[shift]) + ")"
+            returned = [next(rows) if shift in relations[member] else zeros for member in members]
+            coefficient_body[shift] = [*_parameter_lines(names), f"    return ({', '.join(returned)},)"]
+
+    lines = _module_header(source_name, digest, parameters)
+    lines.insert(lines.index(f"SOURCE_DIGEST = {digest!r}"), f"MEMBERS = {members!r}")
+    for shift in shifts:
+        lines += ["", "", f"def {function_name(shift)}(l, m, n, p):", *body[shift]]
+    for shift in coefficient_body:
+        lines += ["", "", f"def coefficients_{function_name(shift)}(p):", *coefficient_body[shift]]
+    lines += ["", "", "SHIFTS = {"]
+    lines += [f"    {shift!r}: {function_name(shift)}," for shift in shifts]
+    lines += ["}", "", "# Exponents (a, b, c) of the monomials l^a m^b n^c of each polynomial shift.", "MONOMIALS = {"]
+    lines += [f"    {shift!r}: {tuple(map(tuple, monomials[shift]))!r}," for shift in coefficient_body]
+    lines += ["}", "", "# Per member, the parameter-only coefficient of each monomial.", "COEFFICIENTS = {"]
+    lines += [f"    {shift!r}: coefficients_{function_name(shift)}," for shift in coefficient_body]
+    lines += ["}", ""]
+    return "\n".join(lines)
+
+
+def dispatch_arguments(parameters: set[str]) -> list[str]:
+    """Argument names after (l, m, n) of generated ``*row``/``*rr`` functions, in the RR_Pekeris order."""
+    return [*DISPATCH_PARAMETERS, *sorted(set(parameters) - set(DISPATCH_PARAMETERS))]
+
+
+def generate_dispatch_module(
+    relations: dict[str, dict[Shift, str]], source_name: str, digest: str, shared_subexpressions: bool = True
+) -> str:
+    """Source of a scalar dispatch module in the style of ``RR_Pekeris.HHrr``, one pair of functions per member.
+
+    ``<member>row(l, m, n, m1, m2, m3, Z1, Z2, Z3, A, B, C, ...)`` returns the
+    coefficients of every shift of that member at one (l, m, n), in
+    ``ROW_SHIFTS[member]`` order. With ``shared_subexpressions`` (needs sympy)
+    the subexpressions the shifts share are computed once per row. It also
+    works on arrays of l, m and n.
+
+    ``<member>rr(lam, mu, nu, l, m, n, ...)`` finds the shift's position with
+    one dict lookup instead of an if/elif chain, and returns 0.0 for shifts
+    not in the file. It keeps the row of its last (l, m, n, parameters), so
+    asking for every shift of one row evaluates the row once.
+    """
+    parameters = set().union(
+        *(translate(expression)[1] for member in relations.values() for expression in member.values())
+    )
+    arguments = dispatch_arguments(parameters)
+    signature = ", ".join([*INDEX_NAMES, *arguments])
+    lines = _module_header(source_name, digest, parameters)
+    lines.append(f"ARGUMENTS = {tuple(RENAMED_BACK.get(name, name) for name in [*INDEX_NAMES, *arguments])!r}")
+    lines.insert(lines.index(f"SOURCE_DIGEST = {digest!r}"), f"MEMBERS = {tuple(relations)!r}")
+    lines += ["", "# Shifts in the order their coefficients appear in a row.", "ROW_SHIFTS = {"]
+    lines += [f"    {member!r}: {tuple(sorted(shifts))!r}," for member, shifts in relations.items()]
+    lines += ["}"]
+
+    for member, shifts in relations.items():
+        order = sorted(shifts)
+        expressions = [shifts[shift] for shift in order]
+        temporaries, results = _shared_subexpressions(expressions) if shared_subexpressions else ([], expressions)
+        lines += ["", "", f"def {member}row({signature}):"]
+        lines += [f"    {name} = {translate(value)[0]}" for name, value in temporaries]
+        lines += ["    return (", *(f"        {translate(result)[0]}," for result in results), "    )"]
+        lines += ["", "", f"_{member}_POSITION = {{shift: position for position, shift in enumerate(ROW_SHIFTS[{member!r}])}}"]
+        lines += [f"# Arguments and row of the last {member}rr call.", f"_{member}_last = [None, None]"]
+        lines += [
+            "",
+            "",
+            f"def {member}rr(lam, mu, nu, {signature}):",
+            f"    position = _{member}_POSITION.get((lam, mu, nu))",
+            "    if position is None:",
+            "        return 0.0",
+            f"    key = ({signature})",
+            f"    if key != _{member}_last[0]:",
+            f"        _{member}_last[:] = key, {member}row(*key)",
+            f"    return _{member}_last[1][position]",
+        ]
+    lines.append("")
+    return "\n".join(lines)
+
+
+def default_cache_dir(path: str) -> str:
+    return os.path.join(os.path.dirname(os.path.abspath(os.path.expanduser(path))), "__rrcache__")
+
+
+def module_file_name(module_path: str) -> str:
+    """Module name of a source or extension module file, without its directory and suffix."""
+    basename = os.path.basename(module_path)
+    for suffix in sorted(importlib.machinery.EXTENSION_SUFFIXES, key=len, reverse=True):
+        if basename.endswith(suffix):
+            return basename[: -len(suffix)]
+    return os.path.splitext(basename)[0]
+
+
+def load_generated(module_path: str) -> ModuleType:
+    """Import an already generated module by path, e.g. ``recurrences.__file__`` in a worker process.
+
+    Compiled extensions keep their ABI tag in the file name
+    (``name.cpython-311-x86_64-linux-gnu.so``), so the whole extension suffix
+    is stripped to recover the name their ``PyInit_`` function is built for.
+    """
+    module_name = module_file_name(module_path)
+    spec = importlib.util.spec_from_file_location(module_name, module_path)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def write_generated(module_path: str, generate) -> None:
+    """Write ``generate()`` to ``module_path`` unless it is already there."""
+    if os.path.exists(module_path):
+        return
+    os.makedirs(os.path.dirname(module_path), exist_ok=True)
+    source = generate()
+    # Write then rename, so concurrent workers never import a half-written module.
+    partial = f"{module_path}.{os.getpid()}.tmp"
+    with open(partial, "w", encoding="utf-8") as handle:
+        handle.write(source)
+    os.replace(partial, module_path)
+
+
+def _cached_module(module_path: str, generate) -> ModuleType:
+    write_generated(module_path, generate)
+    return load_generated(module_path)
+
+
+def source_stem(path: str) -> str:
+    """File name of ``path`` without its extension, made safe for a module name."""
+    return re.sub(r"\W", "_", os.path.splitext(os.path.basename(path))[0])
+
+
+def read_source(path: str) -> str:
+    """Text of an RR file, as hashed into the cache keys."""
+    with open(path, encoding="utf-8") as handle:
+        return handle.read()
+
+
+def load_recurrences(path: str, cache_dir: str | None = None) -> ModuleType:
+    """Compiled NumPy module for an RR file, generated on first use and cached on disk."""
+    path = os.path.expanduser(path)
+    digest = source_digest(read_source(path))
+    cache_dir = default_cache_dir(path) if cache_dir is None else cache_dir
+    module_path = os.path.join(cache_dir, f"rr_{source_stem(path)}_{digest}.py")
+    return _cached_module(module_path, lambda: generate_module(parse_rr_file(path), os.path.basename(path), digest))
+
+
+def _sympy_available() -> bool:
+    return importlib.util.find_spec("sympy") is not None
+
+
+def load_fused_recurrences(paths: dict[str, str], cache_dir: str | None = None) -> ModuleType:
+    """Compiled module evaluating several RR files per shift in one call, e.g. ``{"HH": ..., "SS": ...}``.
+
+    Shared subexpressions are eliminated with sympy when it is installed;
+    without it the fused module still does one call per shift, just without
+    the sharing.
+    """
+    paths = {member: os.path.expanduser(path) for member, path in paths.items()}
+    cse = _sympy_available()
+    texts = "".join(f"{member}\n{read_source(path)}\n" for member, path in paths.items())
+    digest = source_digest(f"fused cse={cse}\n{texts}")
+    first = next(iter(paths.values()))
+    cache_dir = default_cache_dir(first) if cache_dir is None else cache_dir
+    module_path = os.path.join(cache_dir, f"rr_fused_{'_'.join(map(source_stem, paths.values()))}_{digest}.py")
+
+    def generate() -> str:
+        relations = {member: parse_rr_file(path) for member, path in paths.items()}
+        source_name = " + ".join(os.path.basename(path) for path in paths.values())
+        return generate_fused_module(relations, source_name, digest, shared_subexpressions=cse)
+
+    return _cached_module(module_path, generate)
+
+
+def load_dispatch(paths: dict[str, str], cache_dir: str | None = None) -> ModuleType:
+    """Scalar dispatch module (``HHrr``/``HHrow`` and so on) for RR files, e.g. ``{"HH": ...}``."""
+    paths = {member: os.path.expanduser(path) for member, path in paths.items()}
+    cse = _sympy_available()
+    texts = "".join(f"{member}\n{read_source(path)}\n" for member, path in paths.items())
+    digest = source_digest(f"dispatch cse={cse}\n{texts}")
+    first = next(iter(paths.values()))
+    cache_dir = default_cache_dir(first) if cache_dir is None else cache_dir
+    module_path = os.path.join(cache_dir, f"rr_dispatch_{'_'.join(map(source_stem, paths.values()))}_{digest}.py")
+
+    def generate() -> str:
+        relations = {member: parse_rr_file(path) for member, path in paths.items()}
+        source_name = " + ".join(os.path.basename(path) for path in paths.values())
+        return generate_dispatch_module(relations, source_name, digest, shared_subexpressions=cse)
+
+    return _cached_module(module_path, generate)
+
+
+def evaluate_shift(
+    recurrences: ModuleType,
+    shift: Shift,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    dtype: type = np.float64,
+) -> np.ndarray:
+    """Coefficient of ``shift`` at every (l, m, n), broadcast to the shape of ``l``.
+
+    Indices are converted to ``dtype`` first so negative powers and divisions
+    behave as they do in cexprtk, which works in floating point throughout.
+    """
+    l, m, n = (np.asarray(index, dtype=dtype) for index in (l, m, n))
+    return np.broadcast_to(np.asarray(recurrences.SHIFTS[shift](l, m, n, parameters), dtype=dtype), l.shape)
+
+
+def evaluate_fused(
+    recurrences: ModuleType,
+    shift: Shift,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    dtype: type = np.float64,
+) -> np.ndarray:
+    """Coefficients of ``shift`` for every member of a fused module, as a ``(len(MEMBERS),) + l.shape`` array."""
+    l, m, n = (np.asarray(index, dtype=dtype) for index in (l, m, n))
+    values = recurrences.SHIFTS[shift](l, m, n, parameters)
+    result = np.empty((len(values),) + l.shape, dtype=dtype)
+    for member, value in enumerate(values):
+        result[member] = value
+    return result
+
+
+def evaluate_all(
+    recurrences: ModuleType,
+    l: np.ndarray,
+    m: np.ndarray,
+    n: np.ndarray,
+    parameters: dict[str, float],
+    dtype: type = np.float64,
+) -> dict[Shift, np.ndarray]:
+    """Every shift of an RR file evaluated over the same (l, m, n) arrays."""
+    return {shift: evaluate_shift(recurrences, shift, l, m, n, parameters, dtype) for shift in recurrences.SHIFTS}
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Compile RR_*.txt recursion relations into cached NumPy modules.")
+    parser.add_argument("paths", nargs="+", help="RR files to compile.")
+    parser.add_argument("--cache-dir", type=str, help="Output directory (default: __rrcache__ next to each file).")
+    mode = parser.add_mutually_exclusive_group()
+    mode.add_argument(
+        "--fuse", action="store_true", help="Compile all files into one module, members named after the files."
+    )
+    mode.add_argument(
+        "--dispatch",
+        action="store_true",
+        help="Compile all files into one scalar HHrr-style dispatch module, members named after the files.",
+    )
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    members = {source_stem(path).removeprefix("RR_"): path for path in args.paths}
+    if args.dispatch:
+        recurrences = load_dispatch(members, cache_dir=args.cache_dir)
+        functions = ", ".join(f"{member}rr/{member}row" for member in recurrences.MEMBERS)
+        print(f"{functions}({', '.join(recurrences.ARGUMENTS)})")
+        print(f"  -> {recurrences.__file__}")
+        return
+    if args.fuse:
+        recurrences = load_fused_recurrences(members, cache_dir=args.cache_dir)
+        print(f"{', '.join(recurrences.MEMBERS)}: {len(recurrences.SHIFTS)} shifts, parameters {', '.join(recurrences.PARAMETERS)}")
+        print(f"  -> {recurrences.__file__}")
+        return
+    for path in args.paths:
+        recurrences = load_recurrences(path, cache_dir=args.cache_dir)
+        print(f"{path}: {len(recurrences.SHIFTS)} shifts, parameters {', '.join(recurrences.PARAMETERS)}")
+        print(f"  -> {recurrences.__file__}")
+
+
+if __name__ == "__main__":
+    main()
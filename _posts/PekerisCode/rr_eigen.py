@@ -0,0 +1,209 @@
+"""Top eigenpair of the MatrixGeneratorGS pencil HH x = lambda (-SS) x.
+
+MatrixGeneratorGS keeps only ``-eigvalsh(HHMat, -SSMat)[-1]``. That asks LAPACK
+for the whole spectrum of a dense pencil and throws all but one value away.
+``top_eigenpair`` requests just the largest eigenvalue and its eigenvector.
+
+HH and SS are symmetric, and the stencil builders only store one triangle,
+the lower one for SYM and ANTISYM and the upper one for ASYM. As with LAPACK's
+``uplo``, every solver here reads the ``triangle`` it is told about and
+ignores the other, so the matrices can stay in one-triangle sparse form
+(``rr_assembly.build_matrices``) until the solve.
+
+* ``dense`` uses the subset-by-index driver (``?sygvx``). The stored triangle
+  is written straight into float64 Fortran-order work arrays, which the
+  driver overwrites. No full-size longdouble copy is ever made.
+* ``lanczos`` and ``lobpcg`` never form a dense matrix. The triangle is
+  mirrored into a full sparse matrix, which costs O(nnz). A loose Lanczos run
+  (or a guess from a nearby solve) gives an estimate theta below the top
+  eigenvalue. The shift sigma = theta + margin is raised until
+  HH - sigma (-SS) is negative definite, which the pivots of a
+  diagonal-pivoting LU show. That factor then drives either shift-and-invert
+  Lanczos or LOBPCG, with (sigma (-SS) - HH)^{-1} as an SPD preconditioner.
+  In both cases the top eigenvalue is the one nearest the shift, so a
+  neighbour cannot be returned in its place.
+
+SciPy does not wrap LAPACK's packed generalized driver (``?spgvx``), so a
+packed triangle would have to be unpacked into a full array for the dense
+solve anyway. The sparse triangle is smaller than a packed one, and the
+sparse solvers take it directly.
+"""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+
+import numpy as np
+from scipy import sparse
+from scipy.linalg import eigh
+from scipy.sparse.linalg import ArpackNoConvergence, LinearOperator, eigsh, lobpcg, splu
+
+METHODS = ("dense", "lanczos", "lobpcg")
+
+TRIANGLES = ("lower", "upper")
+
+
+@dataclass(frozen=True)
+class Eigenpair:
+    value: float
+    vector: np.ndarray
+
+    @property
+    def energy(self) -> float:
+        """The value MatrixGeneratorGS prints, ``-lambda_max``."""
+        return -self.value
+
+
+def _stored_triangle(matrix: sparse.spmatrix, triangle: str) -> sparse.spmatrix:
+    if triangle not in TRIANGLES:
+        raise ValueError(f"triangle must be one of {TRIANGLES}, got {triangle!r}")
+    return sparse.tril(matrix) if triangle == "lower" else sparse.triu(matrix)
+
+
+def expand_triangle(matrix: sparse.spmatrix, triangle: str = "lower") -> sparse.csr_matrix:
+    """Full symmetric float64 CSR matrix from the stored ``triangle`` of ``matrix``; the other one is ignored."""
+    part = _stored_triangle(sparse.csr_matrix(matrix), triangle).astype(np.float64)
+    return (part + part.T - sparse.diags(part.diagonal())).tocsr()
+
+
+def _dense_work_array(matrix, triangle: str) -> np.ndarray:
+    if sparse.issparse(matrix):
+        return _stored_triangle(matrix, triangle).astype(np.float64).toarray(order="F")
+    return np.array(matrix, dtype=np.float64, order="F")
+
+
+def dense_top_eigenpair(hh, ss, triangle: str = "lower") -> Eigenpair:
+    """Largest eigenpair of HH x = lambda (-SS) x from LAPACK's subset-by-index driver.
+
+    Dense arrays (any float dtype) are cast to float64 once. Sparse ones have
+    only their stored triangle written out.
+    """
+    size = hh.shape[0]
+    a = _dense_work_array(hh, triangle)
+    b = _dense_work_array(ss, triangle)
+    np.negative(b, out=b)
+    values, vectors = eigh(
+        a,
+        b,
+        lower=triangle == "lower",
+        subset_by_index=[size - 1, size - 1],
+        driver="gvx",
+        overwrite_a=True,
+        overwrite_b=True,
+    )
+    return Eigenpair(float(values[0]), vectors[:, 0])
+
+
+def _negative_definite_factor(matrix: sparse.spmatrix):
+    """LU with diagonal pivots only, or None if ``matrix`` is not negative definite.
+
+    A symmetric permutation with no row pivoting makes U's diagonal the D of an
+    LDL^T factorisation, whose signs are the inertia of ``matrix``.
+    """
+    try:
+        lu = splu(
+            sparse.csc_matrix(matrix),
+            permc_spec="MMD_AT_PLUS_A",
+            diag_pivot_thresh=0.0,
+            options={"SymmetricMode": True},
+        )
+    except RuntimeError:
+        # Exactly singular: the shift is an eigenvalue.
+        return None
+    if not np.array_equal(lu.perm_r, lu.perm_c) or np.any(lu.U.diagonal() >= 0.0):
+        return None
+    return lu
+
+
+def shift_above_top(
+    hh: sparse.spmatrix, overlap: sparse.spmatrix, estimate: float, margin: float, attempts: int = 8
+):
+    """``(sigma, lu)`` with no eigenvalue above sigma = estimate + margin x 10^k, or None after ``attempts``."""
+    for _ in range(attempts):
+        sigma = estimate + margin
+        lu = _negative_definite_factor(hh - sigma * overlap)
+        if lu is not None:
+            return sigma, lu
+        margin *= 10.0
+    return None
+
+
+def default_margin(estimate: float) -> float:
+    return max(1e-6 * abs(estimate), 1e-12)
+
+
+def estimate_top_eigenpair(hh: sparse.spmatrix, overlap: sparse.spmatrix, tolerance: float = 1e-4) -> Eigenpair:
+    """Loosely converged Lanczos estimate of the largest eigenpair; its value lies below the true one."""
+    try:
+        values, vectors = eigsh(hh, k=1, M=overlap, which="LA", tol=tolerance)
+    except ArpackNoConvergence as exc:
+        if exc.eigenvalues.size == 0:
+            raise
+        values, vectors = exc.eigenvalues, exc.eigenvectors
+    return Eigenpair(float(values[0]), vectors[:, 0])
+
+
+def warm_eigenpair(
+    hh: sparse.spmatrix,
+    overlap: sparse.spmatrix,
+    previous: Eigenpair,
+    margin: float,
+    tolerance: float = 1e-12,
+    method: str = "lanczos",
+) -> Eigenpair | None:
+    """Largest eigenpair of HH x = lambda S x, starting from a nearby solution.
+
+    Returns None if no shift above the top eigenvalue was found.
+    """
+    found = shift_above_top(hh, overlap, previous.value, margin)
+    if found is None:
+        return None
+    sigma, lu = found
+
+    if method == "lobpcg":
+        preconditioner = LinearOperator(hh.shape, matvec=lambda r: -lu.solve(r), dtype=np.float64)
+        values, vectors = lobpcg(
+            hh,
+            previous.vector.reshape(-1, 1),
+            B=overlap,
+            M=preconditioner,
+            tol=tolerance,
+            maxiter=200,
+            largest=True,
+        )
+        return Eigenpair(float(values[0]), vectors[:, 0])
+
+    inverse = LinearOperator(hh.shape, matvec=lu.solve, dtype=np.float64)
+    values, vectors = eigsh(
+        hh, k=1, M=overlap, sigma=sigma, which="LM", v0=previous.vector, OPinv=inverse, tol=tolerance
+    )
+    return Eigenpair(float(values[0]), vectors[:, 0])
+
+
+def top_eigenpair(
+    hh,
+    ss,
+    method: str = "lanczos",
+    guess: Eigenpair | None = None,
+    tolerance: float = 1e-12,
+    triangle: str = "lower",
+) -> Eigenpair:
+    """Largest eigenpair of HH x = lambda (-SS) x; the MatrixGeneratorGS energy is ``result.energy``.
+
+    Only the ``triangle`` of HH and SS is read. Dense arrays always use the
+    LAPACK subset driver. Sparse matrices use ``"dense"`` (the same driver on
+    the unpacked triangle), shift-and-invert ``"lanczos"`` or preconditioned
+    ``"lobpcg"``, the last two starting from ``guess`` when one is given.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    if not sparse.issparse(hh) or method == "dense":
+        return dense_top_eigenpair(hh, ss, triangle)
+
+    hh = expand_triangle(hh, triangle)
+    overlap = -expand_triangle(ss, triangle)
+    guess = estimate_top_eigenpair(hh, overlap) if guess is None else guess
+    pair = warm_eigenpair(hh, overlap, guess, default_margin(guess.value), tolerance, method)
+    if pair is None:
+        raise RuntimeError(f"no shift above the top eigenvalue found near {guess.value}")
+    return pair
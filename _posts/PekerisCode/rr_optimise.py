@@ -0,0 +1,362 @@
+"""In-process optimisation of the nonlinear exponents A, B, C of MatrixGeneratorGS.
+
+The energy printed by MatrixGeneratorGS is ``-lambda_max`` of the pencil
+HH x = lambda (-SS) x. Tuning A, B and C by re-running the script costs a full
+basis walk and a dense solve of the whole spectrum for every point. Here the
+walk is done once. ``rr_assembly.cached_structure`` keeps the pattern and the
+index-only factors, and each point only re-evaluates the coefficients
+(``rebuild_matrices``).
+
+Only the top eigenpair is wanted, and consecutive optimiser points are close.
+So after the first dense solve, each point uses shift-and-invert Lanczos
+started from the previous eigenpair (``rr_eigen.warm_eigenpair``).
+
+Points outside the exponent bounds, and points whose pencil is not finite or
+not definite, have energy ``inf`` rather than raising, so an unbounded method
+such as Nelder-Mead is simply pushed back into the valid region. Repeated
+points are answered from a memo. Points an optimiser asks for as a
+batch (the Nelder-Mead start simplex, the BOBYQA interpolation set,
+finite-difference stencils) can be solved in a process pool.
+
+    with ExponentObjective(RRFused, "SYM", l, m, n, Global_dict, workers=4) as objective:
+        result = optimise_exponents(objective, method="nelder-mead")
+"""
+
+from __future__ import annotations
+
+import math
+import multiprocessing
+import time
+from dataclasses import dataclass
+from types import ModuleType
+
+import numpy as np
+from scipy import sparse
+from scipy.linalg import LinAlgError
+from scipy.optimize import minimize
+from scipy.sparse.linalg import ArpackError
+
+from rr_assembly import SCHEMES, AssemblyStructure, cached_structure, rebuild_matrices
+from rr_codegen import load_generated
+from rr_eigen import Eigenpair, default_margin, dense_top_eigenpair, expand_triangle, warm_eigenpair
+
+METHODS = ("nelder-mead", "bobyqa", "lbfgs")
+
+EXPONENTS = ("A", "B", "C")
+
+
+@dataclass(frozen=True)
+class Evaluation:
+    exponents: tuple[float, ...]
+    energy: float
+    seconds: float
+    warm: bool
+
+
+@dataclass(frozen=True)
+class OptimisationResult:
+    method: str
+    exponents: dict[str, float]
+    energy: float
+    # Distinct points solved, and objective calls including memo hits.
+    evaluations: int
+    calls: int
+    seconds: float
+    message: str
+
+
+def _pencil(matrices: list[sparse.csr_matrix], triangle: str) -> tuple[sparse.csr_matrix, sparse.csr_matrix]:
+    hh, ss = (expand_triangle(matrix, triangle) for matrix in matrices)
+    return hh, -ss
+
+
+def _shift_margin(previous: Eigenpair, drift: float) -> float:
+    return max(2.0 * drift, default_margin(previous.value))
+
+
+def _solve_point(
+    structure: AssemblyStructure,
+    recurrences: ModuleType,
+    parameters: dict[str, float],
+    previous: Eigenpair | None,
+    drift: float,
+) -> tuple[Eigenpair | None, bool]:
+    """Top eigenpair at ``parameters`` and whether it was warm-started; None if the pencil is not valid there."""
+    # The assembled matrices hold one triangle; the solvers need both.
+    hh, overlap = _pencil(rebuild_matrices(structure, recurrences, parameters), SCHEMES[structure.scheme].triangle)
+    if not (np.isfinite(hh.data).all() and np.isfinite(overlap.data).all()):
+        return None, False
+    try:
+        if previous is not None:
+            pair = warm_eigenpair(hh, overlap, previous, _shift_margin(previous, drift))
+            if pair is not None:
+                return pair, True
+        return dense_top_eigenpair(hh, -overlap), False
+    except (LinAlgError, ArpackError):
+        # -SS is not positive definite here, so there is no variational energy.
+        return None, False
+
+
+_worker: dict = {}
+
+
+def _init_worker(module_path: str, structure: AssemblyStructure, parameters: dict[str, float]) -> None:
+    _worker.update(recurrences=load_generated(module_path), structure=structure, parameters=parameters)
+
+
+def _solve_in_worker(
+    task: tuple[dict[str, float], Eigenpair | None, float],
+) -> tuple[Eigenpair | None, bool, float]:
+    overrides, previous, drift = task
+    start = time.perf_counter()
+    pair, warm = _solve_point(
+        _worker["structure"], _worker["recurrences"], {**_worker["parameters"], **overrides}, previous, drift
+    )
+    return pair, warm, time.perf_counter() - start
+
+
+class ExponentObjective:
+    """Energy as a function of the exponents ``names``, memoised and warm-started.
+
+    Calling the object with a point returns the energy. Every distinct point
+    is recorded in ``history``. The last solved eigenpair seeds the next solve.
+    Points with any exponent outside [``lower``, ``upper``], or that are not
+    finite, are given energy ``inf`` without a solve, as are points whose
+    pencil cannot be solved.
+    ``workers > 1`` opens a process pool for ``evaluate_many``; use the object
+    as a context manager so the pool is closed afterwards.
+    """
+
+    def __init__(
+        self,
+        recurrences: ModuleType,
+        scheme: str,
+        l: np.ndarray,
+        m: np.ndarray,
+        n: np.ndarray,
+        parameters: dict[str, float],
+        names: tuple[str, ...] = EXPONENTS,
+        workers: int = 1,
+        dtype: type = np.float64,
+        lower: float = 1e-3,
+        upper: float = 50.0,
+    ) -> None:
+        self.recurrences = recurrences
+        self.parameters = dict(parameters)
+        self.names = tuple(names)
+        self.workers = workers
+        self.lower = lower
+        self.upper = upper
+        self.structure = cached_structure(recurrences, scheme, l, m, n, self.parameters, dtype=dtype)
+        self.history: list[Evaluation] = []
+        self.calls = 0
+        self._memo: dict[tuple[float, ...], float] = {}
+        self._previous: Eigenpair | None = None
+        self._drift = 0.0
+        self._pool = None
+
+    def __enter__(self) -> ExponentObjective:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self._pool is not None:
+            self._pool.close()
+            self._pool.join()
+            self._pool = None
+
+    @property
+    def start(self) -> np.ndarray:
+        return np.array([float(self.parameters[name]) for name in self.names])
+
+    @property
+    def best(self) -> Evaluation:
+        return min(self.history, key=lambda evaluation: evaluation.energy)
+
+    def _key(self, x) -> tuple[float, ...]:
+        return tuple(float(value) for value in np.ravel(x))
+
+    def _valid(self, key: tuple[float, ...]) -> bool:
+        return all(math.isfinite(value) and self.lower <= value <= self.upper for value in key)
+
+    def _record(self, key: tuple[float, ...], pair: Eigenpair | None, warm: bool, seconds: float) -> float:
+        if pair is None:
+            energy = math.inf
+        else:
+            if self._previous is not None:
+                self._drift = abs(pair.value - self._previous.value)
+            self._previous = pair
+            energy = pair.energy
+        self._memo[key] = energy
+        self.history.append(Evaluation(key, energy, seconds, warm))
+        return energy
+
+    def __call__(self, x) -> float:
+        self.calls += 1
+        key = self._key(x)
+        if key not in self._memo:
+            self._solve(key)
+        return self._memo[key]
+
+    def _solve(self, key: tuple[float, ...]) -> float:
+        if not self._valid(key):
+            return self._record(key, None, False, 0.0)
+        start = time.perf_counter()
+        pair, warm = _solve_point(
+            self.structure,
+            self.recurrences,
+            {**self.parameters, **dict(zip(self.names, key))},
+            self._previous,
+            self._drift,
+        )
+        return self._record(key, pair, warm, time.perf_counter() - start)
+
+    def evaluate_many(self, points) -> np.ndarray:
+        """Energies at ``points``, solving the ones not yet memoised in the worker pool.
+
+        Every worker starts from the current eigenpair. Afterwards the lowest
+        new energy becomes the seed for the next solve.
+        """
+        keys = [self._key(point) for point in points]
+        self.calls += len(keys)
+        pending = list(dict.fromkeys(key for key in keys if key not in self._memo))
+        for key in [key for key in pending if not self._valid(key)]:
+            pending.remove(key)
+            self._solve(key)
+        if self.workers > 1 and len(pending) > 1:
+            if self._pool is None:
+                initargs = (self.recurrences.__file__, self.structure, self.parameters)
+                self._pool = multiprocessing.Pool(self.workers, initializer=_init_worker, initargs=initargs)
+            tasks = [(dict(zip(self.names, key)), self._previous, self._drift) for key in pending]
+            solved = self._pool.map(_solve_in_worker, tasks)
+            order = sorted(zip(pending, solved), key=lambda item: -math.inf if item[1][0] is None else item[1][0].value)
+            for key, (pair, warm, seconds) in order:
+                # Recording in increasing eigenvalue order leaves the lowest energy as the seed.
+                self._record(key, pair, warm, seconds)
+        else:
+            for key in pending:
+                self._solve(key)
+        return np.array([self._memo[key] for key in keys])
+
+    def gradient(self, x, step: float = 1e-5) -> np.ndarray:
+        """Central-difference gradient; the 2 x len(names) points are solved as one batch."""
+        x = np.asarray(x, dtype=np.float64)
+        offsets = step * np.eye(x.size)
+        energies = self.evaluate_many([*(x + offsets), *(x - offsets)])
+        return (energies[: x.size] - energies[x.size :]) / (2.0 * step)
+
+
+def _nelder_mead(objective: ExponentObjective, x0: np.ndarray, step: float, tolerance: float, max_evaluations: int):
+    simplex = np.vstack([x0, x0 + step * np.eye(x0.size)])
+    objective.evaluate_many(simplex)
+    result = minimize(
+        objective,
+        x0,
+        method="Nelder-Mead",
+        options={"initial_simplex": simplex, "xatol": tolerance, "fatol": tolerance, "maxfev": max_evaluations},
+    )
+    return result.x, result.message
+
+
+def _bobyqa(
+    objective: ExponentObjective,
+    x0: np.ndarray,
+    step: float,
+    tolerance: float,
+    max_evaluations: int,
+    bounds: tuple[np.ndarray, np.ndarray],
+):
+    try:
+        import pybobyqa
+    except ImportError as exc:
+        raise RuntimeError("The BOBYQA optimiser requires Py-BOBYQA (pip install Py-BOBYQA).") from exc
+
+    # Py-BOBYQA's first interpolation points are x0 and x0 +- step along each axis away from the bounds,
+    # so solve those up front as one batch; any point it places differently is simply solved later.
+    offsets = step * np.eye(x0.size)
+    objective.evaluate_many([x0, *(x0 + offsets), *(x0 - offsets)])
+    result = pybobyqa.solve(
+        objective,
+        x0,
+        bounds=bounds,
+        rhobeg=step,
+        rhoend=tolerance,
+        maxfun=max_evaluations,
+        objfun_has_noise=False,
+    )
+    return result.x, result.msg
+
+
+def _lbfgs(
+    objective: ExponentObjective,
+    x0: np.ndarray,
+    tolerance: float,
+    max_evaluations: int,
+    bounds: tuple[np.ndarray, np.ndarray],
+    gradient_step: float,
+):
+    result = minimize(
+        objective,
+        x0,
+        method="L-BFGS-B",
+        jac=lambda x: objective.gradient(x, gradient_step),
+        bounds=list(zip(*bounds)),
+        options={"ftol": tolerance, "maxfun": max_evaluations},
+    )
+    return result.x, result.message
+
+
+def optimise_exponents(
+    objective: ExponentObjective,
+    method: str = "nelder-mead",
+    start=None,
+    step: float = 0.1,
+    tolerance: float = 1e-8,
+    max_evaluations: int = 200,
+    gradient_step: float = 1e-5,
+) -> OptimisationResult:
+    """Minimise the energy over the objective's exponents with Nelder-Mead, BOBYQA or L-BFGS-B.
+
+    ``start`` defaults to the exponents in the objective's parameters. ``step``
+    is the initial simplex edge for Nelder-Mead and the initial trust radius
+    for BOBYQA. The objective's ``lower`` and ``upper`` bound every exponent
+    for the methods that take bounds; Nelder-Mead sees ``inf`` outside them.
+    L-BFGS-B uses central differences with ``gradient_step``,
+    solved in parallel when the objective has workers.
+    """
+    if method not in METHODS:
+        raise ValueError(f"method must be one of {METHODS}, got {method!r}")
+    x0 = objective.start if start is None else np.asarray(start, dtype=np.float64)
+    bounds = (np.full(x0.size, objective.lower), np.full(x0.size, objective.upper))
+    calls = objective.calls
+    evaluations = len(objective.history)
+
+    begin = time.perf_counter()
+    if method == "nelder-mead":
+        x, message = _nelder_mead(objective, x0, step, tolerance, max_evaluations)
+    elif method == "bobyqa":
+        x, message = _bobyqa(objective, x0, step, tolerance, max_evaluations, bounds)
+    else:
+        x, message = _lbfgs(objective, x0, tolerance, max_evaluations, bounds, gradient_step)
+    seconds = time.perf_counter() - begin
+
+    return OptimisationResult(
+        method=method,
+        exponents=dict(zip(objective.names, map(float, x))),
+        energy=objective(x),
+        evaluations=len(objective.history) - evaluations,
+        calls=objective.calls - calls,
+        seconds=seconds,
+        message=str(message),
+    )
+
+
+def print_optimisation(result: OptimisationResult) -> None:
+    exponents = ", ".join(f"{name} = {value:.10f}" for name, value in result.exponents.items())
+    print(f"{result.method}: {exponents}")
+    print(f"  energy {result.energy:.15f}")
+    print(
+        f"  {result.evaluations} solves for {result.calls} objective calls in {result.seconds:.2f} s ({result.message})"
+    )
@@ -0,0 +1,67 @@
+"""Shared fixtures; puts the PekerisCode modules on the path so the tests run from anywhere."""
+
+import itertools
+import math
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import rr_codegen  # noqa: E402
+
+# Run parameters in the spelling of the MatrixGeneratorGS symbol table, ``np`` included.
+PARAMETERS = dict(A=1.1, B=1.3, C=2.2, K=1.0, np=1.0, m1=1.0, m2=1.0, m3=10000.0, Z1=-1.0, Z2=-1.0, Z3=2.0)
+
+# Every shift with |lambda| + |mu| + |nu| <= 2, as in a Hylleraas recursion relation.
+SHIFTS = [shift for shift in itertools.product(range(-2, 3), repeat=3) if sum(map(abs, shift)) <= 2]
+
+
+def _hh_expression(shift):
+    a, b, c = shift
+    return (
+        f"({a}+l)^2*A/B-Z1*Z2*m3/(m1+m2)*(m+{b + 3})+C*(n+1)^2/{c + 4}-0.5*K*np"
+        f"+{b + 2}*Z3*(l*m+n^2)/(m1*m2*m3)^(1/3)-sqrt(A*B)*pi/{a + 5}"
+    )
+
+
+def _ss_expression(shift):
+    a, b, c = shift
+    if shift == (0, 0, 0):
+        return "-(l+m+n+3)^3*(1+1/A)-(l+1)*(m+1)*B"
+    return f"{b + 3}*(l+{abs(a)})*(m+1)/(B*C)-(n+{abs(c)})^2/(A*(m1+m2))+(l-m)^2*n/C^2/{c + 3}"
+
+
+class Expression:
+    """One RR line evaluated at the symbol table's current (l, m, n), like a ``cexprtk.Expression``."""
+
+    def __init__(self, text, table):
+        self.code = compile(text.replace("^", "**"), "<rr>", "eval")
+        self.table = table
+
+    def __call__(self):
+        return eval(self.code, {"sqrt": math.sqrt, "pi": math.pi}, self.table)
+
+
+def reference_dictionary(path, parameters):
+    """The MatrixGeneratorGS symbol table and ``{shift: Expression}`` dictionary of an RR file."""
+    table = dict(parameters, l=0.0, m=0.0, n=0.0)
+    return table, {shift: Expression(text, table) for shift, text in rr_codegen.parse_rr_file(path).items()}
+
+
+@pytest.fixture(scope="session")
+def rr_files(tmp_path_factory):
+    """Synthetic ``{"HH": path, "SS": path}`` RR files covering powers, sqrt, pi and the ``np`` rename."""
+    directory = tmp_path_factory.mktemp("rr")
+    paths = {}
+    for member, expression in (("HH", _hh_expression), ("SS", _ss_expression)):
+        path = directory / f"RR_{member}.txt"
+        path.write_text("".join(f"{a} {b} {c} {expression((a, b, c))}\n" for a, b, c in SHIFTS), encoding="utf-8")
+        paths[member] = str(path)
+    return paths
+
+
+@pytest.fixture(scope="module")
+def cache_dir(tmp_path_factory):
+    return str(tmp_path_factory.mktemp("rrcache"))
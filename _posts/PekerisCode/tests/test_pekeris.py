@@ -0,0 +1,217 @@
+"""Pekeris helium solver: assembly, the solvers, refinement and the sweep drivers."""
+
+import math
+import sys
+
+import numpy as np
+import pytest
+
+import Pekeris
+
+# Nonrelativistic helium ground state, Hartree.
+HELIUM_ENERGY = -2.903724377034119598
+
+
+@pytest.mark.parametrize("omega", [0, 2, 6])
+def test_sparse_assembly_matches_dense(omega):
+    a, b, basis = Pekeris.build_paper_matrices(omega)
+    sparse_a, sparse_b, sparse_basis = Pekeris.build_sparse_paper_matrices(omega)
+    assert list(sparse_basis) == list(basis)
+    np.testing.assert_allclose(sparse_a.toarray(), a)
+    np.testing.assert_allclose(sparse_b.toarray(), b)
+
+
+@pytest.mark.parametrize("roots", [1, 3])
+def test_arnoldi_matches_dense(roots):
+    dense = Pekeris.solve_paper_determinant(6, roots=roots)
+    arnoldi = Pekeris.solve_paper_determinant(6, assembly="sparse", solver="arnoldi", roots=roots)
+    np.testing.assert_allclose(arnoldi.epsilons, dense.epsilons, rtol=1e-12)
+
+
+def test_incremental_ladder_matches_direct_solves():
+    ladder = Pekeris.benchmark([2, 4, 5, 8], incremental=True, roots=2)
+    for result in ladder:
+        direct = Pekeris.solve_paper_determinant(result.omega, assembly="sparse", roots=2)
+        assert result.basis_size == direct.basis_size
+        np.testing.assert_allclose(result.epsilons, direct.epsilons, rtol=1e-11)
+
+
+def test_incremental_benchmark_passes_options_through():
+    pytest.importorskip("mpmath")
+    (result,) = Pekeris.benchmark([4], incremental=True, refine_digits=20, ordering="rcm")
+    assert result.solver == "arnoldi+rcm"
+    assert result.refined_epsilon is not None
+
+
+@pytest.mark.parametrize(
+    "options",
+    [
+        dict(assembly="dense"),
+        dict(solver="dense"),
+        dict(assembly="sparse", solver="arnoldi", cache_dir="cache"),
+    ],
+)
+def test_incremental_benchmark_rejects_other_settings(options):
+    with pytest.raises(ValueError):
+        Pekeris.benchmark([4], incremental=True, **options)
+
+
+def test_benchmark_defaults_to_dense():
+    (result,) = Pekeris.benchmark([3])
+    assert result.solver == "dense"
+
+
+@pytest.mark.parametrize("assembly", ["dense", "sparse"])
+def test_pencil_cache_hit_and_miss(tmp_path, assembly):
+    cache_dir = str(tmp_path)
+    first = Pekeris.solve_paper_determinant(4, z=2, assembly=assembly, cache_dir=cache_dir)
+    again = Pekeris.solve_paper_determinant(4, z=2, assembly=assembly, cache_dir=cache_dir)
+    other_omega = Pekeris.solve_paper_determinant(5, z=2, assembly=assembly, cache_dir=cache_dir)
+    assert not first.build_cached and again.build_cached and not other_omega.build_cached
+    assert again.epsilon == first.epsilon
+
+
+def test_pencil_cache_keeps_nearby_charges_apart(tmp_path):
+    cache_dir = str(tmp_path)
+    Pekeris.solve_paper_determinant(4, z=0.911, assembly="sparse", cache_dir=cache_dir)
+    nearby = Pekeris.solve_paper_determinant(4, z=0.91100001, assembly="sparse", cache_dir=cache_dir)
+    fresh = Pekeris.solve_paper_determinant(4, z=0.91100001, assembly="sparse")
+    assert not nearby.build_cached
+    assert nearby.epsilon == fresh.epsilon
+    assert Pekeris.solve_paper_determinant(4, z=0.91100001, assembly="sparse", cache_dir=cache_dir).build_cached
+
+
+def test_sweep_resumes_from_its_jsonl(tmp_path):
+    jsonl = str(tmp_path / "sweep.jsonl")
+    first = Pekeris.sweep([2], [2, 3], jsonl, workers=2)
+    assert [(result.nuclear_charge, result.omega) for result in first] == [(2, 2), (2, 3)]
+    with open(jsonl, "a", encoding="utf-8") as handle:
+        # What a run killed in the middle of a write leaves behind.
+        handle.write('{"omega": 4, "nuclear')
+
+    resumed = Pekeris.sweep([2, 3], [2, 3], jsonl, workers=2)
+    assert [(result.nuclear_charge, result.omega) for result in resumed] == [(3, 2), (3, 3)]
+    direct = Pekeris.solve_paper_determinant(3, z=3, assembly="sparse", solver="arnoldi")
+    assert resumed[-1].epsilon == pytest.approx(direct.epsilon, rel=1e-12)
+    assert len(Pekeris._completed_points(jsonl)) == 4
+
+
+@pytest.mark.parametrize("omega", [0, 1, 3, 6, 9])
+def test_refine_epsilon_agrees_with_float64(omega):
+    pytest.importorskip("mpmath")
+    float64 = Pekeris.solve_paper_determinant(omega, assembly="sparse")
+    a, b, _ = Pekeris.build_sparse_paper_matrices(omega)
+    vector = Pekeris._eigenvector_at(a, b, float64.epsilon)
+    refined, iterations = Pekeris.refine_epsilon(a, b, omega, 2, float64.epsilon, vector, digits=30)
+    assert float(refined) == pytest.approx(float64.epsilon, rel=1e-12)
+    assert iterations >= 1
+    # A start one part in 10^9 away converges to the same 30 digits.
+    restarted, _ = Pekeris.refine_epsilon(a, b, omega, 2, float64.epsilon * (1 + 1e-9), vector, digits=30)
+    assert abs(restarted - refined) <= 1e-28 * refined
+
+
+def test_refined_values():
+    mpmath = pytest.importorskip("mpmath")
+    # omega = 0 is the single state e^{-(u+v+w)/2}: epsilon = Z - 5/16 exactly.
+    assert Pekeris.solve_paper_determinant(0, refine_digits=25).refined_epsilon == mpmath.nstr(mpmath.mpf(27) / 16, 25)
+    result = Pekeris.solve_paper_determinant(3, assembly="sparse", solver="arnoldi", refine_digits=30)
+    assert result.refined_epsilon == "1.70399414376834496645524290885"
+
+
+@pytest.mark.parametrize("omega, roots", [(0, 1), (1, 2)])
+def test_arnoldi_refinement_on_tiny_pencils(omega, roots):
+    pytest.importorskip("mpmath")
+    # Arnoldi returns no eigenvectors when the pencil is too small for its Krylov space.
+    options = dict(assembly="sparse", roots=roots, refine_digits=20)
+    arnoldi = Pekeris.solve_paper_determinant(omega, solver="arnoldi", **options)
+    dense = Pekeris.solve_paper_determinant(omega, solver="dense", **options)
+    assert arnoldi.refined_epsilon == dense.refined_epsilon
+
+
+def test_refinement_without_mpmath(monkeypatch):
+    monkeypatch.setitem(sys.modules, "mpmath", None)
+    with pytest.raises(RuntimeError, match="requires mpmath"):
+        Pekeris.solve_paper_determinant(2, refine_digits=20)
+
+
+@pytest.mark.parametrize("digits", [6, 8])
+def test_converge_to_digits_meets_its_target(digits):
+    result = Pekeris.converge_to_digits(digits)
+    assert result.converged
+    assert abs(result.extrapolated_energy_hartree - HELIUM_ENERGY) <= 10.0**-digits * abs(HELIUM_ENERGY)
+    assert math.isclose(result.extrapolated_epsilon**2, -result.extrapolated_energy_hartree)
+    assert [r.omega for r in result.results] == list(range(5, result.omega + 1))
+
+
+@pytest.mark.parametrize("omega", [6, 9])
+def test_matrix_free_matches_dense(omega):
+    dense = Pekeris.solve_paper_determinant(omega)
+    matrix_free = Pekeris.solve_paper_determinant(omega, solver="matrix-free")
+    assert matrix_free.epsilon == pytest.approx(dense.epsilon, rel=1e-10)
+
+
+def test_linear_operators_match_assembled_pencil():
+    a, b, _ = Pekeris.build_sparse_paper_matrices(7)
+    operator_a, operator_b = Pekeris.paper_linear_operators(7)
+    x = np.random.default_rng(0).standard_normal(a.shape[0])
+    np.testing.assert_allclose(operator_a @ x, a @ x, rtol=1e-12, atol=1e-12)
+    np.testing.assert_allclose(operator_b @ x, b @ x, rtol=1e-12, atol=1e-12)
+    weighted_a, _ = Pekeris.paper_linear_operators(7, symmetric=True)
+    l, m, _ = Pekeris.symmetric_basis_arrays(7)
+    np.testing.assert_allclose(weighted_a @ x, Pekeris.singlet_weights(l, m) * (a @ x), rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("omega", [0, 1, 2, 8])
+def test_excited_states_match_dense(omega):
+    result, vectors = Pekeris.solve_excited_states(omega, roots=3)
+    dense = Pekeris.solve_paper_determinant(omega, roots=3)
+    np.testing.assert_allclose(result.epsilons, dense.epsilons, rtol=1e-11)
+    assert vectors.shape == (result.basis_size, len(result.epsilons))
+    assert len(result.residuals) == len(result.epsilons) and max(result.residuals) < 1e-10
+    a, b, _ = Pekeris.build_sparse_paper_matrices(omega)
+    for epsilon, vector, residual in zip(result.epsilons, vectors.T, result.residuals):
+        relative = np.linalg.norm(a @ vector + epsilon * (b @ vector)) / (epsilon * np.linalg.norm(b @ vector))
+        assert relative == pytest.approx(residual, rel=1e-6, abs=1e-15)
+
+
+@pytest.mark.parametrize("omega", [0, 6])
+def test_lanczos_solver_matches_dense(omega):
+    dense = Pekeris.solve_paper_determinant(omega, roots=2)
+    lanczos = Pekeris.solve_paper_determinant(omega, assembly="sparse", solver="lanczos", roots=2)
+    np.testing.assert_allclose(lanczos.epsilons, dense.epsilons, rtol=1e-11)
+
+
+def test_fill_report(capsys):
+    report = Pekeris.factorization_report(10)
+    rows = {row["ordering"]: row for row in report}
+    assert list(rows) == list(Pekeris.ORDERINGS)
+    a, b, _ = Pekeris.build_sparse_paper_matrices(10)
+    pattern = abs(a) + abs(b)
+    for row in report:
+        assert row["pencil_nnz"] == pattern.nnz
+        assert row["fill_ratio"] == pytest.approx(row["lu_nnz"] / row["pencil_nnz"])
+        assert row["lu_nnz"] >= pattern.nnz and row["factor_seconds"] >= 0.0
+    assert rows["natural"]["bandwidth"] == Pekeris._bandwidth(pattern)
+    # RCM exists to narrow the band, and fill-reducing orderings should beat the natural one.
+    assert rows["rcm"]["bandwidth"] < rows["natural"]["bandwidth"]
+    assert rows["colamd"]["lu_nnz"] < rows["natural"]["lu_nnz"]
+
+    Pekeris.print_fill_report([6, 10], 2)
+    assert sum(line.split()[1] in Pekeris.ORDERINGS for line in capsys.readouterr().out.splitlines()) == 8
+
+
+@pytest.mark.parametrize("ordering", Pekeris.ORDERINGS)
+def test_orderings_give_the_same_roots(ordering):
+    dense = Pekeris.solve_paper_determinant(8, roots=2)
+    result = Pekeris.solve_paper_determinant(8, assembly="sparse", solver="arnoldi", roots=2, ordering=ordering)
+    np.testing.assert_allclose(result.epsilons, dense.epsilons, rtol=1e-11)
+
+
+@pytest.mark.parametrize("charges", [np.linspace(2.0, 1.0, 11), np.linspace(0.95, 3.0, 7)])
+def test_continuation_matches_direct_solves(charges):
+    results = Pekeris.continuation_scan(8, charges.tolist())
+    assert [result.nuclear_charge for result in results] == pytest.approx(charges.tolist())
+    for result in results:
+        direct = Pekeris.solve_paper_determinant(8, z=result.nuclear_charge)
+        assert result.epsilon == pytest.approx(direct.epsilon, rel=1e-9)
+        assert result.residuals[0] < 1e-9
@@ -0,0 +1,24 @@
+"""Closed-form Table I indexing against the basis loops of Pekeris.py."""
+
+import numpy as np
+import pytest
+
+import Pekeris
+from pekeris_basis import basis_size, canonical_rank, rank_state, symmetric_basis_arrays, unrank_state
+
+
+@pytest.mark.parametrize("omega", [0, 1, 5, 12, 30])
+def test_basis_arrays_match_loops(omega):
+    basis = Pekeris.symmetric_basis_for_omega(omega)
+    l, m, n = symmetric_basis_arrays(omega)
+    assert basis_size(omega) == len(basis)
+    assert list(zip(l.tolist(), m.tolist(), n.tolist())) == basis
+
+
+@pytest.mark.parametrize("omega", [0, 3, 30])
+def test_rank_round_trip(omega):
+    index = np.arange(basis_size(omega))
+    l, m, n = unrank_state(index)
+    np.testing.assert_array_equal(rank_state(l, m, n), index)
+    np.testing.assert_array_equal(canonical_rank(m, l, n), index)
+    assert rank_state(int(l[-1]), int(m[-1]), int(n[-1])) == index[-1]
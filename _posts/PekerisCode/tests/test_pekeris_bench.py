@@ -0,0 +1,66 @@
+"""Baseline comparison of the Pekeris scaling benchmark."""
+
+import json
+import sys
+from dataclasses import asdict
+
+import pytest
+
+import pekeris_bench
+from pekeris_bench import PhaseStats, ScalingPoint
+
+CONFIGURATION = {"assembly": "sparse", "solver": "arnoldi", "ordering": "colamd", "Z": 2.0}
+
+
+def point(omega, seconds, traced=1.0):
+    stats = PhaseStats(median=seconds, minimum=seconds, maximum=seconds, iqr=0.0)
+    return ScalingPoint(omega, 10 * omega, 100, 800, 1.7, stats, stats, stats, 50.0, traced)
+
+
+def baseline(points, **overrides):
+    return {**CONFIGURATION, **overrides, "points": [asdict(p) for p in points], "exponents": {}}
+
+
+def test_no_regression_within_threshold():
+    saved = baseline([point(4, 1.0), point(6, 2.0)])
+    assert pekeris_bench.compare_to_baseline([point(4, 1.2), point(6, 2.1)], saved, 0.25, CONFIGURATION) == []
+
+
+def test_regressions_are_reported_per_phase():
+    saved = baseline([point(4, 1.0)])
+    current = [point(4, 1.5, traced=2.0), point(8, 9.0)]
+    regressions = pekeris_bench.compare_to_baseline(current, saved, 0.25, CONFIGURATION)
+    phases = {(r.omega, r.phase) for r in regressions}
+    assert phases == {(4, "build"), (4, "solve"), (4, "total"), (4, "peak_traced_mib")}
+    assert all(r.ratio == pytest.approx(r.current / r.baseline) for r in regressions)
+
+
+@pytest.mark.parametrize("key, value", [("solver", "lanczos"), ("ordering", "rcm"), ("Z", 2.5), ("assembly", "dense")])
+def test_configuration_mismatch_is_refused(key, value):
+    saved = baseline([point(4, 1.0)], **{key: value})
+    assert pekeris_bench.configuration_mismatches(saved, CONFIGURATION) == {key: (value, CONFIGURATION[key])}
+    with pytest.raises(ValueError, match=key):
+        pekeris_bench.compare_to_baseline([point(4, 1.0)], saved, 0.25, CONFIGURATION)
+
+
+def test_baseline_without_a_recorded_ordering_is_refused():
+    saved = baseline([point(4, 1.0)])
+    del saved["ordering"]
+    with pytest.raises(ValueError, match="ordering"):
+        pekeris_bench.compare_to_baseline([point(4, 1.0)], saved, 0.25, CONFIGURATION)
+
+
+def test_main_saves_and_checks_a_baseline(tmp_path, monkeypatch, capsys):
+    path = str(tmp_path / "base.json")
+    run = ["pekeris_bench.py", "--omegas", "3", "4", "--repeats", "1", "--solver", "lanczos", "--Z", "2.5"]
+    monkeypatch.setattr(sys, "argv", [*run, "--save-baseline", path])
+    pekeris_bench.main()
+    with open(path, encoding="utf-8") as handle:
+        saved = json.load(handle)
+    assert (saved["solver"], saved["Z"], len(saved["points"])) == ("lanczos", 2.5, 2)
+
+    monkeypatch.setattr(sys, "argv", [*run[:-2], "--Z", "2", "--baseline", path])
+    with pytest.raises(SystemExit) as exit_info:
+        pekeris_bench.main()
+    assert exit_info.value.code == 2
+    assert "different configuration" in capsys.readouterr().out
@@ -0,0 +1,128 @@
+"""Stencil assembly against the original MatrixGeneratorGS J-scan builders.
+
+``reference_matrix`` ports ``mat_build_SYM``, ``mat_build_ASYM`` and
+``mat_build_ANTISYM``, with the ``eval`` dictionary from conftest standing in
+for cexprtk.
+"""
+
+import numpy as np
+import pytest
+from conftest import PARAMETERS, reference_dictionary
+
+import rr_assembly
+import rr_basis
+import rr_codegen
+
+MAT_SIZE = 30
+
+
+def reference_matrix(path, scheme, states, parameters):
+    table, dictionary = reference_dictionary(path, parameters)
+    size = len(states)
+    matrix = np.zeros((size, size))
+    for H, (L, M, N) in enumerate(states):
+        if scheme == "ASYM":
+            table.update(l=L, m=M, n=N)
+            for J in range(H + 1):
+                shift = tuple(int(value) for value in states[J] - states[H])
+                if shift in dictionary:
+                    matrix[J, H] += dictionary[shift]()
+            continue
+        for J in range(H, size):
+            table.update(l=L, m=M, n=N)
+            Lp, Mp, Np = states[J]
+            shift = (Lp - L, Mp - M, Np - N)
+            direct = dictionary[shift]() if shift in dictionary else 0.0
+            if L == M and Lp == Mp:
+                direct /= 2
+            exchange = 0.0
+            if L != M and Lp != Mp:
+                shift = (Lp - M, Mp - L, Np - N)
+                table.update(l=M, m=L, n=N)
+                exchange = dictionary[shift]() if shift in dictionary else 0.0
+            matrix[J, H] += 8 * (direct - exchange) if scheme == "ANTISYM" else direct + exchange
+    return matrix
+
+
+@pytest.fixture(scope="module")
+def maps(tmp_path_factory):
+    return {
+        scheme: states[:MAT_SIZE]
+        for scheme, states in rr_basis.basis_maps(MAT_SIZE, str(tmp_path_factory.mktemp("basis"))).items()
+    }
+
+
+@pytest.fixture(scope="module")
+def singles(rr_files, cache_dir):
+    return [rr_codegen.load_recurrences(rr_files[member], cache_dir=cache_dir) for member in ("HH", "SS")]
+
+
+@pytest.mark.parametrize("scheme", rr_basis.SCHEMES)
+def test_build_matrix_matches_reference(rr_files, singles, maps, scheme):
+    states = maps[scheme]
+    for member, recurrences in zip(("HH", "SS"), singles):
+        matrix = rr_assembly.build_matrix(recurrences, scheme, *states.T, PARAMETERS)
+        expected = reference_matrix(rr_files[member], scheme, states, PARAMETERS)
+        np.testing.assert_allclose(matrix.toarray(), expected, rtol=1e-12, atol=1e-12)
+
+
+@pytest.mark.parametrize("scheme", rr_basis.SCHEMES)
+def test_longdouble_build(singles, maps, scheme):
+    l, m, n = maps[scheme].T
+    extended = rr_assembly.build_matrix(singles[0], scheme, l, m, n, PARAMETERS, dtype=np.longdouble)
+    assert extended.dtype == np.longdouble
+    expected = rr_assembly.build_matrix(singles[0], scheme, l, m, n, PARAMETERS).toarray()
+    # ANTISYM entries are differences of terms of order m3, so compare on the scale of the matrix.
+    np.testing.assert_allclose(extended.toarray().astype(np.float64), expected, atol=1e-14 * np.abs(expected).max())
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+@pytest.mark.parametrize("scheme", rr_basis.SCHEMES)
+def test_parallel_fill_matches_build(singles, maps, scheme, workers):
+    l, m, n = maps[scheme].T
+    matrices = rr_assembly.parallel_fill(singles, scheme, l, m, n, PARAMETERS, workers=workers, chunk_size=7)
+    assert len(matrices) == len(singles)
+    for matrix, recurrences in zip(matrices, singles):
+        expected = rr_assembly.build_matrix(recurrences, scheme, l, m, n, PARAMETERS)
+        np.testing.assert_array_equal(matrix.toarray(), expected.toarray())
+
+
+@pytest.fixture(scope="module")
+def fused(rr_files, cache_dir):
+    return rr_codegen.load_fused_recurrences(rr_files, cache_dir=cache_dir)
+
+
+@pytest.mark.parametrize("scheme", rr_basis.SCHEMES)
+def test_fused_build_matches_single_builds(singles, fused, maps, scheme):
+    l, m, n = maps[scheme].T
+    for matrix, recurrences in zip(rr_assembly.build_matrices(fused, scheme, l, m, n, PARAMETERS), singles):
+        expected = rr_assembly.build_matrix(recurrences, scheme, l, m, n, PARAMETERS).toarray()
+        np.testing.assert_allclose(matrix.toarray(), expected, rtol=1e-13, atol=1e-13 * np.abs(expected).max())
+
+
+@pytest.mark.parametrize("scheme", rr_basis.SCHEMES)
+def test_rebuild_matches_build(fused, maps, scheme):
+    l, m, n = maps[scheme].T
+    changed = {**PARAMETERS, "A": 0.9, "B": 1.7, "C": 2.9}
+    structure = rr_assembly.cached_structure(fused, scheme, l, m, n, PARAMETERS)
+    assert any(table is not None for table in structure.monomials)
+    rebuilt = rr_assembly.rebuild_matrices(structure, fused, changed)
+    for new, expected in zip(rebuilt, rr_assembly.build_matrices(fused, scheme, l, m, n, changed)):
+        # ANTISYM entries are differences of terms of order m3, so compare on the scale of the matrix.
+        expected = expected.toarray()
+        np.testing.assert_allclose(new.toarray(), expected, atol=1e-14 * np.abs(expected).max())
+
+
+def test_rebuild_rechecks_cancellation(tmp_path):
+    pytest.importorskip("sympy")
+    # Exact at l = 0..3 for every A, but the monomial terms grow like A while the value stays 1.
+    (tmp_path / "RR_HH.txt").write_text("0 0 0 A*l*(l-1)*(l-2)*(l-3)+1\n", encoding="utf-8")
+    (tmp_path / "RR_SS.txt").write_text("0 0 0 -1-l\n", encoding="utf-8")
+    paths = {member: str(tmp_path / f"RR_{member}.txt") for member in ("HH", "SS")}
+    recurrences = rr_codegen.load_fused_recurrences(paths, cache_dir=str(tmp_path))
+    l, m, n = rr_basis.scheme_basis("ASYM", 3).T
+    structure = rr_assembly.assembly_structure(recurrences, "ASYM", l, m, n, {"A": 1.0})
+    assert structure.monomials[0] is not None
+    for a in (12345.678901, np.pi * 1e6):
+        hh, _ = rr_assembly.rebuild_matrices(structure, recurrences, {"A": a})
+        np.testing.assert_array_equal(hh.diagonal(), np.ones(l.size))
@@ -0,0 +1,89 @@
+"""Recurrence backends against the NumPy module, in this process and reloaded in workers."""
+
+import importlib.machinery
+import os
+
+import numpy as np
+import pytest
+from conftest import PARAMETERS
+
+import rr_assembly
+import rr_backends
+import rr_basis
+import rr_codegen
+
+MAT_SIZE = 30
+
+
+@pytest.fixture(scope="module")
+def states(tmp_path_factory):
+    return rr_basis.basis_maps(MAT_SIZE, str(tmp_path_factory.mktemp("basis")))["SYM"][:MAT_SIZE]
+
+
+def _require(name):
+    if not rr_backends.is_available(name):
+        pytest.skip(f"the {name} backend needs {rr_backends.BACKENDS[name].package}")
+
+
+def test_registry(monkeypatch, rr_files):
+    assert set(rr_backends.AUTO_BACKENDS) <= set(rr_backends.BACKENDS)
+    assert rr_backends.is_available("numpy")
+    assert "numpy" in rr_backends.available_backends()
+    with pytest.raises(ValueError, match="backend must be one of"):
+        rr_backends.load_backend("fortran", rr_files["HH"])
+    missing = rr_backends.Backend("missing", "no_such_module_for_rr", "no-such-package", rr_backends._load_numpy)
+    monkeypatch.setitem(rr_backends.BACKENDS, "missing", missing)
+    assert "missing" not in rr_backends.available_backends()
+    with pytest.raises(RuntimeError, match="pip install no-such-package"):
+        rr_backends.load_backend("missing", rr_files["HH"])
+
+
+def test_module_file_name():
+    for suffix in importlib.machinery.EXTENSION_SUFFIXES:
+        assert rr_codegen.module_file_name(f"/cache/rr_cython_RR_HH_0123{suffix}") == "rr_cython_RR_HH_0123"
+    assert rr_codegen.module_file_name("/cache/rr_numba_RR_HH_0123.py") == "rr_numba_RR_HH_0123"
+
+
+def test_load_generated_extension():
+    import _json
+
+    path = getattr(_json, "__file__", None)
+    if path is None or not os.path.isfile(path):
+        pytest.skip("_json is built into this interpreter")
+    assert rr_codegen.load_generated(path).scanstring("x\"", 0) == ("x", 2)
+
+
+@pytest.mark.parametrize("name", list(rr_backends.BACKENDS))
+def test_backend_matches_numpy(rr_files, cache_dir, states, name):
+    _require(name)
+    l, m, n = states.T
+    for path in rr_files.values():
+        reference = rr_codegen.evaluate_all(rr_backends.load_backend("numpy", path, cache_dir), l, m, n, PARAMETERS)
+        values = rr_codegen.evaluate_all(rr_backends.load_backend(name, path, cache_dir), l, m, n, PARAMETERS)
+        assert values.keys() == reference.keys()
+        for shift, expected in reference.items():
+            np.testing.assert_allclose(values[shift], expected, rtol=1e-12, atol=1e-12 * np.abs(expected).max())
+
+
+@pytest.mark.parametrize("name", list(rr_backends.BACKENDS))
+def test_backend_reloads_in_worker(rr_files, cache_dir, states, name):
+    _require(name)
+    l, m, n = states.T
+    recurrence_sets = [rr_backends.load_backend(name, rr_files[member], cache_dir) for member in ("HH", "SS")]
+    for recurrences in recurrence_sets:
+        assert rr_codegen.load_generated(recurrences.__file__).SHIFTS.keys() == recurrences.SHIFTS.keys()
+    matrices = rr_assembly.parallel_fill(recurrence_sets, "SYM", l, m, n, PARAMETERS, workers=2, chunk_size=7)
+    for matrix, member in zip(matrices, ("HH", "SS")):
+        reference = rr_backends.load_backend("numpy", rr_files[member], cache_dir)
+        expected = rr_assembly.build_matrix(reference, "SYM", l, m, n, PARAMETERS).toarray()
+        np.testing.assert_allclose(matrix.toarray(), expected, rtol=1e-12, atol=1e-12 * np.abs(expected).max())
+
+
+def test_benchmark_and_select(monkeypatch, rr_files, cache_dir, states):
+    l, m, n = states.T
+    (timing,) = rr_backends.benchmark_backends(rr_files["HH"], l, m, n, PARAMETERS, ["numpy"], 2, cache_dir=cache_dir)
+    assert timing.agrees and timing.max_relative_error == 0.0 and not timing.error
+    paths = list(rr_files.values())
+    assert rr_backends.select_backend(paths, l, m, n, PARAMETERS, cache_dir=cache_dir) in rr_backends.AUTO_BACKENDS
+    monkeypatch.setattr(rr_backends, "AUTO_BACKENDS", ("numpy",))
+    assert rr_backends.select_backend(paths, l, m, n, PARAMETERS, cache_dir=cache_dir) == "numpy"
@@ -0,0 +1,66 @@
+"""rr_basis against the sympy omegas and triple loops of the original MatrixGeneratorGS."""
+
+import numpy as np
+import pytest
+
+import rr_basis
+
+MAT_SIZES = [10, 35, 100, 333, 1000]
+
+
+def loop_omegas(mat_size):
+    sympy = pytest.importorskip("sympy")
+    omega = sympy.Symbol("omega", real=True)
+
+    def cubic(w, size):
+        return 15 / 16 + (17 / 12) * w + (5 / 8) * w**2 + (1 / 12) * w**3 + (1 / 16) * (1) ** w - size
+
+    size = 1.4 * mat_size
+    sym = int(round(sympy.solve(cubic(omega, size), omega)[0]))
+    cube = (81 * size + 3 * (729 * size**2 - 3) ** 0.5) ** (1 / 3)
+    asym = int(round((1 / 3) * cube + 1 / cube - 2, 0))
+    antisym = int(round(sympy.solve(cubic(omega - 1, 2 * mat_size), omega)[0]))
+    return {"SYM": sym, "ASYM": asym, "ANTISYM": antisym}
+
+
+def loop_basis(scheme, omega):
+    states = []
+    for ww in range(omega + 1):
+        for vv in range(ww + 1):
+            for uu in range(vv + 1):
+                l, m, n = uu, vv - uu, ww - vv
+                if scheme == "ASYM" or (scheme == "SYM" and l <= m) or (scheme == "ANTISYM" and l < m):
+                    states.append((l, m, n))
+    return np.array(states, dtype=np.int64).reshape(-1, 3)
+
+
+@pytest.mark.parametrize("mat_size", MAT_SIZES)
+def test_omegas_match_sympy(mat_size):
+    expected = loop_omegas(mat_size)
+    assert rr_basis.omega_sym(mat_size) == expected["SYM"]
+    assert rr_basis.omega_asym(mat_size) == expected["ASYM"]
+    assert rr_basis.omega_antisym(mat_size) == expected["ANTISYM"]
+
+
+@pytest.mark.parametrize("scheme", rr_basis.SCHEMES)
+@pytest.mark.parametrize("omega", [0, 1, 2, 7, 12])
+def test_scheme_basis_matches_loops(scheme, omega):
+    np.testing.assert_array_equal(rr_basis.scheme_basis(scheme, omega), loop_basis(scheme, omega))
+
+
+@pytest.mark.parametrize("mat_size", MAT_SIZES)
+def test_cached_maps_match_loops(mat_size, tmp_path):
+    omegas = loop_omegas(mat_size)
+    built = rr_basis.basis_maps(mat_size, cache_dir=str(tmp_path))
+    cached = rr_basis.basis_maps(mat_size, cache_dir=str(tmp_path))
+    for scheme in rr_basis.SCHEMES:
+        expected = loop_basis(scheme, omegas[scheme])
+        np.testing.assert_array_equal(built[scheme], expected)
+        np.testing.assert_array_equal(cached[scheme], expected)
+        # Every scheme must have enough states for the first mat_size to be kept.
+        assert len(expected) >= mat_size
+
+
+def test_unknown_scheme():
+    with pytest.raises(ValueError):
+        rr_basis.scheme_basis("SINGLET", 3)
@@ -0,0 +1,68 @@
+"""Generated recurrence modules against an ``eval`` stand-in for the cexprtk expressions."""
+
+import numpy as np
+import pytest
+from conftest import PARAMETERS, SHIFTS, reference_dictionary
+
+import rr_codegen
+
+
+def test_parse_rr_file(rr_files, tmp_path):
+    relations = rr_codegen.parse_rr_file(rr_files["HH"])
+    assert sorted(relations) == sorted(SHIFTS)
+    duplicated = tmp_path / "RR_dup.txt"
+    duplicated.write_text("# comment\n\n0 0 0 l\n0 0 0 m\n", encoding="utf-8")
+    with pytest.raises(ValueError, match="appears twice"):
+        rr_codegen.parse_rr_file(str(duplicated))
+
+
+@pytest.mark.parametrize("member", ["HH", "SS"])
+def test_load_recurrences_matches_eval(rr_files, cache_dir, member):
+    recurrences = rr_codegen.load_recurrences(rr_files[member], cache_dir=cache_dir)
+    table, dictionary = reference_dictionary(rr_files[member], PARAMETERS)
+    l, m, n = np.indices((4, 4, 4)).reshape(3, -1)
+    for shift, expression in dictionary.items():
+        expected = []
+        for state in zip(l, m, n):
+            table.update(zip("lmn", map(float, state)))
+            expected.append(expression())
+        values = rr_codegen.evaluate_shift(recurrences, shift, l, m, n, PARAMETERS)
+        np.testing.assert_allclose(values, expected, rtol=1e-13, atol=1e-13)
+
+
+def test_generated_module_is_cached(rr_files, cache_dir):
+    first = rr_codegen.load_recurrences(rr_files["HH"], cache_dir=cache_dir)
+    again = rr_codegen.load_recurrences(rr_files["HH"], cache_dir=cache_dir)
+    assert again.__file__ == first.__file__
+    assert again.SOURCE_DIGEST == first.SOURCE_DIGEST
+
+
+@pytest.fixture(scope="module")
+def fused(rr_files, cache_dir):
+    return rr_codegen.load_fused_recurrences(rr_files, cache_dir=cache_dir)
+
+
+def test_fused_matches_single_files(rr_files, cache_dir, fused):
+    assert fused.MEMBERS == ("HH", "SS")
+    singles = [rr_codegen.load_recurrences(rr_files[member], cache_dir=cache_dir) for member in fused.MEMBERS]
+    l, m, n = np.indices((4, 4, 4)).reshape(3, -1)
+    for shift in fused.SHIFTS:
+        values = rr_codegen.evaluate_fused(fused, shift, l, m, n, PARAMETERS)
+        for member, single in enumerate(singles):
+            expected = rr_codegen.evaluate_shift(single, shift, l, m, n, PARAMETERS)
+            np.testing.assert_allclose(values[member], expected, rtol=1e-13, atol=1e-13)
+
+
+def test_dispatch_matches_eval(rr_files, cache_dir):
+    dispatch = rr_codegen.load_dispatch({"HH": rr_files["HH"]}, cache_dir=cache_dir)
+    table, dictionary = reference_dictionary(rr_files["HH"], PARAMETERS)
+    assert set(dispatch.ROW_SHIFTS["HH"]) == set(dictionary)
+    for state in [(0, 0, 0), (1, 2, 0), (2, 1, 3), (3, 3, 1)]:
+        table.update(zip("lmn", map(float, state)))
+        arguments = [table[name] for name in dispatch.ARGUMENTS]
+        row = dispatch.HHrow(*arguments)
+        for position, shift in enumerate(dispatch.ROW_SHIFTS["HH"]):
+            expected = dictionary[shift]()
+            assert row[position] == pytest.approx(expected, rel=1e-13, abs=1e-13)
+            assert dispatch.HHrr(*shift, *arguments) == pytest.approx(expected, rel=1e-13, abs=1e-13)
+        assert dispatch.HHrr(5, 0, 0, *arguments) == 0.0
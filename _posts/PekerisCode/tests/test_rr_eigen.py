@@ -0,0 +1,77 @@
+"""top_eigenpair on one-triangle pencils against dense ``eigvalsh`` of the full matrices."""
+
+import numpy as np
+import pytest
+from scipy import sparse
+from scipy.linalg import eigvalsh
+
+import rr_eigen
+
+SIZE = 60
+
+
+@pytest.fixture(scope="module")
+def pencil():
+    """Full symmetric HH and negative definite SS, banded like an assembled Hylleraas pencil."""
+    rng = np.random.default_rng(7)
+    band = np.abs(np.subtract.outer(np.arange(SIZE), np.arange(SIZE))) <= 4
+    hh = np.where(band, rng.standard_normal((SIZE, SIZE)), 0.0)
+    hh = hh + hh.T
+    factor = np.where(band, rng.standard_normal((SIZE, SIZE)), 0.0)
+    ss = -(factor @ factor.T + SIZE * np.eye(SIZE))
+    return hh, ss
+
+
+def stored(matrix, triangle, dtype=np.float64):
+    """One triangle as the stencil builders store it; the other one holds junk the solvers must ignore."""
+    junk = np.triu(np.full(matrix.shape, 1e3), 1)
+    part = np.tril(matrix) + junk if triangle == "lower" else np.triu(matrix) + junk.T
+    return sparse.csr_matrix(part.astype(dtype))
+
+
+@pytest.fixture(scope="module")
+def expected(pencil):
+    hh, ss = pencil
+    return eigvalsh(hh, -ss)[-1]
+
+
+@pytest.mark.parametrize("dtype", [np.float64, np.longdouble])
+@pytest.mark.parametrize("method", rr_eigen.METHODS)
+@pytest.mark.parametrize("triangle", rr_eigen.TRIANGLES)
+def test_top_eigenpair_reads_one_triangle(pencil, expected, triangle, method, dtype):
+    hh, ss = pencil
+    pair = rr_eigen.top_eigenpair(stored(hh, triangle, dtype), stored(ss, triangle, dtype), method, triangle=triangle)
+    assert pair.value == pytest.approx(expected, rel=1e-10)
+    assert pair.energy == -pair.value
+    residual = hh @ pair.vector - pair.value * (-ss) @ pair.vector
+    assert np.linalg.norm(residual) <= 1e-8 * np.linalg.norm(pair.vector)
+
+
+@pytest.mark.parametrize("triangle", rr_eigen.TRIANGLES)
+def test_expand_triangle(pencil, triangle):
+    hh, _ = pencil
+    np.testing.assert_array_equal(rr_eigen.expand_triangle(stored(hh, triangle), triangle).toarray(), hh)
+
+
+@pytest.mark.parametrize("triangle", rr_eigen.TRIANGLES)
+def test_dense_arrays(pencil, expected, triangle):
+    hh, ss = pencil
+    pair = rr_eigen.top_eigenpair(stored(hh, triangle).toarray(), stored(ss, triangle).toarray(), triangle=triangle)
+    assert pair.value == pytest.approx(expected, rel=1e-12)
+
+
+def test_warm_start_from_neighbour(pencil, expected):
+    hh, ss = pencil
+    start = rr_eigen.top_eigenpair(sparse.csr_matrix(hh), sparse.csr_matrix(ss), "dense")
+    moved = sparse.csr_matrix(hh + 1e-3 * np.eye(SIZE))
+    overlap = sparse.csr_matrix(-ss)
+    pair = rr_eigen.warm_eigenpair(moved, overlap, start, rr_eigen.default_margin(start.value))
+    assert pair.value == pytest.approx(eigvalsh(moved.toarray(), -ss)[-1], rel=1e-10)
+
+
+def test_unknown_method_and_triangle(pencil):
+    hh, ss = (sparse.csr_matrix(matrix) for matrix in pencil)
+    with pytest.raises(ValueError):
+        rr_eigen.top_eigenpair(hh, ss, "arpack")
+    with pytest.raises(ValueError):
+        rr_eigen.top_eigenpair(hh, ss, "lanczos", triangle="both")
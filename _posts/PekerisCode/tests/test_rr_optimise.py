@@ -0,0 +1,61 @@
+"""ExponentObjective solves on one-triangle matrices and its handling of invalid points."""
+
+import math
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+from conftest import PARAMETERS
+from scipy import sparse
+from scipy.linalg import eigvalsh
+
+import rr_basis
+import rr_codegen
+import rr_optimise
+
+SIZE = 40
+
+
+def lower_pencil(shift):
+    """A definite pencil as SYM assembly stores it, with HH moved by ``shift`` times the identity."""
+    rng = np.random.default_rng(3)
+    hh = rng.standard_normal((SIZE, SIZE))
+    hh = hh + hh.T + shift * np.eye(SIZE)
+    factor = rng.standard_normal((SIZE, SIZE))
+    ss = -(factor @ factor.T + SIZE * np.eye(SIZE))
+    return hh, ss, [sparse.csr_matrix(np.tril(hh)), sparse.csr_matrix(np.tril(ss))]
+
+
+@pytest.mark.parametrize("warm", [False, True])
+def test_solve_point_reads_lower_triangle(monkeypatch, warm):
+    hh, ss, stored = lower_pencil(0.0)
+    monkeypatch.setattr(rr_optimise, "rebuild_matrices", lambda structure, recurrences, parameters: stored)
+    structure = SimpleNamespace(scheme="SYM")
+    previous = None
+    if warm:
+        _, _, neighbour = lower_pencil(1e-3)
+        previous = rr_optimise.dense_top_eigenpair(*neighbour)
+    pair, warmed = rr_optimise._solve_point(structure, None, PARAMETERS, previous, 1e-3)
+    assert warmed == warm
+    assert pair.value == pytest.approx(eigvalsh(hh, -ss)[-1], rel=1e-10)
+
+
+@pytest.fixture(scope="module")
+def objective(rr_files, tmp_path_factory):
+    fused = rr_codegen.load_fused_recurrences(rr_files, cache_dir=str(tmp_path_factory.mktemp("rrcache")))
+    l, m, n = rr_basis.scheme_basis("SYM", 3).T
+    return rr_optimise.ExponentObjective(fused, "SYM", l, m, n, PARAMETERS, lower=0.5, upper=5.0)
+
+
+@pytest.mark.parametrize("point", [[0.1, 1.0, 1.0], [1.0, 6.0, 1.0], [1.0, math.nan, 1.0], [math.inf, 1.0, 1.0]])
+def test_invalid_points_are_inf_without_a_solve(monkeypatch, objective, point):
+    monkeypatch.setattr(rr_optimise, "_solve_point", pytest.fail)
+    assert objective(point) == math.inf
+    assert objective.history[-1].energy == math.inf
+    assert objective.evaluate_many([point, point])[0] == math.inf
+
+
+def test_unsolvable_pencil_is_inf(monkeypatch, objective):
+    singular = sparse.csr_matrix((SIZE, SIZE))
+    monkeypatch.setattr(rr_optimise, "rebuild_matrices", lambda structure, recurrences, parameters: [singular] * 2)
+    assert objective([1.25, 1.25, 1.25]) == math.inf